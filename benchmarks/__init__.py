@@ -0,0 +1,6 @@
+"""
+Benchmarks for the hot paths of the coverage processing pipeline.
+
+Run them with `python -m benchmarks`, see `python -m benchmarks --help` for
+the available scales and for how to record and compare against baselines.
+"""
@@ -0,0 +1,110 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_scaffold.settings")
+django.setup()
+
+import logging  # noqa: E402
+import tracemalloc  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+import click  # noqa: E402
+
+from benchmarks import harness  # noqa: E402
+from benchmarks.cases import run_benchmarks  # noqa: E402
+from benchmarks.generators import SCALES  # noqa: E402
+
+
+@click.command()
+@click.option(
+    "--scale",
+    "scales",
+    type=click.Choice(list(SCALES)),
+    multiple=True,
+    default=["small", "medium"],
+    show_default=True,
+)
+@click.option("--repeat", default=3, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--save-baseline",
+    is_flag=True,
+    help="Store the results as the new baseline of each scale.",
+)
+@click.option(
+    "--compare",
+    is_flag=True,
+    help="Compare the results with the stored baseline of each scale.",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Relative increase of time or memory considered a regression.",
+)
+@click.option(
+    "--database-url",
+    envvar="BENCHMARK_DATABASE_URL",
+    help=(
+        "Database with the worker schema to benchmark the test results writers "
+        "against, which are skipped without one. Nothing is committed to it."
+    ),
+)
+@click.option(
+    "--baselines-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=harness.BASELINES_DIR,
+)
+def benchmark(
+    scales: tuple[str, ...],
+    repeat: int,
+    seed: int,
+    save_baseline: bool,
+    compare: bool,
+    threshold: float,
+    database_url: str | None,
+    baselines_dir: Path,
+):
+    """
+    Benchmarks the coverage processing pipeline against in-memory Redis and storage.
+    """
+    # the pipeline logs a lot on `info`, which would be included in the timings
+    logging.disable(logging.INFO)
+    tracemalloc.start()
+
+    has_regressions = False
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        run = harness.best_of(
+            [
+                run_benchmarks(scale_name, scale, seed, database_url)
+                for _ in range(repeat)
+            ]
+        )
+        click.echo(f"\n== {scale_name}: {scale}")
+        click.echo(run.format())
+
+        path = baselines_dir / f"{scale_name}.json"
+        if compare:
+            if not path.exists():
+                click.echo(f"No baseline found at {path}")
+            elif regressions := harness.find_regressions(
+                harness.load_baseline(path), run, threshold
+            ):
+                has_regressions = True
+                click.echo("Regressions:")
+                for regression in regressions:
+                    click.echo(f"  {regression}")
+            else:
+                click.echo("No regressions")
+        if save_baseline:
+            harness.save_baseline(run, path)
+            click.echo(f"Saved baseline to {path}")
+
+    if has_regressions:
+        raise click.ClickException("Performance regressions found")
+
+
+if __name__ == "__main__":
+    benchmark()
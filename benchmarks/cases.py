@@ -0,0 +1,290 @@
+"""
+The benchmarked pipeline, mirroring what the upload processor and finisher do
+for a commit with many uploads, followed by the notification-time comparison.
+"""
+
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+import orjson
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report
+from shared.utils.sessions import Session
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session as DbSession
+
+from benchmarks.fakes import in_memory_services
+from benchmarks.generators import (
+    GENERATORS,
+    Scale,
+    fixture_raw_upload,
+    generate_diff,
+    generate_raw_upload,
+    generate_testruns,
+    session_files,
+)
+from benchmarks.harness import BenchmarkRun
+from database.tests.factories import RepositoryFlagFactory, UploadFactory
+from services.archive import ArchiveService
+from services.processing.intermediate import (
+    cleanup_intermediate_reports,
+    load_intermediate_reports,
+    save_intermediate_report,
+)
+from services.processing.merging import merge_reports
+from services.processing.state import MERGE_BATCH_SIZE
+from services.report import ReportService
+from services.report.parser.legacy import LegacyReportParser
+from services.report.parser.types import ParsedUploadedReportFile
+from services.report.raw_upload_processor import process_raw_upload
+from services.report.report_builder import (
+    NoLabelsReportBuilderSession,
+    ReportBuilder,
+    ReportBuilderSession,
+)
+from services.report.report_processor import process_report
+from tasks.test_results_processor import TestResultsProcessorTask
+
+COMMIT_YAML = {}
+
+# The number of testruns in the test results upload written by `bench_ta_writers`
+TA_TESTRUNS = 50_000
+
+
+class BenchmarkReportJson:
+    """
+    Stands in for the `report_json` `ArchiveField` of a `Commit`, writing it to
+    storage like the real one does, but without needing a database.
+    """
+
+    def __get__(self, commit, objtype=None):
+        if commit is None:
+            return self
+        if commit._report_json is None and commit._serialized_report_json:
+            commit._report_json = orjson.loads(commit._serialized_report_json)
+        return commit._report_json
+
+    def __set__(self, commit, value):
+        commit._report_json = value
+        ArchiveService(commit.repository).write_json_data_to_storage(
+            commit.commitid, "commits", "report", commit.commitid, value
+        )
+
+    def set_serialized(self, commit, data: bytes):
+        commit._report_json = None
+        commit._serialized_report_json = data
+        ArchiveService(commit.repository).write_serialized_json_data_to_storage(
+            commit.commitid, "commits", "report", commit.commitid, data
+        )
+
+
+class BenchmarkCommit(SimpleNamespace):
+    """
+    Stands in for a `Commit` in `ReportService.save_report`.
+    """
+
+    report_json = BenchmarkReportJson()
+
+
+def _repository() -> SimpleNamespace:
+    return SimpleNamespace(repoid=1, ownerid=1, service="github", service_id="1")
+
+
+def bench_language_processors(run: BenchmarkRun, scale: Scale, seed: int):
+    """
+    Processes one upload of each supported format, covering `files_per_session`
+    files, and one upload made from the checked-in fixture.
+    """
+    parser = LegacyReportParser()
+    for format in GENERATORS:
+        rng = random.Random(seed)
+        raw = generate_raw_upload(
+            rng, format, session_files(scale, 0), scale.lines_per_file
+        )
+        with run.measure(f"process_raw_upload[{format}]"):
+            process_raw_upload(
+                COMMIT_YAML, parser.parse_raw_report_from_bytes(raw), Session()
+            )
+
+    raw = fixture_raw_upload()
+    with run.measure("process_raw_upload[fixture]"):
+        process_raw_upload(
+            COMMIT_YAML, parser.parse_raw_report_from_bytes(raw), Session()
+        )
+
+
+def bench_report_builder_sessions(run: BenchmarkRun, scale: Scale, seed: int):
+    """
+    Compares the label-aware `ReportBuilderSession` with the
+    `NoLabelsReportBuilderSession` used for repositories without labels.
+    """
+    for format in ("lcov", "cobertura", "jacoco"):
+        contents = GENERATORS[format](
+            random.Random(seed), session_files(scale, 0), scale.lines_per_file
+        )
+        for name, session_class in (
+            ("labels", ReportBuilderSession),
+            ("no_labels", NoLabelsReportBuilderSession),
+        ):
+            report_builder = ReportBuilder(
+                COMMIT_YAML, 0, {}, lambda path, bases_to_try=None: path
+            )
+            with mock.patch.object(
+                ReportBuilder,
+                "create_report_builder_session",
+                lambda builder, filepath: session_class(builder, filepath),
+            ):
+                with run.measure(f"process_report[{format}, {name}]"):
+                    process_report(
+                        ParsedUploadedReportFile(f"coverage.{format}", contents),
+                        report_builder,
+                    )
+
+
+def bench_upload_pipeline(run: BenchmarkRun, scale: Scale, seed: int) -> Report:
+    """
+    Processes `sessions` uploads into intermediate reports, merges them in
+    batches like the finisher does, and returns the final report.
+    """
+    rng = random.Random(seed)
+    parser = LegacyReportParser()
+    upload_ids = list(range(1, scale.sessions + 1))
+
+    for upload_id in upload_ids:
+        raw = generate_raw_upload(
+            rng, "lcov", session_files(scale, upload_id - 1), scale.lines_per_file
+        )
+        with run.measure("process_raw_upload[pipeline]"):
+            report = process_raw_upload(
+                COMMIT_YAML, parser.parse_raw_report_from_bytes(raw), Session()
+            )
+        with run.measure("save_intermediate_report"):
+            save_intermediate_report(upload_id, report)
+        del report
+
+    master_report = Report()
+    for start in range(0, len(upload_ids), MERGE_BATCH_SIZE):
+        batch = upload_ids[start : start + MERGE_BATCH_SIZE]
+        with run.measure("load_intermediate_reports"):
+            intermediate_reports = load_intermediate_reports(batch)
+        with run.measure("merge_reports"):
+            master_report, _merge_result = merge_reports(
+                COMMIT_YAML, master_report, intermediate_reports
+            )
+        del intermediate_reports
+        cleanup_intermediate_reports(batch)
+
+    return master_report
+
+
+def bench_save_report(run: BenchmarkRun, report: Report) -> BenchmarkCommit:
+    commit = BenchmarkCommit(
+        repository=_repository(),
+        repoid=1,
+        commitid="a" * 40,
+        state=None,
+        totals=None,
+        report=None,
+        _report_json=None,
+        _serialized_report_json=None,
+    )
+    with run.measure("ReportService.save_report"):
+        ReportService(COMMIT_YAML).save_report(commit, report)
+    return commit
+
+
+def bench_report_loading(run: BenchmarkRun, commit: BenchmarkCommit):
+    """
+    Loads the saved report the way read-only consumers do, accessing its totals,
+    sessions and a single file, both fully decoded and through a `LazyReport`.
+    """
+    report_service = ReportService(COMMIT_YAML)
+    with run.measure("get_existing_report_for_commit"):
+        report = report_service.get_existing_report_for_commit(
+            commit, report_class=ReadOnlyReport
+        )
+        _ = report.totals, len(report.sessions), report.get(report.files[0])
+    del report
+
+    with run.measure("get_lazy_report_for_commit"):
+        report = report_service.get_lazy_report_for_commit(commit)
+        _ = report.totals, len(report.sessions), report.get(report.files[0])
+
+
+def bench_diff_totals(run: BenchmarkRun, scale: Scale, report: Report, seed: int):
+    """
+    Computes the patch totals the same way `ComparisonProxy.get_patch_totals` does.
+    """
+    diff = generate_diff(random.Random(seed), scale)
+    # `apply_diff` caches its results in the diff, so every call needs a fresh copy
+    with run.measure("ComparisonProxy.get_patch_totals"):
+        report.apply_diff(orjson.loads(orjson.dumps(diff)))
+
+
+def bench_ta_writers(run: BenchmarkRun, database_url: str, seed: int):
+    """
+    Writes a test results upload of `TA_TESTRUNS` testruns to the database, once
+    with the multi-VALUES inserts and once with `COPY`.
+
+    Every write happens in its own transaction which is rolled back afterwards,
+    so both start from the same (empty) tables.
+    """
+    parsing_results = [
+        {
+            "framework": "Pytest",
+            "testruns": generate_testruns(random.Random(seed), TA_TESTRUNS),
+        }
+    ]
+    engine = create_engine(database_url)
+    for name, use_copy in (("insert", False), ("copy", True)):
+        connection = engine.connect()
+        transaction = connection.begin()
+        db_session = DbSession(bind=connection)
+        try:
+            upload = UploadFactory.create()
+            commit = upload.report.commit
+            db_session.add(upload)
+            db_session.add(
+                RepositoryFlagFactory.create(
+                    repository=commit.repository, flag_name="unit"
+                )
+            )
+            db_session.flush()
+
+            with mock.patch(
+                "tasks.test_results_processor.TA_COPY_INGEST.check_value",
+                return_value=use_copy,
+            ):
+                with run.measure(f"_bulk_write_tests_to_db[{name}]"):
+                    TestResultsProcessorTask()._bulk_write_tests_to_db(
+                        db_session,
+                        commit.repoid,
+                        commit.commitid,
+                        upload.id,
+                        "main",
+                        parsing_results,
+                        set(),
+                        ["unit"],
+                    )
+        finally:
+            db_session.close()
+            transaction.rollback()
+            connection.close()
+    engine.dispose()
+
+
+def run_benchmarks(
+    scale_name: str, scale: Scale, seed: int, database_url: str | None = None
+) -> BenchmarkRun:
+    run = BenchmarkRun(scale=scale_name)
+    with in_memory_services():
+        bench_language_processors(run, scale, seed)
+        bench_report_builder_sessions(run, scale, seed)
+        report = bench_upload_pipeline(run, scale, seed)
+        commit = bench_save_report(run, report)
+        bench_report_loading(run, commit)
+        bench_diff_totals(run, scale, report, seed)
+    if database_url:
+        bench_ta_writers(run, database_url, seed)
+    return run
@@ -0,0 +1,96 @@
+"""
+In-memory stand-ins for Redis and archive storage, so the benchmarks run locally
+without any external services and without network noise in the measurements.
+"""
+
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+from shared.storage.memory import MemoryStorageService
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class InMemoryRedis:
+    """
+    Implements the subset of the Redis hash commands used by the report
+    processing pipeline. Like our real clients, it returns `bytes` everywhere.
+    """
+
+    def __init__(self):
+        self._hashes: dict[bytes, dict[bytes, bytes]] = {}
+
+    def hset(self, key, mapping: dict) -> int:
+        hash = self._hashes.setdefault(_to_bytes(key), {})
+        new_fields = {_to_bytes(k): _to_bytes(v) for k, v in mapping.items()}
+        added = len(new_fields.keys() - hash.keys())
+        hash.update(new_fields)
+        return added
+
+    def hmset(self, key, mapping: dict) -> bool:
+        self.hset(key, mapping=mapping)
+        return True
+
+    def hgetall(self, key) -> dict[bytes, bytes]:
+        return dict(self._hashes.get(_to_bytes(key), {}))
+
+    def expire(self, key, _ttl) -> bool:
+        return _to_bytes(key) in self._hashes
+
+    def delete(self, *keys) -> int:
+        return sum(self._hashes.pop(_to_bytes(key), None) is not None for key in keys)
+
+    def pipeline(self, transaction=True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    def __init__(self, redis: InMemoryRedis):
+        self._redis = redis
+        self._commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        results = [method(*args, **kwargs) for method, args, kwargs in self._commands]
+        self._commands = []
+        return results
+
+
+@contextmanager
+def in_memory_services():
+    """
+    Patches the Redis connection and the archive storage with in-memory fakes
+    for the duration of the context.
+    """
+    redis = InMemoryRedis()
+    storage = MemoryStorageService({})
+    with ExitStack() as stack:
+        stack.enter_context(
+            mock.patch(
+                "services.redis._get_redis_instance_from_url", return_value=redis
+            )
+        )
+        stack.enter_context(
+            mock.patch(
+                "shared.storage.get_appropriate_storage_service", return_value=storage
+            )
+        )
+        yield redis, storage
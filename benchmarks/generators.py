@@ -0,0 +1,221 @@
+"""
+Deterministic generators for the raw uploads and diffs used by the benchmarks.
+
+All generators take a `random.Random` so that the same seed always produces
+byte-identical inputs, which keeps results comparable across runs and machines.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tasks" / "tests" / "samples"
+
+
+@dataclass(frozen=True)
+class Scale:
+    files: int
+    """
+    Total number of files in the repository / head report.
+    """
+    sessions: int
+    """
+    Number of uploads that are processed and merged.
+    """
+    files_per_session: int
+    """
+    Number of files covered by each upload.
+    Every upload covers a different window of files, so that all the uploads
+    together cover the whole repository.
+    """
+    lines_per_file: int
+
+
+SCALES = {
+    "small": Scale(files=100, sessions=1, files_per_session=100, lines_per_file=50),
+    "medium": Scale(
+        files=1_000, sessions=10, files_per_session=1_000, lines_per_file=50
+    ),
+    "large": Scale(
+        files=10_000, sessions=100, files_per_session=1_000, lines_per_file=30
+    ),
+    # the size of report that `ReportService.save_report` is tuned for
+    "report_50k": Scale(
+        files=50_000, sessions=50, files_per_session=1_000, lines_per_file=20
+    ),
+    "xlarge": Scale(
+        files=100_000, sessions=500, files_per_session=2_000, lines_per_file=20
+    ),
+}
+
+
+def file_path(file_number: int) -> str:
+    return f"src/package_{file_number // 100}/module_{file_number}.py"
+
+
+def session_files(scale: Scale, session: int) -> list[int]:
+    start = (session * scale.files_per_session) % scale.files
+    return [
+        (start + i) % scale.files
+        for i in range(min(scale.files_per_session, scale.files))
+    ]
+
+
+def _hits(rng: random.Random, lines: int) -> list[int]:
+    # roughly 70% of the lines are covered, with a long tail of hit counts
+    return [
+        0 if rng.random() < 0.3 else int(rng.expovariate(0.2)) + 1 for _ in range(lines)
+    ]
+
+
+def generate_lcov(rng: random.Random, files: list[int], lines: int) -> bytes:
+    out = []
+    for file_number in files:
+        out.append(f"SF:{file_path(file_number)}")
+        for line, hits in enumerate(_hits(rng, lines), start=1):
+            out.append(f"DA:{line},{hits}")
+        out.append("end_of_record")
+    return "\n".join(out).encode()
+
+
+def generate_cobertura(rng: random.Random, files: list[int], lines: int) -> bytes:
+    out = [
+        '<?xml version="1.0" ?>',
+        '<coverage timestamp="1700000000" version="7.4.0">',
+        "<sources><source>/app</source></sources>",
+        '<packages><package name="src"><classes>',
+    ]
+    for file_number in files:
+        out.append(
+            f'<class name="module_{file_number}" filename="{file_path(file_number)}">'
+        )
+        out.append("<methods/><lines>")
+        for line, hits in enumerate(_hits(rng, lines), start=1):
+            if line % 10 == 0:
+                out.append(
+                    f'<line number="{line}" hits="{hits}" branch="true" '
+                    f'condition-coverage="50% (1/2)" missing-branches="{line + 1}"/>'
+                )
+            else:
+                out.append(f'<line number="{line}" hits="{hits}"/>')
+        out.append("</lines></class>")
+    out.append("</classes></package></packages></coverage>")
+    return "\n".join(out).encode()
+
+
+def generate_go(rng: random.Random, files: list[int], lines: int) -> bytes:
+    out = ["mode: count"]
+    for file_number in files:
+        path = (
+            f"github.com/example/project/{file_path(file_number).replace('.py', '.go')}"
+        )
+        for line, hits in enumerate(_hits(rng, lines), start=1):
+            out.append(f"{path}:{line}.2,{line}.40 1 {hits}")
+    return "\n".join(out).encode()
+
+
+def generate_jacoco(rng: random.Random, files: list[int], lines: int) -> bytes:
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<report name="project name">']
+    for file_number in files:
+        package, name = file_path(file_number).replace(".py", "").rsplit("/", 1)
+        out.append(f'<package name="{package}">')
+        out.append(f'<class name="{package}/{name}" sourcefilename="{name}.java">')
+        out.append(
+            '<method name="run" desc="()V" line="1">'
+            '<counter type="COMPLEXITY" missed="1" covered="2"/></method>'
+        )
+        out.append("</class>")
+        out.append(f'<sourcefile name="{name}.java">')
+        for line, hits in enumerate(_hits(rng, lines), start=1):
+            if line % 10 == 0:
+                out.append(f'<line nr="{line}" mi="0" ci="{hits}" mb="1" cb="1"/>')
+            else:
+                out.append(f'<line nr="{line}" mi="0" ci="{hits}" mb="0" cb="0"/>')
+        out.append("</sourcefile></package>")
+    out.append("</report>")
+    return "\n".join(out).encode()
+
+
+GENERATORS = {
+    "lcov": generate_lcov,
+    "cobertura": generate_cobertura,
+    "go": generate_go,
+    "jacoco": generate_jacoco,
+}
+
+
+def generate_raw_upload(
+    rng: random.Random, format: str, files: list[int], lines: int
+) -> bytes:
+    """
+    Generates a legacy-format raw upload containing a single coverage file.
+    """
+    contents = GENERATORS[format](rng, files, lines)
+    return b"".join(
+        [
+            b"# path=coverage.",
+            format.encode(),
+            b"\n",
+            contents,
+            b"\n<<<<<< EOF\n",
+        ]
+    )
+
+
+def fixture_raw_upload(name: str = "sample_uploaded_report_1.txt") -> bytes:
+    return (FIXTURES_DIR / name).read_bytes()
+
+
+def generate_diff(rng: random.Random, scale: Scale, changed_files: int = 50) -> dict:
+    """
+    Generates a diff in the format returned by the git providers, modifying a
+    contiguous block of lines in each of the changed files.
+    """
+    files = {}
+    for file_number in rng.sample(range(scale.files), min(changed_files, scale.files)):
+        start = rng.randint(1, max(1, scale.lines_per_file - 10))
+        removed, added = rng.randint(0, 5), rng.randint(1, 10)
+        files[file_path(file_number)] = {
+            "type": "modified",
+            "segments": [
+                {
+                    "header": [str(start), str(removed), str(start), str(added)],
+                    "lines": ["-"] * removed + ["+"] * added,
+                }
+            ],
+        }
+    return {"files": files}
+
+
+def generate_testruns(
+    rng: random.Random, testruns: int, tests_per_class: int = 20
+) -> list[dict]:
+    """
+    Generates parsed JUnit testruns, like `test_results_parser` returns them.
+    A tenth of the testruns are reruns of an earlier test of the upload.
+    """
+    outcomes = ["pass"] * 17 + ["failure", "error", "skip"]
+    results = []
+    for number in range(testruns):
+        test_number = rng.randrange(number) if number and rng.random() < 0.1 else number
+        classname = f"tests.test_module_{test_number // tests_per_class}"
+        name = f"test_case_{test_number}"
+        outcome = rng.choice(outcomes)
+        results.append(
+            {
+                "name": name,
+                "classname": classname,
+                "testsuite": "pytest",
+                "computed_name": f"{classname}::{name}",
+                "filename": f"{classname.replace('.', '/')}.py",
+                "duration": round(rng.uniform(0.001, 2.0), 3),
+                "outcome": outcome,
+                "failure_message": (
+                    f"AssertionError: assert {test_number} == 0\n"
+                    if outcome in ("failure", "error")
+                    else None
+                ),
+                "build_url": None,
+            }
+        )
+    return results
@@ -0,0 +1,149 @@
+"""
+Timing, memory tracking and baseline comparison for the benchmarks.
+
+Peak memory is measured with `tracemalloc`, which only sees allocations made
+through the Python allocator and slows down execution. Timings are thus only
+comparable to baselines that were recorded the same way, which is always the
+case for baselines written by this harness.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+# Timings below this are dominated by noise, and never count as a regression
+MIN_SIGNIFICANT_SECONDS = 0.05
+
+
+@dataclass
+class PhaseResult:
+    seconds: float = 0.0
+    peak_memory: int = 0
+    """
+    Peak memory allocated during the phase, in bytes, on top of what was
+    allocated before the phase started.
+    """
+    calls: int = 0
+
+
+@dataclass
+class Regression:
+    phase: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        change = (self.current / self.baseline - 1) * 100 if self.baseline else 0
+        return (
+            f"{self.phase}: {self.metric} went from {self.baseline:,.3f} "
+            f"to {self.current:,.3f} (+{change:.1f}%)"
+        )
+
+
+@dataclass
+class BenchmarkRun:
+    scale: str
+    phases: dict[str, PhaseResult] = field(default_factory=dict)
+
+    @contextmanager
+    def measure(self, phase: str):
+        """
+        Measures the wrapped block as (one call of) the given phase.
+
+        A phase can be measured multiple times, for example once per upload,
+        in which case the timings add up and the peak memory is the maximum.
+        """
+        result = self.phases.setdefault(phase, PhaseResult())
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            result.seconds += elapsed
+            result.peak_memory = max(result.peak_memory, peak - memory_before)
+            result.calls += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "scale": self.scale,
+            "phases": {name: asdict(result) for name, result in self.phases.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BenchmarkRun":
+        return cls(
+            scale=data["scale"],
+            phases={
+                name: PhaseResult(**result) for name, result in data["phases"].items()
+            },
+        )
+
+    def format(self) -> str:
+        lines = [f"{'phase':<45} {'calls':>6} {'seconds':>10} {'peak MiB':>10}"]
+        for name, result in self.phases.items():
+            lines.append(
+                f"{name:<45} {result.calls:>6} {result.seconds:>10.3f} "
+                f"{result.peak_memory / 2**20:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def best_of(runs: list[BenchmarkRun]) -> BenchmarkRun:
+    """
+    Combines repeated runs, keeping the lowest time and memory of each phase,
+    which are the least affected by noise from the rest of the system.
+    """
+    best = BenchmarkRun(scale=runs[0].scale)
+    for run in runs:
+        for name, result in run.phases.items():
+            if name not in best.phases:
+                best.phases[name] = PhaseResult(**asdict(result))
+                continue
+            current = best.phases[name]
+            current.seconds = min(current.seconds, result.seconds)
+            current.peak_memory = min(current.peak_memory, result.peak_memory)
+    return best
+
+
+def save_baseline(run: BenchmarkRun, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run.to_dict(), indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: Path) -> BenchmarkRun:
+    return BenchmarkRun.from_dict(json.loads(path.read_text()))
+
+
+def find_regressions(
+    baseline: BenchmarkRun, current: BenchmarkRun, threshold: float
+) -> list[Regression]:
+    """
+    Returns all the phases whose time or peak memory grew by more than `threshold`
+    (a fraction, so `0.2` means 20%) compared to the baseline.
+    Phases that only exist in one of the two runs are ignored.
+    """
+    regressions = []
+    for name, result in current.phases.items():
+        if (base := baseline.phases.get(name)) is None:
+            continue
+        if (
+            result.seconds >= MIN_SIGNIFICANT_SECONDS
+            and result.seconds > base.seconds * (1 + threshold)
+        ):
+            regressions.append(
+                Regression(name, "seconds", base.seconds, result.seconds)
+            )
+        if result.peak_memory > base.peak_memory * (1 + threshold):
+            regressions.append(
+                Regression(name, "peak_memory", base.peak_memory, result.peak_memory)
+            )
+    return regressions
@@ -0,0 +1,94 @@
+import random
+
+from benchmarks.fakes import InMemoryRedis
+from benchmarks.generators import (
+    SCALES,
+    generate_raw_upload,
+    generate_testruns,
+    session_files,
+)
+from benchmarks.harness import (
+    BenchmarkRun,
+    PhaseResult,
+    best_of,
+    find_regressions,
+    load_baseline,
+    save_baseline,
+)
+
+
+def test_generators_are_deterministic():
+    files = session_files(SCALES["small"], 0)
+    for format in ("lcov", "cobertura", "go"):
+        first = generate_raw_upload(random.Random(1), format, files, 10)
+        assert first == generate_raw_upload(random.Random(1), format, files, 10)
+        assert first != generate_raw_upload(random.Random(2), format, files, 10)
+
+
+def test_testruns_are_deterministic():
+    first = generate_testruns(random.Random(1), 100)
+    assert len(first) == 100
+    assert first == generate_testruns(random.Random(1), 100)
+    assert first != generate_testruns(random.Random(2), 100)
+
+
+def test_sessions_cover_all_files():
+    for scale in SCALES.values():
+        covered = set()
+        for session in range(scale.sessions):
+            covered.update(session_files(scale, session))
+        assert covered == set(range(scale.files))
+
+
+def test_measure_accumulates():
+    run = BenchmarkRun(scale="small")
+    for _ in range(2):
+        with run.measure("phase"):
+            sum(range(1000))
+    assert run.phases["phase"].calls == 2
+    assert run.phases["phase"].seconds > 0
+
+
+def test_baselines_and_regressions(tmp_path):
+    baseline = BenchmarkRun(
+        scale="small",
+        phases={
+            "fast": PhaseResult(seconds=0.001, peak_memory=100, calls=1),
+            "slow": PhaseResult(seconds=1.0, peak_memory=1000, calls=1),
+        },
+    )
+    save_baseline(baseline, tmp_path / "small.json")
+    assert load_baseline(tmp_path / "small.json") == baseline
+
+    current = best_of(
+        [
+            BenchmarkRun(
+                scale="small",
+                phases={
+                    "fast": PhaseResult(seconds=0.01, peak_memory=100, calls=1),
+                    "slow": PhaseResult(seconds=2.0, peak_memory=1000, calls=1),
+                    "new": PhaseResult(seconds=5.0, peak_memory=1000, calls=1),
+                },
+            ),
+            BenchmarkRun(
+                scale="small",
+                phases={"slow": PhaseResult(seconds=1.5, peak_memory=2000, calls=1)},
+            ),
+        ]
+    )
+    regressions = find_regressions(baseline, current, threshold=0.2)
+    # `fast` is below the noise floor, and `new` has no baseline
+    assert [(r.phase, r.metric, r.current) for r in regressions] == [
+        ("slow", "seconds", 1.5)
+    ]
+
+
+def test_in_memory_redis():
+    redis = InMemoryRedis()
+    with redis.pipeline() as pipeline:
+        pipeline.hmset("key", {"field": b"value"})
+        pipeline.expire("key", 10)
+        assert pipeline.execute() == [True, True]
+    assert redis.hgetall("key") == {b"field": b"value"}
+    assert redis.delete("key", "missing") == 1
+    assert redis.hgetall("key") == {}
@@ -1,6 +1,11 @@
+import time
+from collections import OrderedDict
+from typing import Iterable
+
 import shared.celery_config as shared_celery_config
 from shared.billing import BillingPlan
 from shared.celery_router import route_tasks_based_on_user_plan
+from shared.metrics import Counter
 
 from database.engine import get_db_session
 from database.models.core import Commit, CompareCommit, Owner, Repository
@@ -8,22 +13,103 @@ from database.models.labelanalysis import LabelAnalysisRequest
 from database.models.profiling import ProfilingCommit, ProfilingUpload
 from database.models.staticanalysis import StaticAnalysisSuite
 
+PLAN_ROUTING_CACHE_TTL_SECONDS = 30
+PLAN_ROUTING_CACHE_MAXSIZE = 10_000
+
+PLAN_ROUTING_QUERIES_AVOIDED = Counter(
+    "worker_task_routing_plan_queries_avoided",
+    "Number of owner plan lookups for task routing served from the in-process cache",
+    ["lookup"],
+)
+
+
+class PlanRoutingCache:
+    """
+    In-process cache of the owner plan used to pick the queue and time limits
+    of a task, keyed by `ownerid` or `repoid`.
+
+    Entries are short-lived so that plan changes made by other processes are
+    picked up quickly. Code paths that change an owner's plan should call
+    `invalidate_plan_routing_cache` so the current process sees it right away.
+
+    At most `maxsize` entries are kept, evicting the least recently used ones.
+    """
+
+    def __init__(
+        self,
+        ttl: int = PLAN_ROUTING_CACHE_TTL_SECONDS,
+        maxsize: int = PLAN_ROUTING_CACHE_MAXSIZE,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # (lookup, identifier) -> (ownerid, plan, expires_at)
+        self._entries: OrderedDict[tuple[str, int], tuple[int, str, float]] = (
+            OrderedDict()
+        )
+
+    def get(self, lookup: str, identifier: int) -> str | None:
+        entry = self._entries.get((lookup, identifier))
+        if entry is None:
+            return None
+        _, plan, expires_at = entry
+        if expires_at < time.monotonic():
+            self._entries.pop((lookup, identifier), None)
+            return None
+        self._entries.move_to_end((lookup, identifier))
+        PLAN_ROUTING_QUERIES_AVOIDED.labels(lookup=lookup).inc()
+        return plan
+
+    def has(self, lookup: str, identifier: int) -> bool:
+        entry = self._entries.get((lookup, identifier))
+        return entry is not None and entry[2] >= time.monotonic()
+
+    def set(self, lookup: str, identifier: int, ownerid: int, plan: str) -> None:
+        expires_at = time.monotonic() + self.ttl
+        for key in ((lookup, identifier), ("ownerid", ownerid)):
+            self._entries[key] = (ownerid, plan, expires_at)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, ownerid: int) -> None:
+        self._entries = OrderedDict(
+            (key, entry) for key, entry in self._entries.items() if entry[0] != ownerid
+        )
+
+    def clear(self) -> None:
+        self._entries = OrderedDict()
+
+
+plan_routing_cache = PlanRoutingCache()
+
+
+def invalidate_plan_routing_cache(ownerid: int) -> None:
+    plan_routing_cache.invalidate(ownerid)
+
 
 def _get_user_plan_from_ownerid(db_session, ownerid, *args, **kwargs) -> str:
+    cached_plan = plan_routing_cache.get("ownerid", ownerid)
+    if cached_plan is not None:
+        return cached_plan
     result = db_session.query(Owner.plan).filter(Owner.ownerid == ownerid).first()
     if result:
+        plan_routing_cache.set("ownerid", ownerid, ownerid, result.plan)
         return result.plan
     return BillingPlan.users_basic.db_name
 
 
 def _get_user_plan_from_repoid(db_session, repoid, *args, **kwargs) -> str:
+    cached_plan = plan_routing_cache.get("repoid", repoid)
+    if cached_plan is not None:
+        return cached_plan
     result = (
-        db_session.query(Owner.plan)
+        db_session.query(Owner.ownerid, Owner.plan)
         .join(Repository.owner)
         .filter(Repository.repoid == repoid)
         .first()
     )
     if result:
+        plan_routing_cache.set("repoid", repoid, result.ownerid, result.plan)
         return result.plan
     return BillingPlan.users_basic.db_name
 
@@ -105,45 +191,96 @@ def _get_user_plan_from_suite_id(dbsession, suite_id, *args, **kwargs) -> str:
     return BillingPlan.users_basic.db_name
 
 
+OWNER_PLAN_LOOKUP_FUNCS = {
+    # from ownerid
+    shared_celery_config.delete_owner_task_name: _get_user_plan_from_ownerid,
+    shared_celery_config.send_email_task_name: _get_user_plan_from_ownerid,
+    shared_celery_config.sync_repos_task_name: _get_user_plan_from_ownerid,
+    shared_celery_config.sync_teams_task_name: _get_user_plan_from_ownerid,
+    # from org_ownerid
+    shared_celery_config.new_user_activated_task_name: _get_user_plan_from_org_ownerid,
+    # from repoid
+    shared_celery_config.pre_process_upload_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.upload_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.upload_processor_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.notify_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.commit_update_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.flush_repo_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.status_set_error_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.status_set_pending_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.pulls_task_name: _get_user_plan_from_repoid,
+    shared_celery_config.upload_finisher_task_name: _get_user_plan_from_repoid,  # didn't want to directly import the task module
+    shared_celery_config.manual_upload_completion_trigger_task_name: _get_user_plan_from_repoid,
+    # from profiling_commitid
+    shared_celery_config.profiling_collection_task_name: _get_user_plan_from_profiling_commit,
+    shared_celery_config.profiling_summarization_task_name: _get_user_plan_from_profiling_commit,
+    # from profiling_upload_id
+    shared_celery_config.profiling_normalization_task_name: _get_user_plan_from_profiling_upload,
+    # from comparison_id
+    shared_celery_config.compute_comparison_task_name: _get_user_plan_from_comparison_id,
+    # from label_request_id
+    shared_celery_config.label_analysis_task_name: _get_user_plan_from_label_request_id,
+    # from suite_id
+    shared_celery_config.static_analysis_task_name: _get_user_plan_from_suite_id,
+}
+
+
 def _get_user_plan_from_task(dbsession, task_name: str, task_kwargs: dict) -> str:
-    owner_plan_lookup_funcs = {
-        # from ownerid
-        shared_celery_config.delete_owner_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.send_email_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.sync_repos_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.sync_teams_task_name: _get_user_plan_from_ownerid,
-        # from org_ownerid
-        shared_celery_config.new_user_activated_task_name: _get_user_plan_from_org_ownerid,
-        # from repoid
-        shared_celery_config.pre_process_upload_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_processor_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.notify_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.commit_update_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.flush_repo_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.status_set_error_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.status_set_pending_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.pulls_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_finisher_task_name: _get_user_plan_from_repoid,  # didn't want to directly import the task module
-        shared_celery_config.manual_upload_completion_trigger_task_name: _get_user_plan_from_repoid,
-        # from profiling_commitid
-        shared_celery_config.profiling_collection_task_name: _get_user_plan_from_profiling_commit,
-        shared_celery_config.profiling_summarization_task_name: _get_user_plan_from_profiling_commit,
-        # from profiling_upload_id
-        shared_celery_config.profiling_normalization_task_name: _get_user_plan_from_profiling_upload,
-        # from comparison_id
-        shared_celery_config.compute_comparison_task_name: _get_user_plan_from_comparison_id,
-        # from label_request_id
-        shared_celery_config.label_analysis_task_name: _get_user_plan_from_label_request_id,
-        # from suite_id
-        shared_celery_config.static_analysis_task_name: _get_user_plan_from_suite_id,
-    }
-    func_to_use = owner_plan_lookup_funcs.get(
+    func_to_use = OWNER_PLAN_LOOKUP_FUNCS.get(
         task_name, lambda *args, **kwargs: BillingPlan.users_basic.db_name
     )
     return func_to_use(dbsession, **task_kwargs)
 
 
+def prefetch_user_plans(dbsession, signatures: Iterable) -> None:
+    """
+    Resolves the plans of every signature about to be scheduled together
+    (e.g. the header and body of a `chord`, or the tasks of a `chain`) with at
+    most one query per lookup key, so that the `apply_async` of each of them
+    is served from `plan_routing_cache`.
+    """
+    repoids: set[int] = set()
+    ownerids: set[int] = set()
+    for signature in signatures:
+        func = OWNER_PLAN_LOOKUP_FUNCS.get(signature.task)
+        task_kwargs = signature.kwargs or {}
+        if func is _get_user_plan_from_repoid and "repoid" in task_kwargs:
+            repoids.add(task_kwargs["repoid"])
+        elif func is _get_user_plan_from_ownerid and "ownerid" in task_kwargs:
+            ownerids.add(task_kwargs["ownerid"])
+        elif func is _get_user_plan_from_org_ownerid and "org_ownerid" in task_kwargs:
+            ownerids.add(task_kwargs["org_ownerid"])
+
+    repoids = {
+        repoid for repoid in repoids if not plan_routing_cache.has("repoid", repoid)
+    }
+    if repoids:
+        results = (
+            dbsession.query(Repository.repoid, Owner.ownerid, Owner.plan)
+            .join(Repository.owner)
+            .filter(Repository.repoid.in_(repoids))
+            .all()
+        )
+        for result in results:
+            plan_routing_cache.set("repoid", result.repoid, result.ownerid, result.plan)
+
+    ownerids = {
+        ownerid
+        for ownerid in ownerids
+        if not plan_routing_cache.has("ownerid", ownerid)
+    }
+    if ownerids:
+        results = (
+            dbsession.query(Owner.ownerid, Owner.plan)
+            .filter(Owner.ownerid.in_(ownerids))
+            .all()
+        )
+        for result in results:
+            plan_routing_cache.set(
+                "ownerid", result.ownerid, result.ownerid, result.plan
+            )
+
+
 def route_task(name, args, kwargs, options, task=None, **kw):
     """Function to dynamically route tasks to the proper queue.
     Docs: https://docs.celeryq.dev/en/stable/userguide/routing.html#routers
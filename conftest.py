@@ -13,9 +13,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy_utils import database_exists
 
 from celery_config import initialize_logging
+from celery_task_router import plan_routing_cache
 from database.base import Base
 from database.engine import json_dumps
 from helpers.environment import _get_cached_current_env
+from services.redis import redis_client_registry
 
 
 # @pytest.hookimpl(tryfirst=True)
@@ -417,3 +419,13 @@ def mock_feature(mocker, request):
         return default
 
     return mocker.patch.object(Feature, "check_value", check_value)
+
+
+@pytest.fixture(autouse=True)
+def clear_plan_routing_cache():
+    plan_routing_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_redis_client_registry():
+    redis_client_registry.reset()
@@ -3,12 +3,12 @@ import string
 import uuid
 from datetime import datetime
 from functools import cached_property
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from shared.plan.constants import PlanName
-from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint, types
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint, literal, types
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import Session, backref, relationship, validates
+from sqlalchemy.orm import Session, aliased, backref, relationship, validates
 from sqlalchemy.schema import FetchedValue
 
 import database.models
@@ -322,6 +322,39 @@ class OwnerInstallationNameToUseForTask(CodecovBaseModel, MixinBaseClass):
     )
 
 
+class CommitAncestor(NamedTuple):
+    """
+    The columns of an ancestor `Commit` which are needed to pick one of them,
+    without loading the whole row (see `Commit.get_ancestors`).
+    """
+
+    id: int
+    commitid: str
+    parent_commit_id: str | None
+    state: str | None
+
+
+def _ancestor_chain(
+    rows: list[tuple[int, str, str | None, str | None, int]],
+) -> list[CommitAncestor]:
+    """
+    Picks a single chain of ancestors out of the `(id, commitid, parent, state, depth)`
+    rows of the `Commit.get_ancestors` query, ordered by depth.
+
+    `commitid`s should be unique within a repository, but if they are not, the
+    query fans out into the parents of every duplicate. The first commit found on
+    every level that is the parent of the one kept on the level below is kept.
+    """
+    chain: list[CommitAncestor] = []
+    for id_, commitid, parent_commit_id, state, depth in rows:
+        if depth != len(chain) + 1:
+            continue
+        if chain and commitid != chain[-1].parent_commit_id:
+            continue
+        chain.append(CommitAncestor(id_, commitid, parent_commit_id, state))
+    return chain
+
+
 class Commit(CodecovBaseModel):
     __tablename__ = "commits"
 
@@ -368,6 +401,52 @@ class Commit(CodecovBaseModel):
             .first()
         )
 
+    def get_ancestors(self, max_depth: int) -> list["CommitAncestor"]:
+        """
+        Returns up to `max_depth` ancestors of this commit, following its parents
+        one by one, starting with the parent commit.
+
+        The whole chain is fetched in a single recursive query, instead of one
+        `get_parent_commit` query per ancestor. Only the columns needed to pick
+        an ancestor are fetched, the picked one can then be loaded by its `id`.
+        """
+        db_session = self.get_db_session()
+        ancestors = (
+            db_session.query(
+                Commit.id_.label("id"),
+                Commit.commitid.label("commitid"),
+                Commit.parent_commit_id.label("parent"),
+                Commit.state.label("state"),
+                literal(1).label("depth"),
+            )
+            .filter(
+                Commit.repoid == self.repoid,
+                Commit.commitid == self.parent_commit_id,
+            )
+            .cte("ancestors", recursive=True)
+        )
+        child = aliased(ancestors, name="child")
+        parent = aliased(Commit, name="parent_commit")
+        ancestors = ancestors.union_all(
+            db_session.query(
+                parent.id_,
+                parent.commitid,
+                parent.parent_commit_id,
+                parent.state,
+                child.c.depth + 1,
+            ).filter(
+                parent.repoid == self.repoid,
+                parent.commitid == child.c.parent,
+                child.c.depth < max_depth,
+            )
+        )
+        rows = (
+            db_session.query(ancestors)
+            .order_by(ancestors.c.depth, ancestors.c.id)
+            .all()
+        )
+        return _ancestor_chain(rows)
+
     @property
     def report(self):
         db_session = self.get_db_session()
@@ -137,3 +137,43 @@ class TestArchiveField(object):
         assert test_class.archive_field == some_json
         # Cache is updated on write
         assert mock_read_file.call_count == 0
+
+    def test_archive_set_serialized_db_field(self, sqlalchemy_db, mocker):
+        commit = CommitFactory()
+        test_class = self.ClassWithArchiveField(commit, "db_value", None, False)
+        mock_archive_service = mocker.patch("database.utils.ArchiveService")
+
+        self.ClassWithArchiveField.archive_field.set_serialized(
+            test_class, b'{"some": "data"}'
+        )
+        mock_archive_service.assert_not_called()
+        assert test_class._archive_field == {"some": "data"}
+        assert test_class.archive_field == {"some": "data"}
+
+    def test_archive_set_serialized_archive_field(self, sqlalchemy_db, mocker):
+        commit = CommitFactory()
+        test_class = self.ClassWithArchiveField(commit, "db_value", None, True)
+        mock_archive_service = mocker.patch("database.utils.ArchiveService")
+        archive_service = mock_archive_service.return_value
+        archive_service.write_serialized_json_data_to_storage.return_value = (
+            "path/to/written/object"
+        )
+        test_class._archive_field_storage_path = "path/to/old/data"
+        assert test_class.archive_field == "db_value"
+
+        self.ClassWithArchiveField.archive_field.set_serialized(
+            test_class, b'{"some": "data"}'
+        )
+        archive_service.write_serialized_json_data_to_storage.assert_called_once_with(
+            commit_id=commit.commitid,
+            table="test_table",
+            field="archive_field",
+            external_id="external_id",
+            data=b'{"some": "data"}',
+        )
+        archive_service.delete_file.assert_called_once_with("path/to/old/data")
+        assert test_class._archive_field is None
+        assert test_class._archive_field_storage_path == "path/to/written/object"
+        # the written data is decoded on access, without reading it from storage
+        assert test_class.archive_field == {"some": "data"}
+        archive_service.read_file.assert_not_called()
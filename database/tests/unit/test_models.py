@@ -20,7 +20,9 @@ from database.models import (
 from database.models.core import (
     GITHUB_APP_INSTALLATION_DEFAULT_NAME,
     AccountsUsers,
+    CommitAncestor,
     GithubAppInstallation,
+    _ancestor_chain,
 )
 from database.models.reports import ReportDetails
 from database.tests.factories import (
@@ -653,6 +655,55 @@ class TestCommitModel(object):
         mock_archive.assert_called()
         mock_read_file.assert_called_with(storage_path)
 
+    def test_get_ancestors(self, dbsession):
+        root = CommitFactory(parent_commit_id=None, state="complete")
+        dbsession.add(root)
+        dbsession.flush()
+        chain = [root]
+        for state in ("complete", "error", "pending", "skipped"):
+            commit = CommitFactory(
+                repository=root.repository,
+                parent_commit_id=chain[-1].commitid,
+                state=state,
+            )
+            dbsession.add(commit)
+            dbsession.flush()
+            chain.append(commit)
+        head = chain[-1]
+
+        assert [ancestor.id for ancestor in head.get_ancestors(10)] == [
+            commit.id_ for commit in chain[-2::-1]
+        ]
+        assert head.get_ancestors(2) == [
+            CommitAncestor(
+                chain[-2].id_, chain[-2].commitid, chain[-3].commitid, "pending"
+            ),
+            CommitAncestor(
+                chain[-3].id_, chain[-3].commitid, chain[-4].commitid, "error"
+            ),
+        ]
+        assert [commit.state for commit in head.get_ancestors(3)] == [
+            "pending",
+            "error",
+            "complete",
+        ]
+        assert root.get_ancestors(10) == []
+
+    def test_ancestor_chain_with_duplicate_commitids(self):
+        # commit "b" exists twice, with different parents
+        rows = [
+            (1, "b", "c", "complete", 1),
+            (2, "b", "x", "error", 1),
+            (3, "c", "d", "pending", 2),
+            (4, "x", None, "complete", 2),
+            (5, "d", None, "complete", 3),
+        ]
+        assert _ancestor_chain(rows) == [
+            CommitAncestor(1, "b", "c", "complete"),
+            CommitAncestor(3, "c", "d", "pending"),
+            CommitAncestor(5, "d", None, "complete"),
+        ]
+
 
 class TestGithubAppInstallationModel(object):
     def test_covers_all_repos(self, dbsession: Session):
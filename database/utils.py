@@ -90,6 +90,7 @@ class ArchiveField:
         self.db_field_name = "_" + name
         self.archive_field_name = "_" + name + "_storage_path"
         self.cached_value_property_name = f"__{self.public_name}_cached_value"
+        self.serialized_value_property_name = f"__{self.public_name}_serialized_value"
 
     def _get_value_from_archive(self, obj):
         repository = obj.get_repository()
@@ -148,11 +149,18 @@ class ArchiveField:
         return self.default_value_class()
 
     def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
         cached_value = getattr(obj, self.cached_value_property_name, None)
         if cached_value:
             return cached_value
+        serialized_value = getattr(obj, self.serialized_value_property_name, None)
         db_field = getattr(obj, self.db_field_name)
-        if db_field is not None:
+        if serialized_value is not None:
+            # the value was written with `set_serialized`, and is decoded on first access
+            value = self.rehydrate_fn(obj, orjson.loads(serialized_value))
+            setattr(obj, self.serialized_value_property_name, None)
+        elif db_field is not None:
             value = self.rehydrate_fn(obj, db_field)
         else:
             value = self._get_value_from_archive(obj)
@@ -174,10 +182,40 @@ class ArchiveField:
                 data=value,
                 encoder=self.json_encoder,
             )
-            if old_file_path is not None and path != old_file_path:
-                archive_service.delete_file(old_file_path)
-            setattr(obj, self.archive_field_name, path)
-            setattr(obj, self.db_field_name, None)
+            self._replace_archive_path(obj, archive_service, old_file_path, path)
         else:
             setattr(obj, self.db_field_name, value)
         setattr(obj, self.cached_value_property_name, value)
+        setattr(obj, self.serialized_value_property_name, None)
+
+    def set_serialized(self, obj, data: bytes):
+        """
+        Sets the field of `obj` to a value that is already serialized to JSON.
+
+        When writing to storage, `data` is written as is, and only decoded
+        if the field is accessed afterwards.
+        """
+        if not self.should_write_to_storage_fn(obj):
+            self.__set__(obj, orjson.loads(data))
+            return
+
+        archive_service = ArchiveService(repository=obj.get_repository())
+        old_file_path = getattr(obj, self.archive_field_name)
+        path = archive_service.write_serialized_json_data_to_storage(
+            commit_id=obj.get_commitid(),
+            table=obj.__tablename__,
+            field=self.public_name,
+            external_id=obj.external_id,
+            data=data,
+        )
+        self._replace_archive_path(obj, archive_service, old_file_path, path)
+        setattr(obj, self.cached_value_property_name, None)
+        setattr(obj, self.serialized_value_property_name, data)
+
+    def _replace_archive_path(
+        self, obj, archive_service: ArchiveService, old_file_path, path: str
+    ):
+        if old_file_path is not None and path != old_file_path:
+            archive_service.delete_file(old_file_path)
+        setattr(obj, self.archive_field_name, path)
+        setattr(obj, self.db_field_name, None)
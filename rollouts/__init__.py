@@ -14,3 +14,11 @@ SHOW_IMPACT_ANALYSIS_DEPRECATION_MSG = Feature(
 )
 
 NEW_TA_TASKS = Feature("new_ta_tasks")
+
+SYNC_REPOS_BULK_UPSERT = Feature("sync_repos_bulk_upsert")
+
+TA_COPY_INGEST = Feature("ta_copy_ingest")
+
+UPLOAD_FINISHER_MERGE_COORDINATOR = Feature("upload_finisher_merge_coordinator")
+
+UPLOAD_FINISHER_DEFERRED_REPORT_SAVE = Feature("upload_finisher_deferred_report_save")
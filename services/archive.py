@@ -172,6 +172,22 @@ class ArchiveService(object):
         *,
         encoder=ReportEncoder,
     ):
+        stringified_data = json.dumps(data, cls=encoder)
+        return self.write_serialized_json_data_to_storage(
+            commit_id, table, field, external_id, stringified_data
+        )
+
+    def write_serialized_json_data_to_storage(
+        self,
+        commit_id,
+        table: str,
+        field: str,
+        external_id: str,
+        data: str | bytes,
+    ) -> str:
+        """
+        Same as `write_json_data_to_storage`, for `data` that is already serialized to JSON.
+        """
         if commit_id is None:
             # Some classes don't have a commit associated with them
             # For example Pull belongs to multiple commits.
@@ -191,11 +207,12 @@ class ArchiveService(object):
                 field=field,
                 external_id=external_id,
             )
-        stringified_data = json.dumps(data, cls=encoder)
-        self.write_file(path, stringified_data)
+        self.write_file(path, data)
         return path
 
-    def write_chunks(self, commit_sha, data, report_code=None) -> str:
+    def write_chunks(
+        self, commit_sha, data, report_code=None, *, is_already_gzipped=False
+    ) -> str:
         """
         Convenience method to write a chunks.txt file to storage.
         """
@@ -207,7 +224,7 @@ class ArchiveService(object):
             chunks_file_name=chunks_file_name,
         )
 
-        self.write_file(path, data)
+        self.write_file(path, data, is_already_gzipped=is_already_gzipped)
         return path
 
     @sentry_sdk.trace
@@ -12,26 +12,31 @@ from shared.django_apps.profiling.models import ProfilingUpload
 from shared.django_apps.reports.models import CommitReport, ReportDetails
 from shared.django_apps.reports.models import ReportSession as Upload
 from shared.django_apps.staticanalysis.models import StaticAnalysisSingleFileSnapshot
-from shared.storage.exceptions import FileNotInStorageError
 
 from services.archive import ArchiveService, MinioEndpoints
 from services.cleanup.utils import CleanupContext, CleanupResult
 
 MANUAL_QUERY_CHUNKSIZE = 5_000
-DELETE_FILES_BATCHSIZE = 50
 
 
 def cleanup_files_batched(
     context: CleanupContext, buckets_paths: dict[str, list[str]]
 ) -> int:
-    def delete_file(bucket_path: tuple[str, str]) -> bool:
-        try:
-            return context.storage.delete_file(bucket_path[0], bucket_path[1])
-        except FileNotInStorageError:
-            return False
-
-    iter = ((bucket, path) for bucket, paths in buckets_paths.items() for path in paths)
-    results = context.threadpool.map(delete_file, iter)
+    # storages without a bulk delete get one request per file, which are run concurrently
+    batchsize = context.storage.bulk_delete_size
+
+    def delete_batch(bucket_batch: tuple[str, list[str]]) -> int:
+        return sum(context.storage.delete_files(*bucket_batch))
+
+    batches = []
+    for bucket, paths in buckets_paths.items():
+        paths = list(paths)
+        batches.extend(
+            (bucket, paths[start : start + batchsize])
+            for start in range(0, len(paths), batchsize)
+        )
+
+    results = context.threadpool.map(delete_batch, batches)
     return sum(results)
 
 
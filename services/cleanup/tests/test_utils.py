@@ -0,0 +1,66 @@
+from minio.deleteobjects import DeleteError
+from shared.storage.exceptions import FileNotInStorageError
+from shared.storage.memory import MemoryStorageService
+
+from services.cleanup.utils import CleanupStorage, S3CleanupStorage, cleanup_storage
+
+
+class InMemoryS3Client:
+    """
+    Stands in for the `Minio` client of a `MinioStorageService`, serving
+    `DeleteObjects` requests from a `MemoryStorageService`.
+    """
+
+    def __init__(self, storage: MemoryStorageService, denied: set[str]):
+        self.storage = storage
+        self.denied = denied
+        self.requests: list[list[str]] = []
+
+    def remove_objects(self, bucket, delete_object_list):
+        names = [obj._name for obj in delete_object_list]
+        self.requests.append(names)
+        for name in names:
+            if name in self.denied:
+                yield DeleteError("AccessDenied", "Access Denied", name, None)
+                continue
+            try:
+                self.storage.delete_file(bucket, name)
+            except FileNotInStorageError:
+                yield DeleteError("NoSuchKey", "Not Found", name, None)
+
+
+def test_cleanup_storage_without_bulk_delete():
+    storage = cleanup_storage(MemoryStorageService({}))
+    assert type(storage) is CleanupStorage
+    assert storage.bulk_delete_size == 1
+
+
+def test_delete_files_one_by_one():
+    storage = MemoryStorageService({})
+    storage.write_file("archive", "a", "a")
+    storage.write_file("archive", "b", "b")
+    cleanup = CleanupStorage(storage)
+
+    assert cleanup.delete_files("archive", ["a", "missing", "b"]) == [
+        True,
+        False,
+        True,
+    ]
+    assert cleanup.delete_files("archive", ["a", "b"]) == [False, False]
+
+
+def test_delete_files_bulk():
+    storage = MemoryStorageService({})
+    paths = ["a", "b", *(f"file_{i}" for i in range(1500))]
+    for path in paths:
+        storage.write_file("archive", path, path)
+    client = InMemoryS3Client(storage, denied={"b"})
+    cleanup = S3CleanupStorage(storage, client)
+
+    results = cleanup.delete_files("archive", [*paths, "missing"])
+
+    assert [len(request) for request in client.requests] == [1000, 503]
+    # the denied file and the one which did not exist are not counted as deleted
+    assert results == [True, False] + [True] * 1500 + [False]
+    assert storage.read_file("archive", "b") == b"b"
+    assert cleanup.delete_files("archive", ["a"]) == [False]
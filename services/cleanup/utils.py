@@ -1,22 +1,102 @@
 import dataclasses
+import logging
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 import shared.storage
 from django.db.models import Model
+from minio import Minio
+from minio.deleteobjects import DeleteObject
 from shared.api_archive.storage import StorageService
 from shared.config import get_config
+from shared.storage.exceptions import FileNotInStorageError
+from shared.storage.minio import MinioStorageService
+
+log = logging.getLogger(__name__)
+
+# The maximum number of keys S3 compatible storages accept in one `DeleteObjects` request
+BULK_DELETE_MAX_KEYS = 1_000
+
+
+class CleanupStorage:
+    """
+    Wraps the `StorageService` used by the cleanup, adding the deletion of many
+    files at once.
+
+    This deletes one file per request, see `S3CleanupStorage` for storages that
+    support bulk deletes.
+    """
+
+    # The number of files that should be passed to `delete_files` at once
+    bulk_delete_size = 1
+
+    def __init__(self, storage: StorageService):
+        self.storage = storage
+
+    def delete_files(self, bucket: str, paths: list[str]) -> list[bool]:
+        """
+        Deletes all the `paths` from `bucket`, returning for each path whether it was
+        deleted. Files that did not exist count as not deleted.
+        """
+        results = []
+        for path in paths:
+            try:
+                results.append(self.storage.delete_file(bucket, path))
+            except FileNotInStorageError:
+                results.append(False)
+        return results
+
+
+class S3CleanupStorage(CleanupStorage):
+    """
+    A `CleanupStorage` for S3 compatible storages, which deletes up to
+    `BULK_DELETE_MAX_KEYS` files with a single `DeleteObjects` request.
+    """
+
+    bulk_delete_size = BULK_DELETE_MAX_KEYS
+
+    def __init__(self, storage: StorageService, minio_client: Minio):
+        super().__init__(storage)
+        self.minio_client = minio_client
+
+    def delete_files(self, bucket: str, paths: list[str]) -> list[bool]:
+        missing: set[str] = set()
+        errors: dict[str, str] = {}
+        for start in range(0, len(paths), BULK_DELETE_MAX_KEYS):
+            batch = paths[start : start + BULK_DELETE_MAX_KEYS]
+            # `remove_objects` is lazy, the request is only sent once it is iterated
+            for error in self.minio_client.remove_objects(
+                bucket, [DeleteObject(path) for path in batch]
+            ):
+                # like `delete_file` raising `FileNotInStorageError`
+                if error.code == "NoSuchKey":
+                    missing.add(error.name)
+                else:
+                    errors[error.name] = error.code
+
+        if errors:
+            log.warning(
+                "Failed to delete some files from storage",
+                extra=dict(bucket=bucket, failed_files=len(errors), errors=errors),
+            )
+        return [path not in errors and path not in missing for path in paths]
+
+
+def cleanup_storage(storage: StorageService) -> CleanupStorage:
+    if isinstance(storage, MinioStorageService):
+        return S3CleanupStorage(storage, storage.minio_client)
+    return CleanupStorage(storage)
 
 
 class CleanupContext:
     threadpool: ThreadPoolExecutor
-    storage: StorageService
+    storage: CleanupStorage
     default_bucket: str
     bundleanalysis_bucket: str
 
     def __init__(self):
         self.threadpool = ThreadPoolExecutor()
-        self.storage = shared.storage.get_appropriate_storage_service()
+        self.storage = cleanup_storage(shared.storage.get_appropriate_storage_service())
         self.default_bucket = get_config(
             "services", "minio", "bucket", default="archive"
         )
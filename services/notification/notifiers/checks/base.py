@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import nullcontext
 from typing import Optional
@@ -19,6 +20,8 @@ from services.yaml.reader import get_paths_from_flags
 
 log = logging.getLogger(__name__)
 
+CHECK_RUN_UPDATE_CONCURRENCY = 4
+
 
 class ChecksNotifier(StatusNotifier):
     def __init__(self, *args, **kwargs) -> None:
@@ -290,20 +293,14 @@ class ChecksNotifier(StatusNotifier):
 
         lines_diff = []
         for segment in segments:
-            header = segment["header"].copy()
-            lines = segment["lines"].copy()
-            base_ln = int(header[0])
+            header = segment["header"]
             head_ln = int(header[2])
-            while not len(lines) == 0:
-                line_value = lines.pop(0)
+            for line_value in segment["lines"]:
                 if line_value and line_value[0] == "+":
                     lines_diff.append({"head_line": head_ln})
                     head_ln += 1
-                elif line_value and line_value[0] == "-":
-                    base_ln += 1
-                else:
+                elif not line_value or line_value[0] != "-":
                     head_ln += 1
-                    base_ln += 1
             file_diff["additions"] = lines_diff
         return file_diff
 
@@ -316,24 +313,17 @@ class ChecksNotifier(StatusNotifier):
             if _file is None:
                 continue
             head_file_report = comparison.head.report.get(_file["path"])
-            for head_line in head_file_report.lines:
-                line_addition = next(
-                    (
-                        line
-                        for line in _file["additions"]
-                        if head_line[0] == line["head_line"]
-                    ),
-                    None,
-                )
-                if line_addition and head_line[1].coverage == 0:
-                    lines_diff.append(
-                        {
-                            "type": "new_line",
-                            "line": head_line[0],
-                            "coverage": head_line[1].coverage,
-                            "path": _file["path"],
-                        }
-                    )
+            added_lines = {line["head_line"] for line in _file["additions"]}
+            lines_diff.extend(
+                {
+                    "type": "new_line",
+                    "line": ln,
+                    "coverage": line.coverage,
+                    "path": _file["path"],
+                }
+                for ln, line in head_file_report.lines
+                if ln in added_lines and line.coverage == 0
+            )
         line_headers = []
         previous_line = {}
         for index, line in enumerate(lines_diff):
@@ -375,6 +365,24 @@ class ChecksNotifier(StatusNotifier):
             annotations.append(annotation)
         return annotations
 
+    async def update_check_run_pages(
+        self, check_id, state: str, outputs: list[dict], **kwargs
+    ):
+        """
+        Updates the check run once for each of the `outputs` (usually pages of
+        annotations) concurrently, with at most `CHECK_RUN_UPDATE_CONCURRENCY`
+        requests in flight.
+        """
+        semaphore = asyncio.Semaphore(CHECK_RUN_UPDATE_CONCURRENCY)
+
+        async def _update_check_run(output):
+            async with semaphore:
+                return await self.repository_service.update_check_run(
+                    check_id, state, output=output, **kwargs
+                )
+
+        await asyncio.gather(*[_update_check_run(output) for output in outputs])
+
     def send_notification(self, comparison: ComparisonProxy, payload):
         repository_service = self.repository_service
         title = self.get_status_external_name()
@@ -429,17 +437,19 @@ class ChecksNotifier(StatusNotifier):
                     number_annotations=len(output.get("annotations")),
                 ),
             )
-            for annotation_page in annotation_pages:
-                async_to_sync(repository_service.update_check_run)(
-                    check_id,
-                    state,
-                    output={
+            async_to_sync(self.update_check_run_pages)(
+                check_id,
+                state,
+                [
+                    {
                         "title": output.get("title"),
                         "summary": output.get("summary"),
                         "annotations": annotation_page,
-                    },
-                    url=payload.get("url"),
-                )
+                    }
+                    for annotation_page in annotation_pages
+                ],
+                url=payload.get("url"),
+            )
 
         else:
             async_to_sync(repository_service.update_check_run)(
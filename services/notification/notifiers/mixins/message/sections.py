@@ -1,13 +1,14 @@
+import heapq
 import logging
 import random
 from base64 import b64encode
 from decimal import Decimal
 from enum import Enum, auto
-from itertools import starmap
 from urllib.parse import urlencode
 
 from shared.helpers.yaml import walk
 from shared.reports.resources import Report
+from shared.reports.types import ReportTotals
 
 from helpers.environment import is_enterprise
 from helpers.reports import get_totals_from_file_in_reports
@@ -357,6 +358,23 @@ class DiffSectionWriter(BaseSectionWriter):
         yield ("```")
 
 
+def _get_files_in_diff(diff) -> list[tuple[str, str, ReportTotals, int]]:
+    """
+    Lists the `(type, path, totals, missed lines)` of the files with totals in `diff`,
+    where missed lines counts both the misses and the partials of the diff.
+    """
+    return [
+        (
+            _diff["type"],
+            path,
+            _diff["totals"],
+            int(_diff["totals"].misses + _diff["totals"].partials),
+        )
+        for path, _diff in (diff["files"] if diff else {}).items()
+        if _diff.get("totals")
+    ]
+
+
 def _get_tree_cell(typ, path, metrics, compare, is_critical):
     return "| {rm}[{path}]({compare}?src=pr&el=tree&{path_as_query_param}#diff-{hash}){rm}{file_tags} {metrics}".format(
         rm="~~" if typ == "deleted" else "",
@@ -376,23 +394,17 @@ class NewFilesSectionWriter(BaseSectionWriter):
         head_report = comparison.head.report
         if base_report is None:
             base_report = Report()
-        files_in_diff = [
-            (
-                _diff["type"],
-                path,
-                make_patch_only_metrics(
-                    get_totals_from_file_in_reports(base_report, path) or False,
-                    get_totals_from_file_in_reports(head_report, path) or False,
-                    _diff["totals"],
-                    self.show_complexity,
-                    self.current_yaml,
-                    links["pull"],
-                ),
-                int(_diff["totals"].misses + _diff["totals"].partials),
+        files_in_diff = _get_files_in_diff(diff)
+
+        def metrics(path, diff_totals):
+            return make_patch_only_metrics(
+                get_totals_from_file_in_reports(base_report, path) or False,
+                get_totals_from_file_in_reports(head_report, path) or False,
+                diff_totals,
+                self.show_complexity,
+                self.current_yaml,
+                links["pull"],
             )
-            for path, _diff in (diff["files"] if diff else {}).items()
-            if _diff.get("totals")
-        ]
 
         all_files = set(f[1] for f in files_in_diff or []) | set(
             c.path for c in changes or []
@@ -403,7 +415,7 @@ class NewFilesSectionWriter(BaseSectionWriter):
 
             # get limit of results to show
             limit = int(self.layout.split(":")[1] if ":" in self.layout else 10)
-            mentioned = []
+            mentioned = set()
             files_in_critical = set()
             if self.settings.get("show_critical_paths", False):
                 overlay = comparison.get_overlay(OverlayType.line_execution_count)
@@ -414,7 +426,7 @@ class NewFilesSectionWriter(BaseSectionWriter):
             def tree_cell(typ, path, metrics, _=None):
                 if path not in mentioned:
                     # mentioned: for files that are in diff and changes
-                    mentioned.append(path)
+                    mentioned.add(path)
                     return _get_tree_cell(
                         typ=typ,
                         path=path,
@@ -423,12 +435,11 @@ class NewFilesSectionWriter(BaseSectionWriter):
                         is_critical=path in files_in_critical,
                     )
 
-            remaining_files = 0
-            printed_files = 0
-            changed_files = sorted(
-                files_in_diff, key=lambda a: a[3] or Decimal("0"), reverse=True
+            changed_files_with_missing_lines = [f for f in files_in_diff if f[3] > 0]
+            # only the files which are printed need their metrics computed
+            printed_files = heapq.nlargest(
+                limit, changed_files_with_missing_lines, key=lambda a: a[3]
             )
-            changed_files_with_missing_lines = [f for f in changed_files if f[3] > 0]
             if changed_files_with_missing_lines:
                 yield (
                     "| [Files with missing lines]({0}?dropdown=coverage&src=pr&el=tree) {1}".format(
@@ -436,12 +447,9 @@ class NewFilesSectionWriter(BaseSectionWriter):
                     )
                 )
                 yield (table_layout)
-            for file in changed_files_with_missing_lines:
-                if printed_files == limit:
-                    remaining_files += 1
-                else:
-                    printed_files += 1
-                    yield (tree_cell(file[0], file[1], file[2]))
+            for typ, path, diff_totals, _ in printed_files:
+                yield (tree_cell(typ, path, metrics(path, diff_totals)))
+            remaining_files = len(changed_files_with_missing_lines) - len(printed_files)
             if remaining_files:
                 yield (
                     "| ... and [{n} more]({href}?src=pr&el=tree-more) | |".format(
@@ -457,23 +465,17 @@ class FileSectionWriter(BaseSectionWriter):
         head_report = comparison.head.report
         if base_report is None:
             base_report = Report()
-        files_in_diff = [
-            (
-                _diff["type"],
-                path,
-                make_metrics(
-                    get_totals_from_file_in_reports(base_report, path) or False,
-                    get_totals_from_file_in_reports(head_report, path) or False,
-                    _diff["totals"],
-                    self.show_complexity,
-                    self.current_yaml,
-                    links["pull"],
-                ),
-                int(_diff["totals"].misses + _diff["totals"].partials),
+        files_in_diff = _get_files_in_diff(diff)
+
+        def metrics(path, diff_totals):
+            return make_metrics(
+                get_totals_from_file_in_reports(base_report, path) or False,
+                get_totals_from_file_in_reports(head_report, path) or False,
+                diff_totals,
+                self.show_complexity,
+                self.current_yaml,
+                links["pull"],
             )
-            for path, _diff in (diff["files"] if diff else {}).items()
-            if _diff.get("totals")
-        ]
 
         all_files = set(f[1] for f in files_in_diff or []) | set(
             c.path for c in changes or []
@@ -484,7 +486,7 @@ class FileSectionWriter(BaseSectionWriter):
 
             # get limit of results to show
             limit = int(self.layout.split(":")[1] if ":" in self.layout else 10)
-            mentioned = []
+            mentioned = set()
             files_in_critical = set()
             if self.settings.get("show_critical_paths", False):
                 overlay = comparison.get_overlay(OverlayType.line_execution_count)
@@ -495,7 +497,7 @@ class FileSectionWriter(BaseSectionWriter):
             def tree_cell(typ, path, metrics, _=None):
                 if path not in mentioned:
                     # mentioned: for files that are in diff and changes
-                    mentioned.append(path)
+                    mentioned.add(path)
                     return _get_tree_cell(
                         typ=typ,
                         path=path,
@@ -510,11 +512,11 @@ class FileSectionWriter(BaseSectionWriter):
                 )
             )
             yield (table_layout)
-            for line in starmap(
-                tree_cell,
-                sorted(files_in_diff, key=lambda a: a[3] or Decimal("0"))[:limit],
+            # only the files which are printed need their metrics computed
+            for typ, path, diff_totals, _ in heapq.nsmallest(
+                limit, files_in_diff, key=lambda a: a[3]
             ):
-                yield (line)
+                yield (tree_cell(typ, path, metrics(path, diff_totals)))
             remaining = len(files_in_diff) - limit
             if remaining > 0:
                 yield (
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Optional
 
@@ -20,6 +21,9 @@ from services.yaml.reader import get_paths_from_flags
 
 log = logging.getLogger(__name__)
 
+# Max number of `set_commit_status` requests in flight for a single notifier
+STATUS_POSTING_CONCURRENCY = 8
+
 
 class StatusNotifier(AbstractBaseNotifier):
     def is_enabled(self) -> bool:
@@ -261,6 +265,27 @@ class StatusNotifier(AbstractBaseNotifier):
         status_piece = f"/{self.title}" if self.title != "default" else ""
         return f"codecov/{self.context}{status_piece}"
 
+    def get_notification_cache_key(
+        self, comparison: ComparisonProxy, extra_sha: str | None = None
+    ) -> str:
+        base_commit = (
+            comparison.project_coverage_base.commit
+            if comparison.project_coverage_base
+            else None
+        )
+        head_commit = comparison.head.commit if comparison.head else None
+        key = dict(
+            type="status_check_notification",
+            repoid=head_commit.repoid,
+            base_commitid=base_commit.commitid if base_commit else None,
+            head_commitid=head_commit.commitid if head_commit else None,
+            notifier_name=self.name,
+            notifier_title=self.title,
+        )
+        if extra_sha is not None:
+            key["extra_sha"] = extra_sha
+        return make_hash_sha256(key)
+
     def maybe_send_notification(
         self, comparison: ComparisonProxy, payload: dict
     ) -> NotificationResult:
@@ -271,16 +296,7 @@ class StatusNotifier(AbstractBaseNotifier):
         )
         head_commit = comparison.head.commit if comparison.head else None
 
-        cache_key = make_hash_sha256(
-            dict(
-                type="status_check_notification",
-                repoid=head_commit.repoid,
-                base_commitid=base_commit.commitid if base_commit else None,
-                head_commitid=head_commit.commitid if head_commit else None,
-                notifier_name=self.name,
-                notifier_title=self.title,
-            )
-        )
+        cache_key = self.get_notification_cache_key(comparison)
 
         last_payload = cache.get_backend().get(cache_key)
         if last_payload is NO_VALUE or last_payload != payload:
@@ -288,7 +304,20 @@ class StatusNotifier(AbstractBaseNotifier):
                 get_config("setup", "cache", "send_status_notification", default=600)
             )  # 10 min default
             cache.get_backend().set(cache_key, ttl, payload)
-            return self.send_notification(comparison, payload)
+
+            # The extra SHAs are cached on their own, so the ones that already
+            # got this exact payload are not notified again
+            extra_shas_to_notify = set()
+            for extra_sha in comparison.context.gitlab_extra_shas or set():
+                extra_cache_key = self.get_notification_cache_key(
+                    comparison, extra_sha=extra_sha
+                )
+                if cache.get_backend().get(extra_cache_key) != payload:
+                    cache.get_backend().set(extra_cache_key, ttl, payload)
+                    extra_shas_to_notify.add(extra_sha)
+            return self.send_notification(
+                comparison, payload, extra_shas=extra_shas_to_notify
+            )
         else:
             log.info(
                 "Notification payload unchanged.  Skipping notification.",
@@ -307,8 +336,39 @@ class StatusNotifier(AbstractBaseNotifier):
                 data_sent=None,
             )
 
-    def send_notification(self, comparison: ComparisonProxy, payload):
-        repository_service = self.repository_service
+    async def set_commit_statuses(
+        self, commitids: list[str], state: str, title: str, **kwargs
+    ) -> dict[str, dict | BaseException]:
+        """
+        Sets the same status on all `commitids` concurrently, with at most
+        `STATUS_POSTING_CONCURRENCY` requests in flight.
+
+        Returns the provider response, or the exception raised, for each SHA.
+        """
+        semaphore = asyncio.Semaphore(STATUS_POSTING_CONCURRENCY)
+
+        async def _set_commit_status(commitid):
+            async with semaphore:
+                return await self.repository_service.set_commit_status(
+                    commitid, state, title, **kwargs
+                )
+
+        results = await asyncio.gather(
+            *[_set_commit_status(commitid) for commitid in commitids],
+            return_exceptions=True,
+        )
+        return dict(zip(commitids, results))
+
+    def send_notification(
+        self,
+        comparison: ComparisonProxy,
+        payload,
+        extra_shas: set[str] | None = None,
+    ):
+        """
+        Sets the status on the head commit, and on the `extra_shas` (defaults to
+        the GitLab extra SHAs of the comparison context).
+        """
         title = self.get_status_external_name()
         head_commit_sha = comparison.head.commit.commitid
         head_report = comparison.head.report
@@ -335,9 +395,9 @@ class StatusNotifier(AbstractBaseNotifier):
             "message": message,
         }
 
-        all_shas_to_notify = [head_commit_sha] + list(
-            comparison.context.gitlab_extra_shas or set()
-        )
+        if extra_shas is None:
+            extra_shas = comparison.context.gitlab_extra_shas or set()
+        all_shas_to_notify = [head_commit_sha] + sorted(extra_shas - {head_commit_sha})
         if len(all_shas_to_notify) > 1:
             log.info(
                 "Notifying multiple SHAs",
@@ -345,20 +405,29 @@ class StatusNotifier(AbstractBaseNotifier):
             )
 
         try:
-            _set_commit_status = async_to_sync(repository_service.set_commit_status)
             head_coverage = head_report and head_report.totals.coverage
-            all_results = [
-                _set_commit_status(
-                    commitid,
-                    state,
-                    title,
-                    description=message,
-                    url=url,
-                    coverage=(float(head_coverage) if head_coverage else 0),
-                )
-                for commitid in all_shas_to_notify
+            all_results = async_to_sync(self.set_commit_statuses)(
+                all_shas_to_notify,
+                state,
+                title,
+                description=message,
+                url=url,
+                coverage=(float(head_coverage) if head_coverage else 0),
+            )
+            failed_shas = [
+                commitid
+                for commitid, result in all_results.items()
+                if isinstance(result, BaseException)
             ]
-            res = all_results[0]
+            if failed_shas:
+                log.warning(
+                    "Failed to set status on some SHAs",
+                    extra=dict(failed_shas=failed_shas, commit=head_commit_sha),
+                )
+                # All SHAs got their chance, but errors are surfaced like
+                # they were when posting one SHA after the other
+                raise all_results[failed_shas[0]]
+            res = all_results[head_commit_sha]
 
         except TorngitClientError:
             log.warning(
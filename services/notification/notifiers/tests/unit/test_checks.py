@@ -1,3 +1,4 @@
+import asyncio
 from copy import deepcopy
 from unittest.mock import Mock
 from urllib.parse import quote_plus
@@ -1069,6 +1070,52 @@ class TestPatchChecksNotifier(object):
             },
         }
 
+    def test_send_notification_annotation_pages_concurrently(
+        self, sample_comparison, mocker, mock_repo_provider
+    ):
+        mocker.patch(
+            "services.notification.notifiers.checks.base.CHECK_RUN_UPDATE_CONCURRENCY",
+            3,
+        )
+        in_flight, max_in_flight = 0, 0
+
+        async def update_check_run(check_id, state, output, url):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return "success"
+
+        mock_repo_provider.create_check_run.return_value = 2234563
+        mock_repo_provider.update_check_run.side_effect = update_check_run
+        notifier = PatchChecksNotifier(
+            repository=sample_comparison.head.commit.repository,
+            title="title",
+            notifier_yaml_settings={},
+            notifier_site_settings=True,
+            current_yaml=UserYaml({}),
+            repository_service=mock_repo_provider,
+        )
+        payload = {
+            "state": "success",
+            "output": {
+                "title": "Codecov Report",
+                "summary": "Summary",
+                "annotations": list(range(500)),
+            },
+        }
+        result = notifier.send_notification(sample_comparison, payload)
+        assert result.notification_successful == True
+        assert mock_repo_provider.update_check_run.call_count == 10
+        assert max_in_flight == 3
+        annotations = [
+            annotation
+            for call in mock_repo_provider.update_check_run.call_args_list
+            for annotation in call[1]["output"]["annotations"]
+        ]
+        assert annotations == list(range(500))
+
     def test_notify(
         self, sample_comparison, mocker, mock_repo_provider, mock_configuration
     ):
@@ -3634,6 +3634,44 @@ class TestImpactedEndpointWriter(object):
         )
         assert lines == []
 
+    def test_filesection_only_computes_metrics_for_printed_files(
+        self, sample_comparison, mocker
+    ):
+        make_patch_only_metrics = mocker.patch(
+            "services.notification.notifiers.mixins.message.sections.make_patch_only_metrics",
+            side_effect=lambda *args: "| metrics |",
+        )
+        section_writer = NewFilesSectionWriter(
+            sample_comparison.head.commit.repository,
+            "newfiles:2",
+            show_complexity=False,
+            settings={},
+            current_yaml={},
+        )
+        files = {
+            f"file_{misses}.py": {
+                "type": "modified",
+                "totals": ReportTotals(lines=10, hits=10 - misses, misses=misses),
+            }
+            for misses in (3, 0, 5, 1, 4)
+        }
+        lines = list(
+            section_writer.write_section(
+                sample_comparison,
+                {"files": files},
+                [],
+                links={"pull": "pull.link"},
+            )
+        )
+        assert lines == [
+            "| [Files with missing lines](pull.link?dropdown=coverage&src=pr&el=tree) | Patch % | Lines |",
+            "|---|---|---|",
+            "| [file\\_5.py](pull.link?src=pr&el=tree&filepath=file_5.py#diff-ZmlsZV81LnB5) | metrics |",
+            "| [file\\_4.py](pull.link?src=pr&el=tree&filepath=file_4.py#diff-ZmlsZV80LnB5) | metrics |",
+            "| ... and [2 more](pull.link?src=pr&el=tree-more) | |",
+        ]
+        assert make_patch_only_metrics.call_count == 2
+
 
 class TestNewHeaderSectionWriter(object):
     def test_new_header_section_writer(self, mocker, sample_comparison):
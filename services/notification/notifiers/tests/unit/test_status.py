@@ -2,6 +2,7 @@ from unittest.mock import MagicMock
 
 import pytest
 from mock import AsyncMock
+from shared.helpers.cache import NO_VALUE
 from shared.reports.readonly import ReadOnlyReport
 from shared.reports.resources import Report, ReportFile, ReportLine
 from shared.reports.types import ReportTotals
@@ -596,6 +597,88 @@ class TestBaseStatusNotifier(object):
         )
         assert fake_repo_service.set_commit_status.call_count == 2
 
+    def test_notify_multiple_shas_skips_cached_extra_shas(
+        self,
+        sample_comparison,
+        mocker,
+    ):
+        comparison = sample_comparison
+        comparison.context.gitlab_extra_shas = set(["extra_sha", "other_sha"])
+        payload = {
+            "message": "something to say",
+            "state": "success",
+            "url": get_pull_url(comparison.pull),
+        }
+
+        class TestNotifier(StatusNotifier):
+            def build_payload(self, comparison):
+                return payload
+
+            def status_already_exists(
+                self, comparison: ComparisonProxy, title, state, description
+            ) -> bool:
+                return False
+
+        fake_repo_service = MagicMock(
+            name="fake_repo_provider",
+            set_commit_status=AsyncMock(return_value={"id": "some_id"}),
+        )
+        notifier = TestNotifier(
+            repository=comparison.head.commit.repository,
+            title="title",
+            notifier_yaml_settings={},
+            notifier_site_settings=True,
+            current_yaml=UserYaml({}),
+            repository_service=fake_repo_service,
+        )
+        notifier.context = "fake"
+        extra_sha_cache_key = notifier.get_notification_cache_key(
+            comparison, extra_sha="extra_sha"
+        )
+        mocker.patch(
+            "shared.helpers.cache.NullBackend.get",
+            side_effect=lambda key: payload if key == extra_sha_cache_key else NO_VALUE,
+        )
+
+        result = notifier.notify(comparison)
+        assert result.notification_successful
+        notified_shas = [
+            call.args[0] for call in fake_repo_service.set_commit_status.call_args_list
+        ]
+        assert notified_shas == [comparison.head.commit.commitid, "other_sha"]
+
+    def test_send_notification_multiple_shas_one_fails(self, sample_comparison, mocker):
+        comparison = sample_comparison
+        comparison.context.gitlab_extra_shas = set(["extra_sha"])
+
+        def set_status_side_effect(commit, *args, **kwargs):
+            if commit == "extra_sha":
+                raise TorngitClientError(403, "response", "message")
+            return {"id": f"{commit}-status-set"}
+
+        fake_repo_service = MagicMock(
+            name="fake_repo_provider",
+            set_commit_status=AsyncMock(side_effect=set_status_side_effect),
+        )
+        notifier = StatusNotifier(
+            repository=comparison.head.commit.repository,
+            title="title",
+            notifier_yaml_settings={},
+            notifier_site_settings=True,
+            current_yaml=UserYaml({}),
+            repository_service=fake_repo_service,
+        )
+        notifier.context = "fake"
+        mocker.patch.object(StatusNotifier, "status_already_exists", return_value=False)
+        payload = {"message": "something to say", "state": "success", "url": "url"}
+
+        result = notifier.send_notification(comparison, payload)
+        assert result.notification_attempted
+        assert not result.notification_successful
+        assert result.explanation == "no_write_permission"
+        # the head commit status was still set
+        assert fake_repo_service.set_commit_status.call_count == 2
+
     def test_notify_cached(
         self,
         sample_comparison,
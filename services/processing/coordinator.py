@@ -0,0 +1,108 @@
+"""
+Coordinates merging the processed uploads of a commit into the "master report".
+
+Every finisher registers the `ProcessingResult`s of its uploads with the `MergeCoordinator`.
+Only the finisher that gets the report lock merges, and it keeps merging batches of
+registered uploads until there are none left, including the ones registered by other
+finishers in the meantime. Finishers that can't get the lock don't retry, as their uploads
+will be merged by the lock holder. Instead, they schedule a single delayed "drain check",
+which merges whatever is left in case the lock holder dies.
+
+Registered uploads stay registered until they are merged. The batch being merged is
+claimed in the `ProcessingState`, and a crashed lock holder leaves its claims behind,
+which the next lock holder releases (see `ProcessingState.release_all_claims`).
+"""
+
+import orjson
+
+from services.processing.state import MERGE_BATCH_SIZE, ProcessingState
+from services.processing.types import ProcessingResult
+from services.redis import get_redis_connection
+
+# Registered uploads of a commit that is never finished eventually expire
+REGISTERED_UPLOADS_TTL = 6 * 60 * 60
+
+# The delay of a drain check, and for how long no other one is scheduled
+DRAIN_CHECK_DELAY = 60
+DRAIN_CHECK_TTL = 5 * DRAIN_CHECK_DELAY
+
+
+class MergeCoordinator:
+    def __init__(self, repoid: int, commitsha: str) -> None:
+        self._redis = get_redis_connection()
+        self.repoid = repoid
+        self.commitsha = commitsha
+
+    def register(self, processing_results: list[ProcessingResult]):
+        """
+        Registers the uploads to be merged by whichever finisher holds the lock.
+
+        Uploads are keyed by their `upload_id`, so registering the same upload twice
+        (for example on a task retry) only merges it once.
+        """
+        if not processing_results:
+            return
+        key = self._redis_key()
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.hset(
+            key,
+            mapping={
+                result["upload_id"]: orjson.dumps(result)
+                for result in processing_results
+            },
+        )
+        pipeline.expire(key, REGISTERED_UPLOADS_TTL)
+        pipeline.execute()
+
+    def take_batch(self, state: ProcessingState) -> list[ProcessingResult]:
+        """
+        Claims up to `MERGE_BATCH_SIZE` registered uploads for merging.
+
+        The uploads stay registered until `forget` is called after merging them.
+        Registered uploads which can not be claimed were already merged, and are
+        forgotten right away.
+
+        Must only be called while holding the report lock, after releasing the
+        claims of a previous lock holder.
+        """
+        key = self._redis_key()
+        while upload_ids := [int(id) for id in self._redis.hkeys(key)]:
+            upload_ids = upload_ids[:MERGE_BATCH_SIZE]
+            claimed = state.claim_uploads_for_merging(upload_ids)
+            if merged := set(upload_ids) - claimed:
+                self.forget(list(merged))
+            if claimed:
+                return [
+                    orjson.loads(result)
+                    for result in self._redis.hmget(key, list(claimed))
+                    if result is not None
+                ]
+        return []
+
+    def forget(self, upload_ids: list[int]):
+        self._redis.hdel(self._redis_key(), *upload_ids)
+
+    def has_registered_uploads(self) -> bool:
+        return self._redis.hlen(self._redis_key()) > 0
+
+    def should_schedule_drain_check(self) -> bool:
+        """
+        Returns whether the caller should schedule a drain check, which is only the
+        case if no other one is pending.
+        """
+        return bool(
+            self._redis.set(self._drain_check_key(), 1, nx=True, ex=DRAIN_CHECK_TTL)
+        )
+
+    def start_drain_check(self):
+        """
+        Marks the pending drain check as running, so that another one can be
+        scheduled in case this one can't get the lock either.
+        """
+        self._redis.delete(self._drain_check_key())
+
+    def _redis_key(self) -> str:
+        return f"upload-merge-coordinator/{self.repoid}/{self.commitsha}"
+
+    def _drain_check_key(self) -> str:
+        return f"{self._redis_key()}/drain-check"
@@ -10,6 +10,8 @@ from shared.django_apps.reports.models import (
     TestInstance,
 )
 
+from services.test_results import invalidate_flake_set
+
 log = logging.getLogger(__name__)
 
 
@@ -91,6 +93,7 @@ def process_flake_for_repo_commit(
         upload.state = "flake_processed"
         upload.save()
         django_transaction.commit()
+        invalidate_flake_set(repo_id)
 
     log.info(
         "Successfully processed flakes",
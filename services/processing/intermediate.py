@@ -1,3 +1,5 @@
+import time
+
 import orjson
 import sentry_sdk
 import zstandard
@@ -11,6 +13,11 @@ from .types import IntermediateReport
 
 REPORT_TTL = 24 * 60 * 60
 
+# A deferred report holds the only copy of the uploads merged into it, so it is saved
+# to storage at the latest after this many batches, or once it was deferred for this long
+DEFERRED_REPORT_MAX_BATCHES = 5
+DEFERRED_REPORT_MAX_AGE = 10 * 60
+
 
 @sentry_sdk.trace
 def load_intermediate_reports(upload_ids: list[int]) -> list[IntermediateReport]:
@@ -25,22 +32,45 @@ def load_intermediate_reports(upload_ids: list[int]) -> list[IntermediateReport]
             intermediate_reports.append(IntermediateReport(upload_id, EditableReport()))
             continue
 
-        # NOTE: our redis client is configured to return `bytes` everywhere,
-        # so the dict keys are `bytes` as well.
-        chunks = dctx.decompress(report_dict[b"chunks"]).decode(errors="replace")
-        report_json = orjson.loads(dctx.decompress(report_dict[b"report_json"]))
-
-        report = EditableReport.from_chunks(
-            chunks=chunks,
-            files=report_json["files"],
-            sessions=report_json["sessions"],
-            totals=report_json.get("totals"),
-        )
+        report = _decompress_report(dctx, report_dict, EditableReport)
         intermediate_reports.append(IntermediateReport(upload_id, report))
 
     return intermediate_reports
 
 
+def _decompress_report(
+    dctx: zstandard.ZstdDecompressor,
+    report_dict: dict,
+    report_class: type[Report] | None,
+) -> Report:
+    """
+    Decodes a report stored with `emit_size_metrics` / `save_deferred_report`.
+
+    Without a `report_class`, it is chosen like `ReportService.build_report` does:
+    merging into a report with carried forward sessions deletes those sessions,
+    which needs an `EditableReport`.
+    """
+    # NOTE: our redis client is configured to return `bytes` everywhere,
+    # so the dict keys are `bytes` as well.
+    chunks = dctx.decompress(report_dict[b"chunks"]).decode(errors="replace")
+    report_json = orjson.loads(dctx.decompress(report_dict[b"report_json"]))
+
+    if report_class is None:
+        report_class = Report
+        for session_id, session in report_json["sessions"].items():
+            # make sure the `Session` objects get an `id` when decoded:
+            session["id"] = int(session_id)
+            if session.get("st") == "carriedforward":
+                report_class = EditableReport
+
+    return report_class.from_chunks(
+        chunks=chunks,
+        files=report_json["files"],
+        sessions=report_json["sessions"],
+        totals=report_json.get("totals"),
+    )
+
+
 @sentry_sdk.trace
 def save_intermediate_report(upload_id: int, report: Report):
     _totals, report_json = report.to_database()
@@ -75,6 +105,68 @@ def intermediate_report_key(upload_id: int):
     return f"intermediate-report/{upload_id}"
 
 
+@sentry_sdk.trace
+def load_deferred_report(repoid: int, commitid: str) -> Report | None:
+    redis = get_redis_connection()
+    report_dict = redis.hgetall(deferred_report_key(repoid, commitid))
+    if not report_dict:
+        return None
+
+    return _decompress_report(zstandard.ZstdDecompressor(), report_dict, None)
+
+
+@sentry_sdk.trace
+def save_deferred_report(repoid: int, commitid: str, report: Report):
+    """
+    Stores the "master report" of a commit in between merge batches, so that only
+    the last batch has to save it to storage.
+    """
+    _totals, report_json = report.to_database()
+    mapping = {
+        "report_json": zstandard.compress(report_json.encode()),
+        "chunks": zstandard.compress(report.to_archive().encode()),
+    }
+
+    report_key = deferred_report_key(repoid, commitid)
+    redis = get_redis_connection()
+    with redis.pipeline() as pipeline:
+        pipeline.hmset(report_key, mapping)
+        pipeline.hsetnx(report_key, "deferred_at", int(time.time()))
+        pipeline.hincrby(report_key, "batches", 1)
+        pipeline.expire(report_key, REPORT_TTL)
+        pipeline.execute()
+
+
+def deferred_report_save_is_due(repoid: int, commitid: str) -> bool:
+    """
+    Determines whether the deferred report of a commit has to be saved to storage,
+    instead of deferring it once more.
+
+    This is the case once it was deferred for `DEFERRED_REPORT_MAX_BATCHES`
+    batches, or for longer than `DEFERRED_REPORT_MAX_AGE`.
+    """
+    redis = get_redis_connection()
+    batches, deferred_at = redis.hmget(
+        deferred_report_key(repoid, commitid), ["batches", "deferred_at"]
+    )
+    if batches is None or deferred_at is None:
+        return False
+    return (
+        int(batches) >= DEFERRED_REPORT_MAX_BATCHES
+        or time.time() - int(deferred_at) >= DEFERRED_REPORT_MAX_AGE
+    )
+
+
+@sentry_sdk.trace
+def cleanup_deferred_report(repoid: int, commitid: str):
+    redis = get_redis_connection()
+    redis.delete(deferred_report_key(repoid, commitid))
+
+
+def deferred_report_key(repoid: int, commitid: str):
+    return f"deferred-report/{repoid}/{commitid}"
+
+
 def emit_size_metrics(report_json: bytes, chunks: bytes) -> tuple[bytes, bytes]:
     INTERMEDIATE_REPORT_SIZE.labels(type="report_json", compression="none").observe(
         len(report_json)
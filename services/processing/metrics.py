@@ -22,6 +22,11 @@ PYREPORT_CHUNKS_FILE_SIZE = Histogram(
     buckets=BYTE_SIZE_BUCKETS,
 )
 
+FINISHER_RETRIES_AVOIDED = Counter(
+    "worker_upload_finisher_retries_avoided",
+    "Number of finishers that left their uploads to the finisher holding the report lock, instead of retrying",
+)
+
 INTERMEDIATE_REPORT_SIZE = Histogram(
     "worker_intermediate_report_size",
     "Size (in bytes) of a serialized intermediate report. The `type` can be `report_json` or `chunks`.",
@@ -1,5 +1,6 @@
 import logging
 from collections.abc import Callable
+from dataclasses import asdict
 
 import sentry_sdk
 from celery.exceptions import CeleryError
@@ -63,11 +64,14 @@ def process_upload(
             result["error"] = error.as_dict()
         else:
             result["successful"] = True
-        log.info("Finished processing upload", extra={"result": result})
 
         if processing_result.report:
             save_intermediate_report(upload_id, processing_result.report)
-        state.mark_upload_as_processed(upload_id)
+        upload_numbers = state.mark_upload_as_processed(upload_id)
+        log.info(
+            "Finished processing upload",
+            extra={"result": result, "upload_numbers": asdict(upload_numbers)},
+        )
 
         rewrite_or_delete_upload(archive_service, commit_yaml, report_info)
 
@@ -7,6 +7,8 @@ states:
 - "processing": when an upload was received and is being parsed/processed.
 - "processed": the upload has been processed and an "intermediate report" has been stored,
   the upload is now waiting to be merged into the "master report".
+- "merging": the upload was claimed by the finisher holding the report lock, and is being
+  merged into the "master report".
 - "merged": the upload was fully merged into the "master report".
 
 The logic in this file also makes sure that processing and merging happens in an "optimal" way
@@ -19,8 +21,12 @@ meaning that:
 - (ideally in the future) an upload that has been processed into an "intermediate report"
   should be merged directly into the "master report" without doing a storage roundtrip for that
   "intermediate report".
+
+Transitions that touch more than one state happen in a Lua script (or a `MULTI` block),
+so they are atomic and take a single roundtrip to redis.
 """
 
+import time
 from dataclasses import dataclass
 
 from shared.metrics import Counter
@@ -29,6 +35,73 @@ from services.redis import get_redis_connection
 
 MERGE_BATCH_SIZE = 10
 
+# Uploads which were claimed for merging, but neither marked as merged nor released
+# within this time (for example because the finisher crashed), are considered
+# abandoned, and go back to "processed".
+# Any finisher getting the report lock also releases all claims right away, as they
+# are only made while holding that lock.
+MERGE_CLAIM_TTL = 60 * 60
+
+# KEYS: processing, processed, merging
+# ARGV: upload_id
+MARK_UPLOAD_AS_PROCESSED_SCRIPT = """
+if redis.call("SMOVE", KEYS[1], KEYS[2], ARGV[1]) == 0 then
+    -- the upload was never marked as processing (e.g. it was cleared in the meantime)
+    redis.call("SADD", KEYS[2], ARGV[1])
+end
+return {redis.call("SCARD", KEYS[1]), redis.call("SCARD", KEYS[2]), redis.call("HLEN", KEYS[3])}
+"""
+
+# KEYS: processing, processed, merging
+# ARGV: current timestamp
+GET_UPLOAD_NUMBERS_SCRIPT = """
+local merging = redis.call("HGETALL", KEYS[3])
+for i = 1, #merging, 2 do
+    if tonumber(merging[i + 1]) <= tonumber(ARGV[1]) then
+        -- the claim was abandoned
+        redis.call("HDEL", KEYS[3], merging[i])
+        redis.call("SADD", KEYS[2], merging[i])
+    end
+end
+return {redis.call("SCARD", KEYS[1]), redis.call("SCARD", KEYS[2]), redis.call("HLEN", KEYS[3])}
+"""
+
+# KEYS: processed, merging
+# ARGV: claim deadline, upload_ids...
+CLAIM_UPLOADS_FOR_MERGING_SCRIPT = """
+local claimed = {}
+for i = 2, #ARGV do
+    if redis.call("SREM", KEYS[1], ARGV[i]) == 1 then
+        redis.call("HSET", KEYS[2], ARGV[i], ARGV[1])
+        table.insert(claimed, ARGV[i])
+    end
+end
+return claimed
+"""
+
+# KEYS: processed, merging
+# ARGV: upload_ids...
+RELEASE_CLAIMED_UPLOADS_SCRIPT = """
+local released = 0
+for _, upload_id in ipairs(ARGV) do
+    if redis.call("HDEL", KEYS[2], upload_id) == 1 then
+        redis.call("SADD", KEYS[1], upload_id)
+        released = released + 1
+    end
+end
+return released
+"""
+
+# KEYS: processed, merging
+RELEASE_ALL_CLAIMS_SCRIPT = """
+local upload_ids = redis.call("HKEYS", KEYS[2])
+for _, upload_id in ipairs(upload_ids) do
+    redis.call("SADD", KEYS[1], upload_id)
+end
+redis.call("DEL", KEYS[2])
+return #upload_ids
+"""
+
 CLEARED_UPLOADS = Counter(
     "worker_processing_cleared_uploads",
     "Number of uploads cleared from queue because of errors",
@@ -48,6 +121,12 @@ class UploadNumbers:
     and are waiting on being merged into the "master report".
     """
 
+    merging: int = 0
+    """
+    The number of uploads that have been claimed by a finisher,
+    and are being merged into the "master report".
+    """
+
 
 def should_perform_merge(uploads: UploadNumbers) -> bool:
     """
@@ -59,6 +138,16 @@ def should_perform_merge(uploads: UploadNumbers) -> bool:
     return uploads.processing == 0 or uploads.processed >= MERGE_BATCH_SIZE
 
 
+def should_defer_report_save(uploads: UploadNumbers) -> bool:
+    """
+    Determines whether saving the "master report" to storage can be deferred,
+    after merging a batch of claimed uploads which have not been marked as merged yet.
+
+    This is the case when more uploads are expected to be merged after this batch.
+    """
+    return uploads.processing > 0 or uploads.processed > 0
+
+
 def should_trigger_postprocessing(uploads: UploadNumbers) -> bool:
     """
     Determines whether post-processing steps, such as notifications, etc,
@@ -67,7 +156,7 @@ def should_trigger_postprocessing(uploads: UploadNumbers) -> bool:
     This is the case when no more uploads are expected,
     and all the processed uploads have been merged into the "master report".
     """
-    return uploads.processing == 0 and uploads.processed == 0
+    return uploads.processing == 0 and uploads.processed == 0 and uploads.merging == 0
 
 
 class ProcessingState:
@@ -75,11 +164,35 @@ class ProcessingState:
         self._redis = get_redis_connection()
         self.repoid = repoid
         self.commitsha = commitsha
+        self._mark_upload_as_processed = self._redis.register_script(
+            MARK_UPLOAD_AS_PROCESSED_SCRIPT
+        )
+        self._get_upload_numbers = self._redis.register_script(
+            GET_UPLOAD_NUMBERS_SCRIPT
+        )
+        self._claim_uploads_for_merging = self._redis.register_script(
+            CLAIM_UPLOADS_FOR_MERGING_SCRIPT
+        )
+        self._release_claimed_uploads = self._redis.register_script(
+            RELEASE_CLAIMED_UPLOADS_SCRIPT
+        )
+        self._release_all_claims = self._redis.register_script(
+            RELEASE_ALL_CLAIMS_SCRIPT
+        )
 
-    def get_upload_numbers(self):
-        processing = self._redis.scard(self._redis_key("processing"))
-        processed = self._redis.scard(self._redis_key("processed"))
-        return UploadNumbers(processing, processed)
+    def get_upload_numbers(self) -> UploadNumbers:
+        """
+        Returns the upload numbers, after moving abandoned claims back to "processed".
+        """
+        processing, processed, merging = self._get_upload_numbers(
+            keys=[
+                self._redis_key("processing"),
+                self._redis_key("processed"),
+                self._redis_key("merging"),
+            ],
+            args=[int(time.time())],
+        )
+        return UploadNumbers(processing, processed, merging)
 
     def mark_uploads_as_processing(self, upload_ids: list[int]):
         self._redis.sadd(self._redis_key("processing"), *upload_ids)
@@ -93,27 +206,71 @@ class ProcessingState:
             # this to be triggered often, if at all.
             CLEARED_UPLOADS.inc(removed_uploads)
 
-    def mark_upload_as_processed(self, upload_id: int):
-        res = self._redis.smove(
-            self._redis_key("processing"), self._redis_key("processed"), upload_id
+    def mark_upload_as_processed(self, upload_id: int) -> UploadNumbers:
+        """
+        Moves the upload from "processing" to "processed",
+        and returns the upload numbers right after that transition.
+        """
+        processing, processed, merging = self._mark_upload_as_processed(
+            keys=[
+                self._redis_key("processing"),
+                self._redis_key("processed"),
+                self._redis_key("merging"),
+            ],
+            args=[upload_id],
         )
-        if not res:
-            # this can happen when `upload_id` was never in the source set,
-            # which probably is the case during initial deployment as
-            # the code adding this to the initial set was not deployed yet
-            # TODO: make sure to remove this code after a grace period
-            self._redis.sadd(self._redis_key("processed"), upload_id)
+        return UploadNumbers(processing, processed, merging)
 
-    def mark_uploads_as_merged(self, upload_ids: list[int]):
-        self._redis.srem(self._redis_key("processed"), *upload_ids)
+    def claim_uploads_for_merging(self, upload_ids: list[int]) -> set[int]:
+        """
+        Moves the given uploads from "processed" to "merging", and returns the ones
+        that were claimed.
 
-    def get_uploads_for_merging(self) -> set[int]:
+        Uploads which are not "processed" (anymore) are not claimed: they were either
+        merged already, or are claimed by someone else.
+        Postprocessing waits until the claimed uploads are marked as merged, released,
+        or their claim is abandoned after `MERGE_CLAIM_TTL`.
+
+        Claims must only be made while holding the report lock.
+        """
+        if not upload_ids:
+            return set()
         return set(
             int(id)
-            for id in self._redis.srandmember(
-                self._redis_key("processed"), MERGE_BATCH_SIZE
+            for id in self._claim_uploads_for_merging(
+                keys=[self._redis_key("processed"), self._redis_key("merging")],
+                args=[int(time.time()) + MERGE_CLAIM_TTL, *upload_ids],
             )
         )
 
+    def release_claimed_uploads(self, upload_ids: list[int]) -> int:
+        """
+        Moves the given claimed uploads back to "processed", so they can be
+        claimed again.
+        """
+        if not upload_ids:
+            return 0
+        return self._release_claimed_uploads(
+            keys=[self._redis_key("processed"), self._redis_key("merging")],
+            args=upload_ids,
+        )
+
+    def release_all_claims(self) -> int:
+        """
+        Moves all the claimed uploads of the commit back to "processed".
+
+        This must only be done right after acquiring the report lock, as any claim
+        that exists at that point was abandoned by a previous lock holder.
+        """
+        return self._release_all_claims(
+            keys=[self._redis_key("processed"), self._redis_key("merging")]
+        )
+
+    def mark_uploads_as_merged(self, upload_ids: list[int]):
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.srem(self._redis_key("processed"), *upload_ids)
+        pipeline.hdel(self._redis_key("merging"), *upload_ids)
+        pipeline.execute()
+
     def _redis_key(self, state: str) -> str:
         return f"upload-processing-state/{self.repoid}/{self.commitsha}/{state}"
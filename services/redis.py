@@ -1,12 +1,71 @@
 import logging
+import os
+import threading
 import zlib
 from typing import Optional
 
 from redis import Redis
 from shared.config import get_config
+from shared.metrics import Counter, Histogram
 
 log = logging.getLogger(__name__)
 
+REDIS_CLIENTS_REQUESTED = Counter(
+    "worker_redis_clients_requested",
+    "Number of times a Redis client was requested, and if an existing one was reused",
+    ["reused"],
+)
+REDIS_POOL_CONNECTIONS = Histogram(
+    "worker_redis_pool_connections",
+    "Number of connections opened by the pool of a Redis client when it is handed out",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128],
+)
+
+
+class RedisClientRegistry:
+    """
+    Process-wide registry of `Redis` clients, keyed by URL.
+
+    Every client owns a connection pool, so sharing the client means every
+    caller in the process shares the same pooled connections instead of
+    opening their own.
+
+    Sockets can't be shared across processes, so the registry is emptied in the
+    child after a fork (e.g. when celery starts its worker processes).
+    """
+
+    def __init__(self):
+        self._clients: dict[str, Redis] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Redis:
+        client = self._clients.get(url)
+        reused = client is not None
+        if client is None:
+            with self._lock:
+                client = self._clients.get(url)
+                if client is None:
+                    client = Redis.from_url(url)
+                    self._clients[url] = client
+
+        REDIS_CLIENTS_REQUESTED.labels(reused=reused).inc()
+        created_connections = getattr(
+            client.connection_pool, "_created_connections", None
+        )
+        if isinstance(created_connections, int):
+            REDIS_POOL_CONNECTIONS.observe(created_connections)
+        return client
+
+    def reset(self) -> None:
+        # The parent's connections are left alone, closing them from the child
+        # would close them for the parent too
+        self._clients = {}
+        self._lock = threading.Lock()
+
+
+redis_client_registry = RedisClientRegistry()
+os.register_at_fork(after_in_child=redis_client_registry.reset)
+
 
 def get_redis_url() -> str:
     url = get_config("services", "redis_url")
@@ -23,16 +82,36 @@ def get_redis_connection() -> Redis:
 
 
 def _get_redis_instance_from_url(url) -> Redis:
-    return Redis.from_url(url)
+    return redis_client_registry.get(url)
 
 
 def download_archive_from_redis(
     redis_connection: Redis, redis_key: str
 ) -> Optional[str]:
     raw_uploaded_report = redis_connection.get(redis_key)
+    return _decode_archive(redis_key, raw_uploaded_report)
+
+
+def download_archives_from_redis(
+    redis_connection: Redis, redis_keys: list[str]
+) -> list[Optional[str]]:
+    """
+    Like `download_archive_from_redis`, but fetches all the `redis_keys` with a
+    single `MGET`, instead of one round-trip per key.
+    """
+    if not redis_keys:
+        return []
+    raw_uploaded_reports = redis_connection.mget(redis_keys)
+    return [
+        _decode_archive(redis_key, raw_uploaded_report)
+        for redis_key, raw_uploaded_report in zip(redis_keys, raw_uploaded_reports)
+    ]
+
+
+def _decode_archive(redis_key: str, raw_uploaded_report: bytes | None) -> Optional[str]:
+    if raw_uploaded_report is None:
+        return None
     gzipped = redis_key.endswith("/gzip")
     if gzipped:
         raw_uploaded_report = zlib.decompress(raw_uploaded_report, zlib.MAX_WBITS | 16)
-    if raw_uploaded_report is not None:
-        return raw_uploaded_report.decode()
-    return None
+    return raw_uploaded_report.decode()
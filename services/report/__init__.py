@@ -2,11 +2,12 @@ import copy
 import itertools
 import logging
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from time import time
 from typing import Any
 
-import orjson
 import sentry_sdk
 from asgiref.sync import async_to_sync
 from celery.exceptions import SoftTimeLimitExceeded
@@ -44,6 +45,11 @@ from services.processing.metrics import (
     PYREPORT_REPORT_JSON_SIZE,
 )
 from services.processing.types import ProcessingErrorDict, UploadArguments
+from services.report.carryforward import (
+    get_carryforward_flags,
+    select_carryforward_chunks,
+)
+from services.report.lazy import LazyReport
 from services.report.parser import get_proper_parser
 from services.report.parser.types import ParsedRawReport
 from services.report.parser.version_one import VersionOneReportParser
@@ -55,6 +61,14 @@ from services.report.raw_upload_processor import process_raw_upload
 from services.repository import get_repo_provider_service
 from services.yaml.reader import get_paths_from_flags, read_yaml_field
 
+# The chunks file is encoded and compressed in pieces of this many characters
+CHUNKS_COMPRESSION_PIECE_SIZE = 1024 * 1024
+
+# Writes the chunks file in the background, while the `report_json` is being written
+_storage_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="report-storage"
+)
+
 
 @dataclass
 class ProcessingError:
@@ -117,8 +131,101 @@ class BaseReportService:
         hypothetically redo the job later.
         """
         db_session = commit_report.get_db_session()
+        upload = Upload(**self._upload_fields(arguments, commit_report))
+        db_session.add(upload)
+        db_session.flush()
+        return upload
+
+    def create_report_uploads(
+        self, arguments_list: list[UploadArguments], commit_report: CommitReport
+    ) -> list[int]:
+        """
+        Creates an `Upload` for each of the user-given arguments, just like
+        `create_report_upload` does, returning their ids in the same order.
+
+        All the `Upload`s are created with a single multi-row `INSERT`, instead of
+        one round-trip to the database per `Upload`.
+        """
+        if not arguments_list:
+            return []
+
+        db_session = commit_report.get_db_session()
+        rows = []
+        for arguments in arguments_list:
+            fields = self._upload_fields(arguments, commit_report)
+            # the ORM falls back to the column default for a missing `external_id`,
+            # whereas all the rows of a multi-row `INSERT` need to have the same keys
+            fields["external_id"] = uuid.UUID(
+                str(fields["external_id"] or uuid.uuid4())
+            )
+            rows.append(fields)
+
+        table = Upload.__table__
+        inserted = db_session.execute(
+            table.insert().values(rows).returning(table.c.id, table.c.external_id)
+        )
+        # `RETURNING` does not guarantee any order, so match them up by `external_id`
+        upload_ids = {external_id: upload_id for upload_id, external_id in inserted}
+        return [upload_ids[fields["external_id"]] for fields in rows]
+
+    def _attach_flags_to_uploads(
+        self,
+        db_session: DbSession,
+        repoid: int,
+        flag_dict: dict[str, RepositoryFlag],
+        upload_ids: list[int],
+        flags_per_upload: list[list[str]],
+    ):
+        """
+        Attaches the flags to the `Upload`s created by `create_report_uploads`.
+
+        All the flags which do not exist yet are created with a single `INSERT`,
+        and added to `flag_dict`, and all the `uploadflagmembership` rows are
+        created with another one.
+        """
+        missing_flags = list(
+            dict.fromkeys(
+                flag_name
+                for flag_names in flags_per_upload
+                for flag_name in flag_names
+                if flag_name not in flag_dict
+            )
+        )
+        if missing_flags:
+            table = RepositoryFlag.__table__
+            inserted = db_session.execute(
+                table.insert()
+                .values(
+                    [
+                        {
+                            "repository_id": repoid,
+                            "flag_name": flag_name,
+                            "external_id": uuid.uuid4(),
+                        }
+                        for flag_name in missing_flags
+                    ]
+                )
+                .returning(table.c.id)
+            )
+            new_flag_ids = [flag_id for (flag_id,) in inserted]
+            new_flags = db_session.query(RepositoryFlag).filter(
+                RepositoryFlag.id_.in_(new_flag_ids)
+            )
+            flag_dict.update((flag.flag_name, flag) for flag in new_flags)
+
+        memberships = [
+            {"upload_id": upload_id, "flag_id": flag_dict[flag_name].id_}
+            for upload_id, flag_names in zip(upload_ids, flags_per_upload)
+            for flag_name in dict.fromkeys(flag_names)
+        ]
+        if memberships:
+            db_session.execute(uploadflagmembership.insert().values(memberships))
+
+    def _upload_fields(
+        self, arguments: UploadArguments, commit_report: CommitReport
+    ) -> dict[str, Any]:
         name = arguments.get("name")
-        upload = Upload(
+        return dict(
             report_id=commit_report.id_,
             external_id=arguments.get("reportid"),
             build_code=arguments.get("build"),
@@ -135,9 +242,6 @@ class BaseReportService:
             state_id=UploadState.UPLOADED.db_id,
             upload_type_id=UploadType.UPLOADED.db_id,
         )
-        db_session.add(upload)
-        db_session.flush()
-        return upload
 
 
 class ReportService(BaseReportService):
@@ -227,6 +331,22 @@ class ReportService(BaseReportService):
         self._attach_flags_to_upload(upload, arguments["flags"])
         return upload
 
+    def create_report_uploads(
+        self, arguments_list: list[UploadArguments], commit_report: CommitReport
+    ) -> list[int]:
+        upload_ids = super().create_report_uploads(arguments_list, commit_report)
+        if upload_ids:
+            db_session = commit_report.get_db_session()
+            repoid = commit_report.commit.repoid
+            self._attach_flags_to_uploads(
+                db_session,
+                repoid,
+                self.fetch_repo_flags(db_session, repoid),
+                upload_ids,
+                [arguments["flags"] for arguments in arguments_list],
+            )
+        return upload_ids
+
     def _attach_flags_to_upload(self, upload: Upload, flag_names: list[str]):
         """
         Internal function that manages creating the proper `RepositoryFlag`s,
@@ -315,10 +435,93 @@ class ReportService(BaseReportService):
         )
         return res
 
+    @sentry_sdk.trace
+    def get_lazy_report_for_commit(
+        self, commit: Commit, report_code=None
+    ) -> LazyReport | None:
+        """
+        Like `get_existing_report_for_commit`, but returns a `LazyReport`, which
+        only decodes the files that are actually accessed.
+        """
+        commitid = commit.commitid
+        if not self.has_initialized_report(commit):
+            return None
+
+        try:
+            archive_service = self.get_archive_service(commit.repository)
+            chunks = archive_service.read_chunks(commitid, report_code)
+        except FileNotInStorageError:
+            log.warning(
+                "File for chunks not found in storage",
+                extra=dict(
+                    commit=commitid, repo=commit.repoid, report_code=report_code
+                ),
+            )
+            return None
+
+        if chunks is None:
+            return None
+
+        report_json = commit.report_json
+        return LazyReport(
+            chunks, report_json["files"], report_json["sessions"], commit.totals
+        )
+
+    @sentry_sdk.trace
+    def get_carryforward_base_report(self, commit: Commit) -> Report | None:
+        """
+        Like `get_existing_report_for_commit`, but only builds the part of the
+        report that can be carried forward according to the current yaml.
+
+        The sessions and files are read from `report_json` first, so the chunks
+        of files not covered by any carried forward session (or not matching
+        the flag paths) are skipped without being parsed.
+        """
+        if not self.has_initialized_report(commit):
+            return None
+
+        report_json = commit.report_json
+        sessions = report_json["sessions"]
+        flags_to_carryforward = get_carryforward_flags(sessions, self.current_yaml)
+        if not flags_to_carryforward:
+            return Report()
+        paths_to_carryforward = get_paths_from_flags(
+            self.current_yaml, flags_to_carryforward
+        )
+
+        try:
+            archive_service = self.get_archive_service(commit.repository)
+            chunks = archive_service.read_chunks(commit.commitid)
+        except FileNotInStorageError:
+            log.warning(
+                "File for chunks not found in storage",
+                extra=dict(commit=commit.commitid, repo=commit.repoid),
+            )
+            return None
+
+        chunks, files = select_carryforward_chunks(
+            chunks,
+            report_json["files"],
+            sessions,
+            flags_to_carryforward,
+            paths_to_carryforward,
+        )
+        log.info(
+            "Selected files to carryforward",
+            extra=dict(
+                commit=commit.commitid,
+                repoid=commit.repoid,
+                number_files=len(report_json["files"]),
+                number_selected_files=len(files),
+            ),
+        )
+        return self.build_report(chunks, files, sessions, None)
+
     def get_appropriate_commit_to_carryforward_from(
         self, commit: Commit, max_parenthood_deepness: int = 10
     ) -> Commit | None:
-        parent_commit = commit.get_parent_commit()
+        ancestors = iter(commit.get_ancestors(max(max_parenthood_deepness, 1)))
+        parent_commit = next(ancestors, None)
         parent_commit_tracking = []
         count = 1  # `parent_commit` is already the first parent
         while (
@@ -351,7 +554,7 @@ class ReportService(BaseReportService):
                     new_parent_commit=parent_commit.parent_commit_id,
                 ),
             )
-            parent_commit = parent_commit.get_parent_commit()
+            parent_commit = next(ancestors, None)
             count += 1
         if parent_commit is None:
             log.warning(
@@ -375,7 +578,7 @@ class ReportService(BaseReportService):
                 ),
             )
             return None
-        return parent_commit
+        return commit.get_db_session().query(Commit).get(parent_commit.id)
 
     def _possibly_shift_carryforward_report(
         self, carryforward_report: Report, base_commit: Commit, head_commit: Commit
@@ -451,7 +654,7 @@ class ReportService(BaseReportService):
             log_simple_metric("worker_service_report_carryforward_base_not_found", 1)
             return Report()
 
-        parent_report = self.get_existing_report_for_commit(parent_commit)
+        parent_report = self.get_carryforward_base_report(parent_commit)
         if parent_report is None:
             log.warning(
                 "Could not carryforward report from another commit because parent has no report",
@@ -691,14 +894,14 @@ class ReportService(BaseReportService):
         archive_service = self.get_archive_service(commit.repository)
 
         totals, report_json = report.to_database()
-        chunks = report.to_archive().encode()
-
+        report_json = report_json.encode()
         PYREPORT_REPORT_JSON_SIZE.observe(len(report_json))
-        PYREPORT_CHUNKS_FILE_SIZE.observe(len(chunks))
-
-        chunks_url = archive_service.write_chunks(commit.commitid, chunks, report_code)
 
         commit.state = "complete" if report else "error"
+        chunks_future = _storage_executor.submit(
+            write_chunks, archive_service, commit.commitid, report, report_code
+        )
+
         commit.totals = totals
         if (
             commit.totals is not None
@@ -717,10 +920,10 @@ class ReportService(BaseReportService):
                 commitid=commit.commitid,
             ),
         )
-        # `report_json` is an `ArchiveField`, so this will trigger an upload
-        # FIXME: we do an unnecessary `loads` roundtrip because of this abstraction,
-        # and we should just save the `report_json` to archive storage directly instead.
-        commit.report_json = orjson.loads(report_json)
+        # `report_json` is an `ArchiveField`, so this will trigger an upload,
+        # of the already serialized `report_json`
+        type(commit).report_json.set_serialized(commit, report_json)
+        chunks_url = chunks_future.result()
 
         # `report` is an accessor which implicitly queries `CommitReport`
         if commit_report := commit.report:
@@ -835,3 +1038,34 @@ def delete_uploads_by_sessionid(
         synchronize_session=False
     )
     db_session.flush()
+
+
+@sentry_sdk.trace
+def write_chunks(
+    archive_service: ArchiveService,
+    commitid: str,
+    report: Report,
+    report_code: str | None = None,
+) -> str:
+    """
+    Writes the chunks file of `report` to storage.
+
+    The chunks are encoded and gzip-compressed piece by piece, so that the
+    encoded file, which can be a lot larger than its compressed form, is never
+    held in memory as a whole.
+    """
+    chunks = report.to_archive()
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    compressed = []
+    size = 0
+    for start in range(0, len(chunks), CHUNKS_COMPRESSION_PIECE_SIZE):
+        piece = chunks[start : start + CHUNKS_COMPRESSION_PIECE_SIZE].encode()
+        size += len(piece)
+        compressed.append(compressor.compress(piece))
+    compressed.append(compressor.flush())
+    del chunks
+
+    PYREPORT_CHUNKS_FILE_SIZE.observe(size)
+    return archive_service.write_chunks(
+        commitid, b"".join(compressed), report_code, is_already_gzipped=True
+    )
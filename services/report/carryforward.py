@@ -0,0 +1,80 @@
+import re
+from typing import Sequence
+
+from shared.utils.match import match
+
+END_OF_HEADER = "\n<<<<< end_of_header >>>>>\n"
+END_OF_CHUNK = "\n<<<<< end_of_chunk >>>>>\n"
+
+# Every session a line refers to is serialized as a list starting with the
+# session id (`[0,1]` in the line sessions, `[0,1,null,[0]]` in datapoints).
+# Other parts of a line can match too (`[1,null,...`), so this gives a
+# superset of the sessions present in a chunk, which is good enough to tell
+# whether a file can possibly be covered by a session without decoding it.
+SESSION_REFERENCE = re.compile(r"\[\s*(\d+)\s*,")
+
+
+def get_carryforward_flags(sessions: dict, current_yaml) -> list[str]:
+    """
+    Returns the flags present in the `report_json` `sessions` that are
+    configured to be carried forward.
+    """
+    flag_names = {
+        flag for session in sessions.values() for flag in (session.get("f") or [])
+    }
+    return sorted(
+        flag_name
+        for flag_name in flag_names
+        if current_yaml.flag_has_carryfoward(flag_name)
+    )
+
+
+def select_carryforward_chunks(
+    chunks: str,
+    files: dict,
+    sessions: dict,
+    flags_to_carryforward: Sequence[str],
+    paths_to_carryforward: Sequence[str] | None,
+) -> tuple[str, dict]:
+    """
+    Reduces a raw `chunks` file and the `report_json` `files` of a parent
+    report down to the files that can be carried forward.
+
+    Files that don't match `paths_to_carryforward`, or whose chunk does not
+    reference any of the sessions carrying one of `flags_to_carryforward`,
+    would be dropped by `generate_carryforward_report` anyways. They are
+    dropped here based on the raw text, without ever decoding their lines.
+
+    Returns the new chunks and `files`, with re-numbered file indexes.
+    """
+    carried_session_ids = {
+        str(sid)
+        for sid, session in sessions.items()
+        if set(session.get("f") or []) & set(flags_to_carryforward)
+    }
+
+    if END_OF_HEADER in chunks:
+        header, chunks = chunks.split(END_OF_HEADER, 1)
+        header += END_OF_HEADER
+    else:
+        header = ""
+    chunks_by_index = chunks.split(END_OF_CHUNK)
+
+    selected_chunks = []
+    selected_files = {}
+    for filename, file_summary in files.items():
+        if paths_to_carryforward and not match(paths_to_carryforward, filename):
+            continue
+
+        file_index = file_summary[0]
+        if file_index >= len(chunks_by_index):
+            continue
+        chunk = chunks_by_index[file_index]
+        referenced_sessions = set(SESSION_REFERENCE.findall(chunk))
+        if not referenced_sessions & carried_session_ids:
+            continue
+
+        selected_files[filename] = [len(selected_chunks), *file_summary[1:]]
+        selected_chunks.append(chunk)
+
+    return header + END_OF_CHUNK.join(selected_chunks), selected_files
@@ -1,6 +1,5 @@
 import re
 from collections import defaultdict
-from io import BytesIO
 
 import sentry_sdk
 
@@ -31,9 +30,14 @@ def from_txt(string: bytes, report_builder_session: ReportBuilderSession) -> Non
     filepath = report_builder_session.filepath
     path_fixer = report_builder_session.path_fixer
 
-    line_iterator = iter(BytesIO(string))
+    # the branch detection works on the source code of the lines, so the whole
+    # report is decoded at once, instead of line by line
+    text = string.decode(errors="replace")
+    if text.endswith("\n"):
+        text = text[:-1]
+    line_iterator = iter(text.split("\n"))
     # clean and strip lines
-    filename = next(line_iterator).decode(errors="replace").rstrip("\n")
+    filename = next(line_iterator)
     filename = filename.split(":")[3].lstrip("./")
     if filepath and filepath.endswith(filename + ".gcov"):
         filename = path_fixer(filepath[:-5]) or path_fixer(filename)
@@ -67,21 +71,24 @@ def from_txt(string: bytes, report_builder_session: ReportBuilderSession) -> Non
     lines = defaultdict(list)
     line_types = {}
 
-    for encoded_line in line_iterator:
-        line = encoded_line.decode(errors="replace").rstrip("\n")
-        if "LCOV_EXCL_START" in line:
+    for line in line_iterator:
+        if "LCOV_EXCL" not in line:
+            # the common case, which needs none of the exclusion checks below
+            if ignore:
+                continue
+
+        elif "LCOV_EXCL_START" in line:
             ignore = True
+            continue
 
         elif "LCOV_EXCL_END" in line or "LCOV_EXCL_STOP" in line:
             ignore = False
+            continue
 
-        elif ignore:
-            pass
-
-        elif "LCOV_EXCL_LINE" in line:
-            pass
+        elif ignore or "LCOV_EXCL_LINE" in line:
+            continue
 
-        elif line[:4] == "func":
+        if line[:4] == "func":
             # for next line
             next_is_func = True
 
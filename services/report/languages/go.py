@@ -1,6 +1,8 @@
-from collections import defaultdict
-from io import BytesIO
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from itertools import groupby
+from typing import Iterator
 
 import sentry_sdk
 from shared.utils import merge
@@ -32,21 +34,20 @@ def from_txt(string: bytes, report_builder_session: ReportBuilderSession) -> Non
     # Process the bytes from uploaded report to intermediary representation
     files = process_bytes_into_files(string)
 
-    for filename, lines in files.items():
+    # lines covered by the same regions share the same partials, so their
+    # coverage is only computed once
+    coverages: dict[frozenset, int | str] = {}
+
+    for filename, regions in files.items():
         _file = report_builder_session.create_coverage_file(filename)
         if _file is None:
             continue
 
-        for ln, partials in lines.items():
-            best_in_partials = max(map(lambda p: p[2], partials))
-            partials = combine_partials(partials)
-            if partials:
-                cov = partials_to_line(partials)
-                cov_to_use = cov
-            else:
-                cov_to_use = best_in_partials
-            if partials_as_hits and line_type(cov_to_use) == LineType.partial:
-                cov_to_use = 1
+        for ln, partials in regions.lines():
+            if (cov_to_use := coverages.get(partials)) is None:
+                cov_to_use = coverages[partials] = line_coverage(
+                    partials, partials_as_hits
+                )
 
             _line = report_builder_session.create_coverage_line(cov_to_use)
             _file.append(ln, _line)
@@ -54,7 +55,106 @@ def from_txt(string: bytes, report_builder_session: ReportBuilderSession) -> Non
         report_builder_session.append(_file)
 
 
-def process_bytes_into_files(string: bytes) -> dict[str, dict[int, set]]:
+def line_coverage(partials: frozenset, partials_as_hits: bool) -> int | str:
+    best_in_partials = max(map(lambda p: p[2], partials))
+    combined = combine_partials(partials)
+    if combined:
+        cov_to_use = partials_to_line(combined)
+    else:
+        cov_to_use = best_in_partials
+    if partials_as_hits and line_type(cov_to_use) == LineType.partial:
+        cov_to_use = 1
+    return cov_to_use
+
+
+@dataclass
+class FileRegions:
+    """
+    The regions of a single file, stored as the partials of the lines on which
+    regions start or end, and as start/end events for the lines in between,
+    which are fully covered by a region.
+
+    This avoids expanding long multi-line regions into every line they cover
+    until `lines` sweeps over the file once.
+    """
+
+    partials: dict[int, set] = field(default_factory=lambda: defaultdict(set))
+    """
+    The `(start_column, end_column, hits)` partials of the lines where regions
+    start or end.
+    """
+    events: list[tuple[int, int, int]] = field(default_factory=list)
+    """
+    `(line, hits, +1 / -1)` events marking the first line fully covered by a
+    region, and the first line after that which is not anymore.
+    """
+
+    def add(self, region: Region) -> None:
+        # add start of line
+        if region.start.line == region.end.line:
+            self.partials[region.start.line].add(
+                (region.start.column, region.end.column, region.hits)
+            )
+        else:
+            self.partials[region.start.line].add(
+                (region.start.column, None, region.hits)
+            )
+            # add middles
+            if region.end.line > region.start.line + 1:
+                self.events.append((region.start.line + 1, region.hits, 1))
+                self.events.append((region.end.line, region.hits, -1))
+            if region.end.column > 2:
+                # add end of line
+                self.partials[region.end.line].add(
+                    (None, region.end.column, region.hits)
+                )
+
+    def lines(self) -> Iterator[tuple[int, frozenset]]:
+        """
+        Yields the line numbers, in order, together with all the partials of
+        that line, exactly as if every line covered by a region had its own
+        `(0, None, hits)` partial.
+
+        Consecutive lines covered by the same regions share the same `frozenset`.
+        """
+        events = sorted(self.events)
+        boundaries = sorted({ln for ln, _, _ in events}.union(self.partials))
+        active: Counter[int] = Counter()
+        middle: frozenset = frozenset()
+        next_event = 0
+
+        for i, ln in enumerate(boundaries):
+            changed = False
+            while next_event < len(events) and events[next_event][0] == ln:
+                _, hits, delta = events[next_event]
+                active[hits] += delta
+                if not active[hits]:
+                    del active[hits]
+                changed = True
+                next_event += 1
+            if changed:
+                middle = frozenset((0, None, hits) for hits in active)
+
+            if partials := self.partials.get(ln):
+                yield ln, middle.union(partials)
+            elif middle:
+                yield ln, middle
+
+            # every region ends on a boundary, so there is always a next one here
+            if middle:
+                for middle_ln in range(ln + 1, boundaries[i + 1]):
+                    yield middle_ln, middle
+
+
+# A well-formed coverage line, which is parsed without decoding anything but the
+# file name: `name.go:line.column,line.column numberOfStatements count`.
+# Any other line goes through the generic parsing in `parse_coverage`.
+COVERAGE_LINE = re.compile(
+    rb"([^:]*):([0-9]+)\.([0-9]+),([0-9]+)\.([0-9]+) [0-9]+ ([0-9]+)"
+).fullmatch
+
+
+def process_bytes_into_files(string: bytes) -> dict[str, FileRegions]:
     """
     mode: count
     github.com/codecov/sample_go/sample_go.go:7.14,9.2 1 1
@@ -80,11 +180,27 @@ def process_bytes_into_files(string: bytes) -> dict[str, dict[int, set]]:
         - `name.go:line.column,line.column numberOfStatements count`
     """
 
-    files: dict[str, dict[int, set]] = {}
+    files: dict[str, FileRegions] = {}
+
+    for encoded_line in string.split(b"\n"):
+        if encoded_line.startswith(b"mode: "):
+            continue
+
+        if match := COVERAGE_LINE(encoded_line):
+            filename = match[1].decode(errors="replace")
+            start_line, start_column, end_line, end_column, hits = map(
+                int, match.groups()[1:]
+            )
+            region = Region(
+                start=SourceLocation(line=start_line, column=start_column),
+                end=SourceLocation(line=end_line, column=end_column),
+                hits=hits,
+            )
+            files.setdefault(filename, FileRegions()).add(region)
+            continue
 
-    for encoded_line in BytesIO(string):
-        line = encoded_line.decode(errors="replace").rstrip("\n")
-        if not line or line.startswith("mode: "):
+        line = encoded_line.decode(errors="replace")
+        if not line:
             continue
 
         split = line.split(":", 1)
@@ -104,21 +220,7 @@ def process_bytes_into_files(string: bytes) -> dict[str, dict[int, set]]:
                 "Go coverage line does not match expected format",
             )
 
-        lines = files.setdefault(filename, defaultdict(set))
-
-        # add start of line
-        if region.start.line == region.end.line:
-            lines[region.start.line].add(
-                (region.start.column, region.end.column, region.hits)
-            )
-        else:
-            lines[region.start.line].add((region.start.column, None, region.hits))
-            # add middles
-            for ln in range(region.start.line + 1, region.end.line):
-                lines[ln].add((0, None, region.hits))
-            if region.end.column > 2:
-                # add end of line
-                lines[region.end.line].add((None, region.end.column, region.hits))
+        files.setdefault(filename, FileRegions()).add(region)
 
     return files
 
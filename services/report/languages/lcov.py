@@ -1,7 +1,7 @@
 import logging
+import re
 from collections import defaultdict
 from decimal import Decimal, InvalidOperation
-from io import BytesIO
 
 import sentry_sdk
 from shared.reports.resources import ReportFile
@@ -23,6 +23,25 @@ class LcovProcessor(BaseLanguageProcessor):
         return from_txt(content, report_builder_session)
 
 
+# Records which are ignored, recognized without decoding the line.
+IGNORED_RECORDS = (
+    b"TN:",
+    b"LF:",
+    b"LH:",
+    b"FNF:",
+    b"FNH:",
+    b"BRF:",
+    b"BRH:",
+    b"FNDA:",
+)
+
+# The by far most common form of a `DA` record, which is handled without decoding
+# the line: `DA:<line number>,<execution count>[,<checksum>]`, with plain
+# numbers, and nothing but whitespace after the count unless there is a checksum.
+# Any other `DA` line goes through the generic parsing below.
+DA_RECORD = re.compile(rb"DA:([0-9]+),([0-9]+)(?:,|[ \t\r\f\v]*$)")
+
+
 def from_txt(reports: bytes, report_builder_session: ReportBuilderSession) -> None:
     # http://ltp.sourceforge.net/coverage/lcov/geninfo.1.php
     # merge same files
@@ -42,8 +61,22 @@ def _process_file(
     skip_lines: list[str] = []
     _file: ReportFile | None = None
 
-    for encoded_line in BytesIO(doc):
-        line = encoded_line.decode(errors="replace").rstrip("\n")
+    for encoded_line in doc.split(b"\n"):
+        if encoded_line.startswith(IGNORED_RECORDS):
+            continue
+        if da_record := DA_RECORD.match(encoded_line):
+            if _file is None:
+                return None
+            line_number, hits = da_record.groups()
+            if line_number[0] == ord("0"):
+                continue
+            _file.append(
+                int(line_number),
+                report_builder_session.create_coverage_line(int(hits)),
+            )
+            continue
+
+        line = encoded_line.decode(errors="replace")
         if line == "" or ":" not in line:
             continue
 
@@ -320,3 +320,30 @@ class TestGcov(BaseTestCase):
         report = report_builder_session.output_report()
 
         assert not report
+
+    def test_decoding(self):
+        text = b"""    -:    0:Source:tmp.c
+    1:    1:caf\xc3\xa9 \xff
+    -:    2:/* LCOV_EXCL_START */
+    1:    3:ignored
+    -:    4:LCOV_EXCL_STOP
+#####:    5:missed\r"""
+
+        def process(text):
+            report_builder_session = create_report_builder_session(
+                current_yaml={"parsers": {"gcov": {}}}
+            )
+            gcov.from_txt(text, report_builder_session)
+            report = report_builder_session.output_report()
+            return self.convert_report_to_better_readable(report)["archive"]
+
+        assert (
+            process(text)
+            == process(text + b"\n")
+            == {
+                "tmp.c": [
+                    (1, 1, None, [[0, 1, None, None, None]], None, None),
+                    (5, 0, None, [[0, 0, None, None, None]], None, None),
+                ]
+            }
+        )
@@ -1,8 +1,13 @@
+import random
+import re
+from collections import defaultdict
+
 import pytest
 from shared.reports.types import ReportTotals
 
 from helpers.exceptions import CorruptRawReportError
 from services.report.languages import go
+from services.report.languages.helpers import Region, SourceLocation
 from test_utils.base import BaseTestCase
 
 from . import create_report_builder_session
@@ -670,3 +675,53 @@ class TestGo(BaseTestCase):
             ex.value.expected_format
             == "name.go:line.column,line.column numberOfStatements hits"
         )
+
+    def test_fast_path_parity(self, mocker):
+        text = (
+            "mode: count\n"
+            "path/caf\xe9.go:1.2,1.40 1 3\n"
+            "path/file.go:2.2,4.3 1 0\r\n"
+            "path/file.go:5.02,5.10 01 +7\n"
+            "path/file.go:6.2,6.10 1 1 \n"
+            "path/file.go:7.2,9.1 2 4\n"
+            "path/file.go:19: calcP 100.0%\n"
+            "\n"
+        ).encode() + b"path/invalid\xff.go:1.2,1.40 1 3"
+
+        fast = go.process_bytes_into_files(text)
+        mocker.patch.object(go, "COVERAGE_LINE", re.compile(rb"(?!)").fullmatch)
+        assert go.process_bytes_into_files(text) == fast
+        assert list(fast) == [
+            "path/caf\xe9.go",
+            "path/file.go",
+            "path/invalid\ufffd.go",
+        ]
+
+    def test_file_regions_sweep(self):
+        rng = random.Random(0)
+        regions = go.FileRegions()
+        expanded = defaultdict(set)
+        for _ in range(500):
+            start_line = rng.randint(1, 100)
+            end_line = start_line + rng.choice([-1, 0, 0, 1, 2, rng.randint(3, 30)])
+            start_column, end_column = rng.randint(0, 5), rng.randint(0, 40)
+            hits = rng.choice([0, 0, 1, 2, 5])
+            regions.add(
+                Region(
+                    start=SourceLocation(line=start_line, column=start_column),
+                    end=SourceLocation(line=end_line, column=end_column),
+                    hits=hits,
+                )
+            )
+
+            # the per-line expansion of the region
+            if start_line == end_line:
+                expanded[start_line].add((start_column, end_column, hits))
+            else:
+                expanded[start_line].add((start_column, None, hits))
+                for ln in range(start_line + 1, end_line):
+                    expanded[ln].add((0, None, hits))
+                if end_column > 2:
+                    expanded[end_line].add((None, end_column, hits))
+
+        assert list(regions.lines()) == sorted(expanded.items())
@@ -1,3 +1,5 @@
+import re
+
 from services.report.languages import lcov
 from test_utils.base import BaseTestCase
 
@@ -215,3 +217,48 @@ end_of_record
                 (1047, "1/2", "b", [[0, "1/2", ["0:0"], None, None]], None, None),
             ]
         }
+
+    def test_fast_path_parity(self, mocker):
+        text = (
+            """
+TN:name
+SF:src/caf\xe9.c
+FN:1,main
+DA:1,3
+DA:2,0,46ba21aa66ea047aced7130c2760d7d4
+DA:3,5\r
+DA:4,2 \t
+DA:05,1
+DA:6,-1
+DA:7,1.5e3
+DA:8,undefined
+DA:9, 4
+ DA:10,1
+DA:11,12345678901234567890
+BRDA:1,0,0,1
+BRDA:1,0,1,-
+LF:11
+LH:8
+end_of_record
+SF:other.c
+DA:1,1
+end_of_record
+""".encode()
+            + b"SF:invalid\xff.c\nDA:1,1\nend_of_record"
+        )
+
+        def process():
+            report_builder_session = create_report_builder_session()
+            lcov.from_txt(text, report_builder_session)
+            report = report_builder_session.output_report()
+            return self.convert_report_to_better_readable(report)
+
+        fast = process()
+        mocker.patch.object(lcov, "DA_RECORD", re.compile(rb"(?!)"))
+        mocker.patch.object(lcov, "IGNORED_RECORDS", ())
+        assert process() == fast
+        assert sorted(fast["archive"]) == [
+            "invalid\ufffd.c",
+            "other.c",
+            "src/caf\xe9.c",
+        ]
@@ -0,0 +1,130 @@
+from functools import cached_property
+from typing import Iterable
+
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile, ReportTotals
+from shared.utils.sessions import Session
+
+from services.report.carryforward import END_OF_CHUNK, END_OF_HEADER
+
+
+def index_chunks(chunks: str) -> tuple[str, list[tuple[int, int]]]:
+    """
+    Finds the header and the `(start, end)` offsets of every file chunk within
+    a raw `chunks` file, without splitting it into separate strings.
+    """
+    header_end = chunks.find(END_OF_HEADER)
+    if header_end >= 0:
+        start = header_end + len(END_OF_HEADER)
+        header = chunks[:start]
+    else:
+        start = 0
+        header = ""
+
+    offsets = []
+    while (end := chunks.find(END_OF_CHUNK, start)) >= 0:
+        offsets.append((start, end))
+        start = end + len(END_OF_CHUNK)
+    offsets.append((start, len(chunks)))
+    return header, offsets
+
+
+class LazyReport:
+    """
+    A read-only view of a stored report, for consumers that only need its
+    totals, its sessions, or a handful of its files.
+
+    The `report_json` is used right away, but the line data of a file is only
+    decoded when that file is first accessed. Consumers needing the whole
+    report can get it from `full_report`, which decodes everything once.
+    """
+
+    def __init__(
+        self,
+        chunks: str,
+        files: dict,
+        sessions: dict,
+        totals: dict | None,
+        report_class: type[Report] = ReadOnlyReport,
+    ):
+        for session_id, session in sessions.items():
+            if not isinstance(session, Session):
+                # make sure the `Session` objects get an `id` when decoded:
+                session["id"] = int(session_id)
+        self._chunks = chunks
+        self._files = files
+        self._sessions = sessions
+        self._totals = totals
+        self._report_class = report_class
+        self._decoded_files: dict[str, ReportFile | None] = {}
+
+    @cached_property
+    def _chunks_index(self) -> tuple[str, list[tuple[int, int]]]:
+        return index_chunks(self._chunks)
+
+    @cached_property
+    def _metadata_report(self) -> Report:
+        # a report without any files, which decodes the `sessions` and `totals`
+        return Report.from_chunks(
+            chunks="", files={}, sessions=self._sessions, totals=self._totals
+        )
+
+    @property
+    def files(self) -> list[str]:
+        return list(self._files)
+
+    @property
+    def sessions(self) -> dict[int, Session]:
+        return self._metadata_report.sessions
+
+    @property
+    def totals(self) -> ReportTotals:
+        if self._totals is None:
+            # the commit has no stored totals, so they have to be computed
+            return self.full_report.totals
+        return self._metadata_report.totals
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, filename: str) -> ReportFile | None:
+        if filename not in self._decoded_files:
+            report = self.subset([filename])
+            self._decoded_files[filename] = report.get(filename)
+        return self._decoded_files[filename]
+
+    def subset(self, filenames: Iterable[str]) -> Report:
+        """
+        Builds a report containing only the given files, decoding only their chunks.
+        Files not present in the report are ignored.
+        """
+        header, offsets = self._chunks_index
+        chunks = []
+        files = {}
+        for filename in dict.fromkeys(filenames):
+            if (file_summary := self._files.get(filename)) is None:
+                continue
+            file_index = file_summary[0]
+            if file_index >= len(offsets):
+                continue
+            start, end = offsets[file_index]
+            files[filename] = [len(chunks), *file_summary[1:]]
+            chunks.append(self._chunks[start:end])
+        return self._report_class.from_chunks(
+            chunks=header + END_OF_CHUNK.join(chunks),
+            files=files,
+            sessions=self._sessions,
+            totals=None,
+        )
+
+    @cached_property
+    def full_report(self) -> Report:
+        return self._report_class.from_chunks(
+            chunks=self._chunks,
+            files=self._files,
+            sessions=self._sessions,
+            totals=self._totals,
+        )
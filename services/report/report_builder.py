@@ -212,6 +212,48 @@ class ReportBuilderSession(object):
         )
 
 
+class NoLabelsReportBuilderSession(ReportBuilderSession):
+    """
+    A `ReportBuilderSession` for repositories that don't use labels.
+
+    As the lines it creates never have any datapoints, there are no labels
+    to collect when appending files, and nothing to rewrite when outputting
+    the report.
+    """
+
+    def append(self, file: ReportFile):
+        return self._report.append(file)
+
+    def output_report(self) -> Report:
+        return self._report
+
+    def create_coverage_line(
+        self,
+        coverage: int | str,
+        coverage_type: CoverageType | None = None,
+        labels_list_of_lists: list[list[str | SpecialLabelsEnum]]
+        | list[list[int]]
+        | None = None,
+        partials=None,
+        missing_branches=None,
+        complexity=None,
+    ) -> ReportLine:
+        return ReportLine.create(
+            coverage=coverage,
+            type=coverage_type.report_value if coverage_type else None,
+            sessions=[
+                LineSession(
+                    id=self._report_builder.sessionid,
+                    coverage=coverage,
+                    branches=missing_branches,
+                    partials=partials,
+                    complexity=complexity,
+                )
+            ],
+            complexity=complexity,
+        )
+
+
 class ReportBuilder(object):
     def __init__(
         self,
@@ -227,6 +269,8 @@ class ReportBuilder(object):
         self._supports_labels = self.supports_labels()
 
     def create_report_builder_session(self, filepath) -> ReportBuilderSession:
+        if not self._supports_labels:
+            return NoLabelsReportBuilderSession(self, filepath)
         return ReportBuilderSession(self, filepath)
 
     def supports_labels(self) -> bool:
@@ -0,0 +1,71 @@
+from shared.yaml import UserYaml
+
+from services.report.carryforward import (
+    END_OF_CHUNK,
+    END_OF_HEADER,
+    get_carryforward_flags,
+    select_carryforward_chunks,
+)
+
+SESSIONS = {
+    "0": {"f": ["unit"], "t": None},
+    "1": {"f": ["integration"], "t": None},
+    "2": {"f": None, "t": None},
+}
+
+
+def test_get_carryforward_flags():
+    yaml = UserYaml(
+        {
+            "flags": {
+                "unit": {"carryforward": True},
+                "integration": {"carryforward": False},
+            }
+        }
+    )
+    assert get_carryforward_flags(SESSIONS, yaml) == ["unit"]
+    assert get_carryforward_flags({}, yaml) == []
+
+
+def test_select_carryforward_chunks():
+    chunks = END_OF_CHUNK.join(
+        [
+            "{}\n[1,null,[[0,1]]]",
+            "{}\n[1,null,[[1,1]]]",
+            "{}\n[0,null,[[0,0],[2,1]]]\n\n[1,null,[[1,1]]]",
+        ]
+    )
+    files = {
+        "unit.py": [0, [0, 1, 1, 0, 0, "100"], None, None],
+        "integration.py": [1, [0, 1, 1, 0, 0, "100"], None, None],
+        "both.py": [2, [0, 2, 1, 1, 0, "50"], None, None],
+        "missing.py": [5, [0, 1, 1, 0, 0, "100"], None, None],
+    }
+    header = '{"labels_index": {}}'
+
+    new_chunks, new_files = select_carryforward_chunks(
+        header + END_OF_HEADER + chunks, files, SESSIONS, ["unit"], None
+    )
+    assert new_files == {
+        "unit.py": [0, [0, 1, 1, 0, 0, "100"], None, None],
+        "both.py": [1, [0, 2, 1, 1, 0, "50"], None, None],
+    }
+    assert new_chunks == header + END_OF_HEADER + END_OF_CHUNK.join(
+        [
+            "{}\n[1,null,[[0,1]]]",
+            "{}\n[0,null,[[0,0],[2,1]]]\n\n[1,null,[[1,1]]]",
+        ]
+    )
+
+
+def test_select_carryforward_chunks_with_paths():
+    chunks = END_OF_CHUNK.join(["{}\n[1,null,[[0,1]]]", "{}\n[1,null,[[0,1]]]"])
+    files = {
+        "src/a.py": [0, [0, 1, 1, 0, 0, "100"], None, None],
+        "tests/b.py": [1, [0, 1, 1, 0, 0, "100"], None, None],
+    }
+    new_chunks, new_files = select_carryforward_chunks(
+        chunks, files, SESSIONS, ["unit"], ["^tests/.*"]
+    )
+    assert new_files == {"tests/b.py": [0, [0, 1, 1, 0, 0, "100"], None, None]}
+    assert new_chunks == "{}\n[1,null,[[0,1]]]"
@@ -0,0 +1,69 @@
+import json
+
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile, ReportLine
+from shared.utils.sessions import Session
+
+from services.report.lazy import LazyReport, index_chunks
+
+
+def _sample_report() -> Report:
+    report = Report()
+    for name, coverage in (("a.py", 1), ("b.py", 0), ("c.py", 1)):
+        report_file = ReportFile(name)
+        report_file.append(1, ReportLine.create(coverage=coverage, sessions=[[0, 1]]))
+        report_file.append(2, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+        report.append(report_file)
+    report.add_session(Session(flags=["unit"]))
+    return report
+
+
+def _lazy_report(report: Report) -> LazyReport:
+    totals, report_json = report.to_database()
+    report_json = json.loads(report_json)
+    return LazyReport(
+        report.to_archive(), report_json["files"], report_json["sessions"], totals
+    )
+
+
+def test_index_chunks():
+    chunks = "{}\n<<<<< end_of_header >>>>>\nA\n<<<<< end_of_chunk >>>>>\n\n<<<<< end_of_chunk >>>>>\nC"
+    header, offsets = index_chunks(chunks)
+    assert header == "{}\n<<<<< end_of_header >>>>>\n"
+    assert [chunks[start:end] for start, end in offsets] == ["A", "", "C"]
+
+    header, offsets = index_chunks("A\n<<<<< end_of_chunk >>>>>\nB")
+    assert header == ""
+    assert offsets == [(0, 1), (27, 28)]
+
+
+def test_lazy_report_metadata_does_not_decode_files(mocker):
+    report = _sample_report()
+    lazy = _lazy_report(report)
+    from_chunks = mocker.spy(ReadOnlyReport, "from_chunks")
+
+    assert lazy.files == ["a.py", "b.py", "c.py"]
+    assert "b.py" in lazy and "d.py" not in lazy
+    assert len(lazy) == 3
+    assert list(lazy.sessions) == [0]
+    assert lazy.sessions[0].flags == ["unit"]
+    assert lazy.totals == report.totals
+    from_chunks.assert_not_called()
+
+
+def test_lazy_report_decodes_single_files(mocker):
+    report = _sample_report()
+    lazy = _lazy_report(report)
+    subset = mocker.spy(lazy, "subset")
+
+    assert lazy.get("b.py").totals == report.get("b.py").totals
+    assert lazy.get("b.py").totals == report.get("b.py").totals
+    assert lazy.get("missing.py") is None
+    assert subset.call_count == 2
+
+    partial = lazy.subset(["c.py", "a.py", "c.py", "missing.py"])
+    assert sorted(partial.files) == ["a.py", "c.py"]
+    assert partial.get("c.py").totals == report.get("c.py").totals
+
+    assert lazy.full_report.totals == report.totals
+    assert sorted(lazy.full_report.files) == ["a.py", "b.py", "c.py"]
@@ -4,7 +4,9 @@ from shared.reports.types import CoverageDatapoint
 
 from services.report.report_builder import (
     CoverageType,
+    NoLabelsReportBuilderSession,
     ReportBuilder,
+    ReportBuilderSession,
     SpecialLabelsEnum,
 )
 
@@ -31,7 +33,8 @@ def test_report_builder_session(mocker):
     )
     filepath = "filepath"
     builder = ReportBuilder(current_yaml, sessionid, ignored_lines, path_fixer)
-    builder_session = builder.create_report_builder_session(filepath)
+    # the label-aware session, even though this yaml does not use labels
+    builder_session = ReportBuilderSession(builder, filepath)
     first_file = ReportFile("filename.py")
     first_file.append(2, ReportLine.create(coverage=0))
     first_file.append(
@@ -144,7 +147,8 @@ def test_report_builder_session_only_all_labels(mocker):
     )
     filepath = "filepath"
     builder = ReportBuilder(current_yaml, sessionid, ignored_lines, path_fixer)
-    builder_session = builder.create_report_builder_session(filepath)
+    # the label-aware session, even though this yaml does not use labels
+    builder_session = ReportBuilderSession(builder, filepath)
     first_file = ReportFile("filename.py")
     first_file.append(2, ReportLine.create(coverage=0))
     first_file.append(
@@ -279,6 +283,37 @@ def test_report_builder_session_create_line(mocker):
     )
 
 
+def test_report_builder_session_no_labels(mocker):
+    labels_builder = ReportBuilder(
+        {"flags": {"flag": {"carryforward_mode": "labels"}}}, 45, {}, None
+    )
+    builder = ReportBuilder({}, 45, {}, None)
+    labels_session = labels_builder.create_report_builder_session("filepath")
+    builder_session = builder.create_report_builder_session("filepath")
+    assert type(labels_session) is ReportBuilderSession
+    assert isinstance(builder_session, NoLabelsReportBuilderSession)
+
+    for args, kwargs in [
+        ((1,), {}),
+        ((0, CoverageType.line), {"complexity": 3}),
+        (("1/2", CoverageType.branch), {"missing_branches": ["1:2"]}),
+        ((1, CoverageType.method), {"labels_list_of_lists": [[]]}),
+    ]:
+        line = builder_session.create_coverage_line(*args, **kwargs)
+        expected = labels_session.create_coverage_line(*args, **kwargs)
+        assert line == ReportLine.create(
+            coverage=expected.coverage,
+            type=expected.type,
+            sessions=expected.sessions,
+            complexity=expected.complexity,
+        )
+
+    report_file = ReportFile("filename.py")
+    report_file.append(1, builder_session.create_coverage_line(1))
+    builder_session.append(report_file)
+    assert builder_session.output_report().files == ["filename.py"]
+
+
 def test_report_builder_session_create_line_mixed_labels(mocker):
     current_yaml, sessionid, ignored_lines, path_fixer = (
         {
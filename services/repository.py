@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import re
 from dataclasses import dataclass
@@ -119,30 +120,48 @@ async def fetch_appropriate_parent_for_commit(
             return possible_commit.commitid
 
     ancestors_tree = await repository_service.get_ancestors_tree(commitid)
+    ancestor_levels = []
     elements = [ancestors_tree]
     while elements:
         parents = [k for el in elements for k in el["parents"]]
-        parent_commits = [p["commitid"] for p in parents]
-        closest_parent_query = db_session.query(Commit.commitid, Commit.branch).filter(
-            Commit.commitid.in_(parent_commits),
-            Commit.repoid == commit.repoid,
-            ~Commit.message.is_(None),
-            ~Commit.deleted.is_(True),
+        if parents:
+            ancestor_levels.append([p["commitid"] for p in parents])
+        elements = parents
+
+    # Resolve every ancestor of the tree with a single query, and then walk
+    # the tree level by level in memory to find the closest usable parent
+    all_ancestors = {sha for level in ancestor_levels for sha in level}
+    known_ancestors = {}
+    if all_ancestors:
+        known_ancestors = {
+            row.commitid: row
+            for row in db_session.query(
+                Commit.commitid,
+                Commit.branch,
+                Commit.message.isnot(None).label("has_message"),
+            ).filter(
+                Commit.commitid.in_(all_ancestors),
+                Commit.repoid == commit.repoid,
+                ~Commit.deleted.is_(True),
+            )
+        }
+
+    for level in ancestor_levels:
+        level_commits = [
+            known_ancestors[sha]
+            for sha in dict.fromkeys(level)
+            if sha in known_ancestors
+        ]
+        closest_parent = _pick_commit_for_branch(
+            commit, [c for c in level_commits if c.has_message]
         )
-        closest_parent = _possibly_filter_out_branch(commit, closest_parent_query)
         if closest_parent:
             return closest_parent.commitid
 
         if closest_parent_without_message is None:
-            parent_query = db_session.query(Commit.commitid, Commit.branch).filter(
-                Commit.commitid.in_(parent_commits),
-                Commit.repoid == commit.repoid,
-                ~Commit.deleted.is_(True),
-            )
-            parent = _possibly_filter_out_branch(commit, parent_query)
+            parent = _pick_commit_for_branch(commit, level_commits)
             if parent:
                 closest_parent_without_message = parent.commitid
-        elements = parents
 
     log.warning(
         "Unable to find a parent commit that was properly found on Github",
@@ -152,7 +171,10 @@ async def fetch_appropriate_parent_for_commit(
 
 
 def _possibly_filter_out_branch(commit: Commit, query: Query) -> Commit | None:
-    commits = query.all()
+    return _pick_commit_for_branch(commit, query.all())
+
+
+def _pick_commit_for_branch(commit: Commit, commits: list) -> Commit | None:
     if len(commits) == 1:
         return commits[0]
 
@@ -183,6 +205,19 @@ def possibly_update_commit_from_provider_info(
     return False
 
 
+async def _gather_provider_calls(*calls):
+    """
+    Runs the given provider calls concurrently, waiting for all of them to
+    finish before re-raising the first error (in argument order), so callers
+    see the same exceptions they would if the calls were made one by one.
+    """
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
 @sentry_sdk.trace
 async def update_commit_from_provider_info(
     repository_service: TorngitBaseAdapter, commit: Commit
@@ -193,7 +228,24 @@ async def update_commit_from_provider_info(
     """
     db_session = commit.get_db_session()
     commitid = commit.commitid
-    git_commit = await repository_service.get_commit(commitid)
+
+    # The commit details and the pull request don't depend on each other, so
+    # they are fetched from the provider at the same time
+    known_pullid = commit.pullid
+    if known_pullid:
+        pull_request_call = repository_service.get_pull_request(pullid=known_pullid)
+    else:
+        # attempt to populate commit.pullid from repository_service if we don't have it
+        pull_request_call = repository_service.find_pull_request(
+            commit=commitid, branch=commit.branch
+        )
+    git_commit, pull_request_result = await asyncio.gather(
+        repository_service.get_commit(commitid),
+        pull_request_call,
+        return_exceptions=True,
+    )
+    if isinstance(git_commit, BaseException):
+        raise git_commit
 
     if git_commit is None:
         log.error(
@@ -202,6 +254,9 @@ async def update_commit_from_provider_info(
         )
         return
 
+    if isinstance(pull_request_result, BaseException):
+        raise pull_request_result
+
     log.debug("Found git commit", extra=dict(commit=git_commit))
 
     author_info = git_commit["author"]
@@ -225,23 +280,39 @@ async def update_commit_from_provider_info(
             author_info["name"],
         )
 
-    commit.parent_commit_id = await fetch_appropriate_parent_for_commit(
+    if known_pullid:
+        pullid, pull_details = known_pullid, pull_request_result
+        follow_up_call = None
+    else:
+        pullid, pull_details = pull_request_result, None
+        if pullid:
+            # if the call above returned a pullid, fetch it's details
+            follow_up_call = repository_service.get_pull_request(pullid=pullid)
+        else:
+            follow_up_call = repository_service.get_best_effort_branches(commitid)
+
+    # The parent search only needs `git_commit`, so it runs alongside the last
+    # provider call instead of before it
+    parent_search = fetch_appropriate_parent_for_commit(
         repository_service, commit, git_commit
     )
+    if follow_up_call is not None:
+        parent_commit_id, follow_up_result = await _gather_provider_calls(
+            parent_search, follow_up_call
+        )
+    else:
+        parent_commit_id, follow_up_result = await parent_search, None
+
+    commit.parent_commit_id = parent_commit_id
     commit.message = git_commit["message"]
     commit.author = commit_author
     commit.updatestamp = datetime.now()
     commit.timestamp = git_commit["timestamp"]
+    commit.pullid = pullid
 
-    # attempt to populate commit.pullid from repository_service if we don't have it
-    if not commit.pullid:
-        commit.pullid = await repository_service.find_pull_request(
-            commit=commitid, branch=commit.branch
-        )
-
-    # if our records or the call above returned a pullid, fetch it's details
-    if commit.pullid:
-        pull_details = await repository_service.get_pull_request(pullid=commit.pullid)
+    if pullid:
+        if pull_details is None:
+            pull_details = follow_up_result
         # There's a chance that the commit comes from a fork
         # so we append the branch name with the fork slug
         branch_name = pull_details["head"]["branch"]
@@ -251,9 +322,7 @@ async def update_commit_from_provider_info(
         commit.branch = branch_name
         commit.merged = False
     else:
-        possible_branches = await repository_service.get_best_effort_branches(
-            commit.commitid
-        )
+        possible_branches = follow_up_result
         if commit.repository.branch in possible_branches:
             commit.merged = True
             commit.branch = commit.repository.branch
@@ -1,6 +1,7 @@
 import json
 import logging
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 import sentry_sdk
 from shared.storage.exceptions import FileNotInStorageError
@@ -19,6 +20,9 @@ from services.static_analysis.single_file_analyzer import (
 
 log = logging.getLogger(__name__)
 
+# Maximum number of snapshots read from storage at the same time
+SNAPSHOT_LOADING_CONCURRENCY = 16
+
 
 def _get_analysis_content_mapping(analysis: StaticAnalysisSuite, filepaths):
     db_session = analysis.get_db_session()
@@ -50,6 +54,8 @@ class StaticAnalysisComparisonService(object):
         self._head_static_analysis = head_static_analysis
         self._git_diff = git_diff
         self._archive_service = None
+        # Decoded snapshot contents by `content_location`, `None` if not in storage
+        self._snapshot_contents: typing.Dict[str, typing.Optional[dict]] = {}
 
     @property
     def archive_service(self):
@@ -79,13 +85,20 @@ class StaticAnalysisComparisonService(object):
                 if change.before_filepath
             ],
         )
-        # @giovanni-guidini 2023-06-14
-        # NOTE: Maybe we can paralelize this bit.
-        # There's some level of IO involved.
+        if any(change.change_type == DiffChangeType.new for change in self._git_diff):
+            return {"all": True}
+        self._prefetch_snapshots(
+            [
+                location
+                for change in self._git_diff
+                if change.change_type == DiffChangeType.modified
+                for location in (
+                    base_analysis_content_locations_mapping.get(change.before_filepath),
+                    head_analysis_content_locations_mapping.get(change.after_filepath),
+                )
+            ]
+        )
         for change in self._git_diff:
-            # This check should happen way earlier
-            if change.change_type == DiffChangeType.new:
-                return {"all": True}
             final_result["files"][change.before_filepath] = self._analyze_single_change(
                 db_session,
                 change,
@@ -94,22 +107,63 @@ class StaticAnalysisComparisonService(object):
             )
         return final_result
 
+    @sentry_sdk.trace
+    def _prefetch_snapshots(self, content_locations: typing.List[typing.Optional[str]]):
+        """
+        Reads and decodes all the given snapshots concurrently, so that
+        `_load_snapshot_data` does not hit storage for them one at a time.
+
+        Snapshots are deduplicated by content location, and the ones that were
+        already loaded are not read again.
+        """
+        to_load = {
+            location
+            for location in content_locations
+            if location and location not in self._snapshot_contents
+        }
+        if not to_load:
+            return
+        # Make sure the `ArchiveService` is built on this thread, as it queries the db
+        archive_service = self.archive_service
+        with ThreadPoolExecutor(
+            max_workers=min(SNAPSHOT_LOADING_CONCURRENCY, len(to_load))
+        ) as pool:
+            self._snapshot_contents.update(
+                zip(
+                    to_load,
+                    pool.map(
+                        lambda location: self._read_snapshot(archive_service, location),
+                        to_load,
+                    ),
+                )
+            )
+
+    @staticmethod
+    def _read_snapshot(
+        archive_service: ArchiveService, content_location: str
+    ) -> typing.Optional[dict]:
+        try:
+            return json.loads(archive_service.read_file(content_location))
+        except FileNotInStorageError:
+            return None
+
     def _load_snapshot_data(
         self, filepath, content_location
     ) -> typing.Optional[SingleFileSnapshotAnalyzer]:
         if not content_location:
             return None
-        try:
-            return SingleFileSnapshotAnalyzer(
-                filepath,
-                json.loads(self.archive_service.read_file(content_location)),
+        if content_location not in self._snapshot_contents:
+            self._snapshot_contents[content_location] = self._read_snapshot(
+                self.archive_service, content_location
             )
-        except FileNotInStorageError:
+        content = self._snapshot_contents[content_location]
+        if content is None:
             log.warning(
                 "Unable to load file for static analysis comparison",
                 extra=dict(filepath=filepath, content_location=content_location),
             )
             return None
+        return SingleFileSnapshotAnalyzer(filepath, content)
 
     def _analyze_single_change(
         self,
@@ -124,6 +124,32 @@ class TestStaticAnalysisComparisonService(object):
         assert res._analysis_file_data == {"statements": [[1, {"ha": "pokemon"}]]}
         assert res._statement_mapping == {1: {"ha": "pokemon"}}
 
+    def test_prefetch_snapshots(self, sample_service, mock_storage, mocker):
+        mock_storage.write_file(
+            "archive", "location_1", json.dumps({"statements": [(1, {})]})
+        )
+        mock_storage.write_file("archive", "location_2", json.dumps({"statements": []}))
+        read_file = mocker.spy(sample_service.archive_service, "read_file")
+
+        sample_service._prefetch_snapshots(
+            ["location_1", None, "location_2", "location_1", "missing"]
+        )
+        assert read_file.call_count == 3
+        assert sample_service._snapshot_contents == {
+            "location_1": {"statements": [[1, {}]]},
+            "location_2": {"statements": []},
+            "missing": None,
+        }
+
+        # everything is served from the already loaded snapshots
+        sample_service._prefetch_snapshots(["location_1", "location_2"])
+        first = sample_service._load_snapshot_data("a.py", "location_1")
+        second = sample_service._load_snapshot_data("b.py", "location_1")
+        assert sample_service._load_snapshot_data("c.py", "missing") is None
+        assert read_file.call_count == 3
+        assert first._filepath == "a.py"
+        assert second._analysis_file_data is first._analysis_file_data
+
     def test_get_base_lines_relevant_to_change_deleted_plus_changed_normal(
         self, dbsession, mock_storage
     ):
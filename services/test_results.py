@@ -2,7 +2,9 @@ import logging
 from dataclasses import dataclass
 from hashlib import sha256
 from typing import Sequence
+from uuid import uuid4
 
+from shared.helpers.cache import NO_VALUE
 from shared.plan.constants import FREE_PLAN_REPRESENTATIONS, TEAM_PLAN_REPRESENTATIONS
 from shared.yaml import UserYaml
 from sqlalchemy import desc, distinct, func
@@ -20,6 +22,7 @@ from database.models import (
     Upload,
     UploadError,
 )
+from helpers.cache import cache
 from helpers.notifier import BaseNotifier
 from rollouts import FLAKY_TEST_DETECTION
 from services.license import requires_license
@@ -30,6 +33,11 @@ from services.yaml import read_yaml_field
 
 log = logging.getLogger(__name__)
 
+FLAKE_SET_CACHE_TTL = 60 * 60
+# This has to outlive the cached flake sets, otherwise a flake set cached for
+# the initial version could be served again once the version expires
+FLAKE_SET_VERSION_TTL = 24 * 60 * 60
+
 
 class TestResultsReportService(BaseReportService):
     def __init__(self, current_yaml: UserYaml):
@@ -70,6 +78,24 @@ class TestResultsReportService(BaseReportService):
         self._attach_flags_to_upload(upload, arguments["flags"])
         return upload
 
+    def create_report_uploads(
+        self, arguments_list: list[UploadArguments], commit_report: CommitReport
+    ) -> list[int]:
+        upload_ids = super().create_report_uploads(arguments_list, commit_report)
+        if upload_ids:
+            db_session = commit_report.get_db_session()
+            repoid = commit_report.commit.repoid
+            if self.flag_dict is None:
+                self.fetch_repo_flags(db_session, repoid)
+            self._attach_flags_to_uploads(
+                db_session,
+                repoid,
+                self.flag_dict,
+                upload_ids,
+                [arguments["flags"] for arguments in arguments_list],
+            )
+        return upload_ids
+
     def _attach_flags_to_upload(self, upload: Upload, flag_names: Sequence[str]):
         """Internal function that manages creating the proper `RepositoryFlag`s and attach the sessions to them
 
@@ -467,10 +493,42 @@ def should_do_flaky_detection(repo: Repository, commit_yaml: UserYaml) -> bool:
     return has_flaky_configured and (feature_enabled or has_valid_plan_repo_or_owner)
 
 
+def _flake_set_version_key(repoid: int) -> str:
+    return f"ta_flake_set_version/{repoid}"
+
+
 def get_flake_set(db_session: Session, repoid: int) -> set[str]:
+    """
+    Returns the ids of the tests of the repo that are currently flaky.
+
+    The set is cached per repo, under a version that is changed by
+    `invalidate_flake_set` whenever the flakes of the repo change.
+    """
+    version = cache.get_backend().get(_flake_set_version_key(repoid))
+    if version is NO_VALUE:
+        version = "initial"
+    cache_key = f"ta_flake_set/{repoid}/{version}"
+
+    cached_flake_set = cache.get_backend().get(cache_key)
+    if cached_flake_set is not NO_VALUE:
+        return set(cached_flake_set)
+
     repo_flakes: list[Flake] = (
         db_session.query(Flake.testid)
         .filter(Flake.repoid == repoid, Flake.end_date.is_(None))
         .all()
     )
-    return {flake.testid for flake in repo_flakes}
+    flake_set = {flake.testid for flake in repo_flakes}
+    cache.get_backend().set(cache_key, FLAKE_SET_CACHE_TTL, sorted(flake_set))
+    return flake_set
+
+
+def invalidate_flake_set(repoid: int):
+    """
+    Makes `get_flake_set` ignore the currently cached flake set of the repo.
+
+    This has to be called after the changes to the flakes are committed.
+    """
+    cache.get_backend().set(
+        _flake_set_version_key(repoid), FLAKE_SET_VERSION_TTL, uuid4().hex
+    )
@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+from services.processing.coordinator import MergeCoordinator
+from services.processing.state import ProcessingState
+
+
+def _processed_state(commitsha: str, upload_ids: list[int]) -> ProcessingState:
+    state = ProcessingState(1234, commitsha)
+    state.mark_uploads_as_processing(upload_ids)
+    for id in upload_ids:
+        state.mark_upload_as_processed(id)
+    return state
+
+
+def test_take_batch():
+    commitsha = uuid4().hex
+    state = _processed_state(commitsha, list(range(1, 13)))
+    coordinator = MergeCoordinator(1234, commitsha)
+    assert coordinator.take_batch(state) == []
+
+    coordinator.register(
+        [{"upload_id": id, "successful": True, "arguments": {}} for id in range(1, 13)]
+    )
+    # registering the same upload again does not merge it twice
+    coordinator.register([{"upload_id": 1, "successful": False, "arguments": {}}])
+
+    first_batch = coordinator.take_batch(state)
+    assert len(first_batch) == 10  # = MERGE_BATCH_SIZE
+    coordinator.forget([result["upload_id"] for result in first_batch])
+    assert coordinator.has_registered_uploads()
+
+    second_batch = coordinator.take_batch(state)
+    assert len(second_batch) == 2
+    coordinator.forget([result["upload_id"] for result in second_batch])
+    assert not coordinator.has_registered_uploads()
+
+    all_results = sorted(first_batch + second_batch, key=lambda r: r["upload_id"])
+    assert [result["upload_id"] for result in all_results] == list(range(1, 13))
+    assert all_results[0] == {"upload_id": 1, "successful": False, "arguments": {}}
+
+
+def test_take_batch_after_crash():
+    commitsha = uuid4().hex
+    state = _processed_state(commitsha, [1, 2])
+    coordinator = MergeCoordinator(1234, commitsha)
+    coordinator.register(
+        [{"upload_id": id, "successful": True, "arguments": {}} for id in [1, 2]]
+    )
+
+    # the lock holder dies while merging the batch
+    assert len(coordinator.take_batch(state)) == 2
+    assert coordinator.has_registered_uploads()
+
+    # the next lock holder takes over its claims
+    state.release_all_claims()
+    batch = coordinator.take_batch(state)
+    assert sorted(result["upload_id"] for result in batch) == [1, 2]
+
+
+def test_take_batch_forgets_merged_uploads():
+    commitsha = uuid4().hex
+    state = _processed_state(commitsha, [1, 2])
+    state.mark_uploads_as_merged([1])
+    coordinator = MergeCoordinator(1234, commitsha)
+    coordinator.register(
+        [{"upload_id": id, "successful": True, "arguments": {}} for id in [1, 2]]
+    )
+
+    assert coordinator.take_batch(state) == [
+        {"upload_id": 2, "successful": True, "arguments": {}}
+    ]
+    coordinator.forget([2])
+    assert not coordinator.has_registered_uploads()
+
+
+def test_drain_check():
+    coordinator = MergeCoordinator(1234, uuid4().hex)
+    assert coordinator.should_schedule_drain_check()
+    assert not coordinator.should_schedule_drain_check()
+
+    coordinator.start_drain_check()
+    assert coordinator.should_schedule_drain_check()
@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+from shared.reports.editable import EditableReport, EditableReportFile
+from shared.reports.resources import Report, ReportFile, ReportLine
+from shared.utils.sessions import Session, SessionType
+from shared.yaml import UserYaml
+
+from services.processing.intermediate import (
+    load_deferred_report,
+    save_deferred_report,
+)
+from services.processing.merging import merge_reports
+from services.processing.types import IntermediateReport
+
+
+def _report(report_class: type[Report], file_class: type[ReportFile], session):
+    report = report_class()
+    report.add_session(session, use_id_from_session=True)
+    report_file = file_class("file.py")
+    report_file.append(1, ReportLine.create(coverage=1, sessions=[[session.id, 1]]))
+    report.append(report_file)
+    return report
+
+
+def test_deferred_report_without_carryforward():
+    commitid = uuid4().hex
+    session = Session(id=0, flags=["unit"], session_type=SessionType.uploaded)
+    save_deferred_report(1234, commitid, _report(Report, ReportFile, session))
+
+    report = load_deferred_report(1234, commitid)
+    assert type(report) is Report
+    assert list(report.sessions) == [0]
+    assert report.totals.lines == 1
+
+
+def test_resume_deferred_report_with_carryforward():
+    commitid = uuid4().hex
+    carriedforward = Session(
+        id=0, flags=["unit"], session_type=SessionType.carriedforward
+    )
+    save_deferred_report(1234, commitid, _report(Report, ReportFile, carriedforward))
+
+    report = load_deferred_report(1234, commitid)
+    assert isinstance(report, EditableReport)
+    assert report.sessions[0].session_type == SessionType.carriedforward
+
+    # a later batch uploads the carried forward flag, which replaces the session
+    uploaded = Session(id=0, flags=["unit"], session_type=SessionType.uploaded)
+    commit_yaml = UserYaml({"flags": {"unit": {"carryforward": True}}})
+    report, merge_result = merge_reports(
+        commit_yaml,
+        report,
+        [IntermediateReport(1, _report(EditableReport, EditableReportFile, uploaded))],
+    )
+
+    assert merge_result.deleted_sessions == {0}
+    assert [session.session_type for session in report.sessions.values()] == [
+        SessionType.uploaded
+    ]
+    assert report.totals.lines == 1
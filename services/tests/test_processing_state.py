@@ -1,7 +1,11 @@
+import time
 from uuid import uuid4
 
 from services.processing.state import (
+    MERGE_CLAIM_TTL,
     ProcessingState,
+    UploadNumbers,
+    should_defer_report_save,
     should_perform_merge,
     should_trigger_postprocessing,
 )
@@ -16,7 +20,7 @@ def test_single_upload():
     # this is the only in-progress upload, nothing more to expect
     assert should_perform_merge(state.get_upload_numbers())
 
-    assert state.get_uploads_for_merging() == {1}
+    assert state.claim_uploads_for_merging([1]) == {1}
     state.mark_uploads_as_merged([1])
 
     assert should_trigger_postprocessing(state.get_upload_numbers())
@@ -37,7 +41,7 @@ def test_concurrent_uploads():
 
     assert should_perform_merge(state.get_upload_numbers())
 
-    assert state.get_uploads_for_merging() == {1, 2}
+    assert state.claim_uploads_for_merging([1, 2]) == {1, 2}
     state.mark_uploads_as_merged([1, 2])
 
     assert should_trigger_postprocessing(state.get_upload_numbers())
@@ -53,7 +57,7 @@ def test_batch_merging_many_uploads():
 
     # we have only processed 8 out of 9. we want to do a batched merge
     assert should_perform_merge(state.get_upload_numbers())
-    merging = state.get_uploads_for_merging()
+    merging = state.claim_uploads_for_merging(list(range(1, 11)))
     assert len(merging) == 10  # = MERGE_BATCH_SIZE
     state.mark_uploads_as_merged(merging)
 
@@ -64,8 +68,83 @@ def test_batch_merging_many_uploads():
 
     # with the last upload being processed, we do another merge, and then trigger notifications
     assert should_perform_merge(state.get_upload_numbers())
-    merging = state.get_uploads_for_merging()
+    merging = state.claim_uploads_for_merging([11, 12])
     assert len(merging) == 2
     state.mark_uploads_as_merged(merging)
 
     assert should_trigger_postprocessing(state.get_upload_numbers())
+
+
+def test_mark_upload_as_processed_returns_numbers():
+    state = ProcessingState(1234, uuid4().hex)
+    state.mark_uploads_as_processing([1, 2])
+
+    assert state.mark_upload_as_processed(1) == UploadNumbers(1, 1, 0)
+    # an upload that was never marked as processing still ends up as processed
+    assert state.mark_upload_as_processed(3) == UploadNumbers(1, 2, 0)
+
+
+def test_claimed_uploads_are_not_merged_twice():
+    state = ProcessingState(1234, uuid4().hex)
+    state.mark_uploads_as_processing(list(range(1, 16)))
+    for id in range(1, 16):
+        state.mark_upload_as_processed(id)
+
+    first_claim = state.claim_uploads_for_merging(list(range(1, 11)))
+    assert first_claim == set(range(1, 11))
+    # a concurrent or repeated claim does not get the same uploads
+    assert state.claim_uploads_for_merging([9, 10, 11]) == {11}
+    assert state.get_upload_numbers() == UploadNumbers(0, 4, 11)
+
+    state.mark_uploads_as_merged(list(first_claim))
+    assert state.get_upload_numbers() == UploadNumbers(0, 4, 1)
+    assert state.claim_uploads_for_merging([1, 2]) == set()
+    # the upload of the failed claim is available to others again
+    assert not should_trigger_postprocessing(state.get_upload_numbers())
+    assert state.release_claimed_uploads([11]) == 1
+    assert state.get_upload_numbers() == UploadNumbers(0, 5, 0)
+
+    assert state.claim_uploads_for_merging(list(range(11, 16))) == set(range(11, 16))
+    state.mark_uploads_as_merged(list(range(11, 16)))
+    assert should_trigger_postprocessing(state.get_upload_numbers())
+
+
+def test_abandoned_claims_are_released(mocker):
+    state = ProcessingState(1234, uuid4().hex)
+    state.mark_uploads_as_processing([1, 2, 3])
+    for id in (1, 2, 3):
+        state.mark_upload_as_processed(id)
+    assert state.claim_uploads_for_merging([1, 2]) == {1, 2}
+    assert state.get_upload_numbers() == UploadNumbers(0, 1, 2)
+
+    # releasing an empty batch does not release anything
+    assert state.release_claimed_uploads([]) == 0
+    assert state.get_upload_numbers() == UploadNumbers(0, 1, 2)
+
+    # the next lock holder releases all the claims
+    assert state.release_all_claims() == 2
+    assert state.get_upload_numbers() == UploadNumbers(0, 3, 0)
+    assert state.release_all_claims() == 0
+
+    # claims which nobody released expire
+    assert state.claim_uploads_for_merging([1, 2]) == {1, 2}
+    mocker.patch(
+        "services.processing.state.time.time",
+        return_value=time.time() + MERGE_CLAIM_TTL,
+    )
+    assert state.get_upload_numbers() == UploadNumbers(0, 3, 0)
+
+
+def test_should_defer_report_save():
+    # more uploads are being processed
+    assert should_defer_report_save(
+        UploadNumbers(processing=1, processed=0, merging=10)
+    )
+    # more uploads are waiting to be merged besides the claimed batch
+    assert should_defer_report_save(
+        UploadNumbers(processing=0, processed=1, merging=10)
+    )
+    # the batch is the last one
+    assert not should_defer_report_save(
+        UploadNumbers(processing=0, processed=0, merging=10)
+    )
@@ -1,4 +1,4 @@
-from services.redis import get_redis_connection
+from services.redis import RedisClientRegistry, get_redis_connection
 
 
 def test_get_redis_connection(mocker):
@@ -6,3 +6,24 @@ def test_get_redis_connection(mocker):
     res = get_redis_connection()
     assert res is not None
     mocked.assert_called_with("redis://redis:6379")
+
+
+def test_get_redis_connection_is_reused(mocker):
+    mocked = mocker.patch("services.redis.Redis.from_url")
+    assert get_redis_connection() is get_redis_connection()
+    assert mocked.call_count == 1
+
+
+def test_redis_client_registry(mocker):
+    mocked = mocker.patch(
+        "services.redis.Redis.from_url", side_effect=lambda url: mocker.MagicMock()
+    )
+    registry = RedisClientRegistry()
+    first = registry.get("redis://first")
+    assert registry.get("redis://first") is first
+    assert registry.get("redis://second") is not first
+    assert mocked.call_count == 2
+
+    registry.reset()
+    assert registry.get("redis://first") is not first
+    assert mocked.call_count == 3
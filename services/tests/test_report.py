@@ -1,3 +1,4 @@
+import gzip
 from decimal import Decimal
 
 import mock
@@ -12,7 +13,7 @@ from database.models import CommitReport, RepositoryFlag, Upload
 from database.tests.factories import CommitFactory
 from helpers.exceptions import RepositoryWithoutValidBotError
 from services.archive import ArchiveService
-from services.report import NotReadyToBuildReportYetError, ReportService
+from services.report import NotReadyToBuildReportYetError, ReportService, write_chunks
 from services.report import log as report_log
 from services.report.raw_upload_processor import (
     SessionAdjustmentResult,
@@ -3732,6 +3733,64 @@ class TestReportService(BaseTestCase):
         assert first_flag.flag_name == "unittest"
         assert first_flag.repository_id == commit.repoid
 
+    @pytest.mark.django_db
+    def test_create_report_uploads(self, dbsession):
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        existing_flag = RepositoryFlag(repository_id=commit.repoid, flag_name="unit")
+        dbsession.add(existing_flag)
+        current_report_row = CommitReport(commit_id=commit.id_)
+        dbsession.add(current_report_row)
+        dbsession.flush()
+
+        arguments_list = [
+            {
+                "build": "1",
+                "flags": ["unit", "integration"],
+                "job": "first",
+                "reportid": "6e2b6449-4e60-43f8-80ae-2c03a5c03d92",
+                "url": "v4/raw/first.txt",
+            },
+            {"build": "2", "flags": [], "name": "x" * 150, "url": "v4/raw/second.txt"},
+            {"build": "3", "flags": ["integration", "unit", "unit"]},
+        ]
+        report_service = ReportService({})
+        upload_ids = report_service.create_report_uploads(
+            arguments_list, current_report_row
+        )
+        dbsession.expire_all()
+
+        uploads = [dbsession.query(Upload).get(upload_id) for upload_id in upload_ids]
+        assert [upload.build_code for upload in uploads] == ["1", "2", "3"]
+        assert str(uploads[0].external_id) == "6e2b6449-4e60-43f8-80ae-2c03a5c03d92"
+        assert uploads[1].external_id is not None
+        assert uploads[0].job_code == "first"
+        assert uploads[1].name == "x" * 100
+        assert uploads[1].storage_path == "v4/raw/second.txt"
+        assert all(upload.report_id == current_report_row.id_ for upload in uploads)
+        assert all(upload.state == "started" for upload in uploads)
+        assert all(upload.upload_type == "uploaded" for upload in uploads)
+        assert all(upload.upload_extras == {} for upload in uploads)
+
+        assert sorted(flag.flag_name for flag in uploads[0].flags) == [
+            "integration",
+            "unit",
+        ]
+        assert uploads[1].flags == []
+        assert sorted(flag.flag_name for flag in uploads[2].flags) == [
+            "integration",
+            "unit",
+        ]
+        assert existing_flag.id_ in [flag.id_ for flag in uploads[2].flags]
+        assert (
+            dbsession.query(RepositoryFlag)
+            .filter_by(repository_id=commit.repoid)
+            .count()
+            == 2
+        )
+        assert report_service.create_report_uploads([], current_report_row) == []
+
     def test_shift_carryforward_report(
         self, dbsession, sample_report, mocker, mock_repo_provider
     ):
@@ -4034,3 +4093,16 @@ class TestReportService(BaseTestCase):
             ReportService({})._possibly_shift_carryforward_report(
                 mock_report, parent_commit, commit
             )
+
+
+def test_write_chunks(mocker, sample_report):
+    mocker.patch("services.report.CHUNKS_COMPRESSION_PIECE_SIZE", 7)
+    archive_service = mocker.MagicMock()
+
+    write_chunks(archive_service, "abc", sample_report, "local")
+
+    archive_service.write_chunks.assert_called_once_with(
+        "abc", mocker.ANY, "local", is_already_gzipped=True
+    )
+    compressed = archive_service.write_chunks.call_args.args[1]
+    assert gzip.decompress(compressed).decode() == sample_report.to_archive()
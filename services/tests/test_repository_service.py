@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 from datetime import datetime
 from unittest.mock import MagicMock, patch
@@ -1098,6 +1099,109 @@ async def test_update_commit_from_provider_info_bitbucket_merge(dbsession, mocke
     assert commit.author.username == "author_username"
 
 
+@pytest.mark.asyncio
+async def test_update_commit_from_provider_info_fetches_concurrently(
+    dbsession, mock_repo_provider
+):
+    repository = RepositoryFactory.create(branch="main")
+    possible_parent_commit = CommitFactory.create(
+        message="possible_parent_commit", pullid=None, repository=repository
+    )
+    commit = CommitFactory.create(
+        message="",
+        author=None,
+        pullid=None,
+        branch="feature",
+        repository=repository,
+    )
+    dbsession.add(possible_parent_commit)
+    dbsession.add(commit)
+    dbsession.flush()
+
+    find_pull_request_started = asyncio.Event()
+
+    async def get_commit(commitid):
+        # Only returns once the pull request lookup is in flight
+        await asyncio.wait_for(find_pull_request_started.wait(), timeout=1)
+        return {
+            "author": {"id": None},
+            "message": "This message is brought to you by",
+            "parents": [possible_parent_commit.commitid],
+            "timestamp": "2018-07-09T23:39:20Z",
+        }
+
+    async def find_pull_request(commit, branch):
+        find_pull_request_started.set()
+        return 12
+
+    mock_repo_provider.get_commit.side_effect = get_commit
+    mock_repo_provider.find_pull_request.side_effect = find_pull_request
+    mock_repo_provider.get_pull_request.return_value = {
+        "head": {"branch": "feature"},
+        "base": {"branch": "main"},
+    }
+
+    await update_commit_from_provider_info(mock_repo_provider, commit)
+
+    assert commit.pullid == 12
+    assert commit.branch == "feature"
+    assert commit.merged is False
+    assert commit.parent_commit_id == possible_parent_commit.commitid
+    mock_repo_provider.get_pull_request.assert_called_once_with(pullid=12)
+    mock_repo_provider.get_best_effort_branches.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_commit_from_provider_info_commit_not_found(
+    dbsession, mock_repo_provider
+):
+    commit = CommitFactory.create(message="", pullid=None)
+    dbsession.add(commit)
+    dbsession.flush()
+    mock_repo_provider.get_commit.side_effect = TorngitObjectNotFoundError(
+        "response", "message"
+    )
+    mock_repo_provider.find_pull_request.return_value = None
+
+    with pytest.raises(TorngitObjectNotFoundError):
+        await update_commit_from_provider_info(mock_repo_provider, commit)
+    assert commit.message == ""
+
+
+@pytest.mark.asyncio
+async def test_fetch_appropriate_parent_for_commit_single_ancestors_query(
+    dbsession, mock_repo_provider, mocker
+):
+    repository = RepositoryFactory.create()
+    great_grandparent_commit = CommitFactory.create(
+        commitid="c" * 40, repository=repository
+    )
+    commit = CommitFactory.create(parent_commit_id=None, repository=repository)
+    dbsession.add(great_grandparent_commit)
+    dbsession.add(commit)
+    dbsession.flush()
+    mock_repo_provider.get_ancestors_tree.return_value = {
+        "commitid": commit.commitid,
+        "parents": [
+            {
+                "commitid": "a" * 40,
+                "parents": [
+                    {
+                        "commitid": "b" * 40,
+                        "parents": [{"commitid": "c" * 40, "parents": []}],
+                    }
+                ],
+            }
+        ],
+    }
+    query = mocker.spy(dbsession, "query")
+
+    result = await fetch_appropriate_parent_for_commit(mock_repo_provider, commit)
+
+    assert result == "c" * 40
+    assert query.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_get_repo_gh_no_integration(dbsession, mocker):
     owner = OwnerFactory.create(
@@ -1,5 +1,6 @@
 import mock
 import pytest
+from shared.helpers.cache import NO_VALUE
 from shared.torngit.exceptions import TorngitClientError
 
 from database.models import UploadError
@@ -9,6 +10,7 @@ from database.tests.factories import (
     RepositoryFactory,
     UploadFactory,
 )
+from database.tests.factories.reports import FlakeFactory
 from helpers.notifier import NotifierResult
 from services.test_results import (
     FlakeInfo,
@@ -19,6 +21,8 @@ from services.test_results import (
     generate_failure_info,
     generate_flags_hash,
     generate_test_id,
+    get_flake_set,
+    invalidate_flake_set,
     should_do_flaky_detection,
 )
 from services.urls import services_short_dict
@@ -330,3 +334,34 @@ def test_specific_error_message_no_error(mocker):
     mock_repo_service.edit_comment.assert_called_with(
         tn._pull.database_pull.pullid, tn._pull.database_pull.commentid, expected
     )
+
+
+class DictCacheBackend:
+    def __init__(self):
+        self.storage = {}
+
+    def get(self, key):
+        return self.storage.get(key, NO_VALUE)
+
+    def set(self, key, ttl, value):
+        self.storage[key] = value
+
+
+def test_get_flake_set_cached(dbsession, mocker):
+    mocker.patch(
+        "services.test_results.cache.get_backend", return_value=DictCacheBackend()
+    )
+    flake = FlakeFactory()
+    dbsession.add(flake)
+    dbsession.flush()
+    repoid = flake.repository.repoid
+
+    assert get_flake_set(dbsession, repoid) == {flake.testid}
+
+    flake.end_date = flake.start_date
+    dbsession.flush()
+    # still served from the cache
+    assert get_flake_set(dbsession, repoid) == {flake.testid}
+
+    invalidate_flake_set(repoid)
+    assert get_flake_set(dbsession, repoid) == set()
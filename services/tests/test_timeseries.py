@@ -1,7 +1,7 @@
+import json
 from datetime import datetime, timezone
 
 import pytest
-from shared.reports.readonly import ReadOnlyReport
 from shared.reports.resources import Report, ReportFile, ReportLine
 from shared.utils.sessions import Session
 from shared.yaml import UserYaml
@@ -10,6 +10,7 @@ from database.models.timeseries import Dataset, Measurement, MeasurementName
 from database.tests.factories import CommitFactory, RepositoryFactory
 from database.tests.factories.reports import RepositoryFlagFactory
 from database.tests.factories.timeseries import DatasetFactory, MeasurementFactory
+from services.report.lazy import LazyReport
 from services.timeseries import (
     backfill_batch_size,
     delete_repository_data,
@@ -20,6 +21,14 @@ from services.timeseries import (
 )
 
 
+def lazy_report(report: Report) -> LazyReport:
+    totals, report_json = report.to_database()
+    report_json = json.loads(report_json)
+    return LazyReport(
+        report.to_archive(), report_json["files"], report_json["sessions"], totals
+    )
+
+
 @pytest.fixture
 def sample_report():
     report = Report()
@@ -107,8 +116,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -142,7 +151,7 @@ class TestTimeseriesService(object):
     def test_save_commit_measurements_no_report(self, dbsession, repository, mocker):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
+            "services.report.ReportService.get_lazy_report_for_commit",
             return_value=None,
         )
 
@@ -169,8 +178,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -220,8 +229,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -293,8 +302,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -392,10 +401,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(
-                sample_report_for_components
-            ),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report_for_components),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -577,10 +584,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(
-                sample_report_for_components
-            ),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report_for_components),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -788,8 +793,8 @@ class TestTimeseriesService(object):
     def test_delete_repository_data(self, dbsession, sample_report, repository, mocker):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -827,8 +832,8 @@ class TestTimeseriesService(object):
     ):
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(sample_report),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report),
         )
 
         commit = CommitFactory.create(branch="foo", repository=repository)
@@ -903,10 +908,8 @@ class TestTimeseriesService(object):
 
         mocker.patch("services.timeseries.is_timeseries_enabled", return_value=True)
         mocker.patch(
-            "services.report.ReportService.get_existing_report_for_commit",
-            return_value=ReadOnlyReport.create_from_report(
-                sample_report_for_components
-            ),
+            "services.report.ReportService.get_lazy_report_for_commit",
+            return_value=lazy_report(sample_report_for_components),
         )
 
         get_repo_yaml = mocker.patch("services.timeseries.get_repo_yaml")
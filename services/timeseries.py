@@ -3,7 +3,6 @@ from datetime import datetime
 from typing import Any, Iterable, Mapping, Optional
 
 from shared.components import Component
-from shared.reports.readonly import ReadOnlyReport
 from shared.timeseries.helpers import is_timeseries_enabled
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
@@ -13,6 +12,7 @@ from database.models.core import Repository
 from database.models.reports import RepositoryFlag
 from helpers.timeseries import backfill_max_batch_size
 from services.report import ReportService
+from services.report.lazy import LazyReport
 from services.yaml import get_repo_yaml
 
 log = logging.getLogger(__name__)
@@ -33,9 +33,9 @@ def save_commit_measurements(
 
     current_yaml = get_repo_yaml(commit.repository)
     report_service = ReportService(current_yaml)
-    report = report_service.get_existing_report_for_commit(
-        commit, report_class=ReadOnlyReport
-    )
+    # only the flag and component measurements need the line data of the files,
+    # the coverage measurement is based on the report totals
+    report = report_service.get_lazy_report_for_commit(commit)
 
     if report is None:
         return
@@ -49,7 +49,9 @@ def save_commit_measurements(
     maybe_upsert_flag_measurements(commit, dataset_names, db_session, report)
 
 
-def maybe_upsert_coverage_measurement(commit, dataset_names, db_session, report):
+def maybe_upsert_coverage_measurement(
+    commit, dataset_names, db_session, report: LazyReport
+):
     if MeasurementName.coverage.value in dataset_names:
         if report.totals.coverage is not None:
             measurements = [
@@ -63,8 +65,11 @@ def maybe_upsert_coverage_measurement(commit, dataset_names, db_session, report)
             upsert_measurements(db_session, measurements)
 
 
-def maybe_upsert_flag_measurements(commit, dataset_names, db_session, report):
+def maybe_upsert_flag_measurements(
+    commit, dataset_names, db_session, report: LazyReport
+):
     if MeasurementName.flag_coverage.value in dataset_names:
+        report = report.full_report
         flag_ids = repository_flag_ids(commit.repository)
         measurements = []
 
@@ -106,11 +111,12 @@ def maybe_upsert_flag_measurements(commit, dataset_names, db_session, report):
 
 
 def maybe_upsert_components_measurements(
-    commit, current_yaml, dataset_names, db_session, report
+    commit, current_yaml, dataset_names, db_session, report: LazyReport
 ):
     if MeasurementName.component_coverage.value in dataset_names:
         components = current_yaml.get_components()
         if components:
+            report = report.full_report
             component_measurements = dict()
 
             for component in components:
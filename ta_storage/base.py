@@ -1,12 +1,31 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 
 import test_results_parser
 
 from database.models.reports import Upload
 
 
+@dataclass(frozen=True)
+class UploadValues:
+    """
+    The values of an `Upload` which drivers running on other threads use.
+
+    Such drivers must not touch the `Upload` itself: another driver may commit
+    the database session, which expires the `Upload`, and reloading it would use
+    the session concurrently.
+    """
+
+    id_: int
+    flag_names: tuple[str, ...]
+
+    @classmethod
+    def from_upload(cls, upload: Upload) -> UploadValues:
+        return cls(id_=upload.id_, flag_names=tuple(upload.flag_names))
+
+
 class TADriver(ABC):
     @abstractmethod
     def write_testruns(
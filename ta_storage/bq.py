@@ -10,7 +10,7 @@ from shared.config import get_config
 import generated_proto.testrun.ta_testrun_pb2 as ta_testrun_pb2
 from database.models.reports import Upload
 from services.bigquery import get_bigquery_service
-from ta_storage.base import TADriver
+from ta_storage.base import TADriver, UploadValues
 from ta_storage.utils import calc_flags_hash, calc_test_id
 
 RANKED_DATA = """
@@ -176,7 +176,7 @@ class BQDriver(TADriver):
         repo_id: int,
         commit_sha: str,
         branch_name: str,
-        upload: Upload,
+        upload: Upload | UploadValues,
         framework: str | None,
         testruns: list[test_results_parser.Testrun],
     ):
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+import test_results_parser
+from shared.metrics import Counter
+
+from database.models.reports import Upload
+from ta_storage.base import TADriver, UploadValues
+
+log = logging.getLogger(__name__)
+
+FANOUT_WRITES = Counter(
+    "worker_ta_fanout_writes",
+    "Number of testrun batches written to a secondary TA storage backend, by result",
+    ["backend", "result"],
+)
+
+# Secondary writes run on this pool. Its threads are only started on first use,
+# so it is safe to create before the celery workers are forked.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ta-fanout")
+
+# The number of secondary writes which may be running or queued on `_executor`.
+# Once that many are pending, submitting another write waits for one of them to
+# finish, for at most `PENDING_WRITE_WAIT_SECONDS`. Only then is the write dropped,
+# so that a backend which is down can not pile up work in memory, or block the
+# writes of all the following uploads.
+MAX_PENDING_SECONDARY_WRITES = 8
+PENDING_WRITE_WAIT_SECONDS = 10
+_pending_writes = threading.BoundedSemaphore(MAX_PENDING_SECONDARY_WRITES)
+
+
+@dataclass
+class SecondaryBackend:
+    name: str
+    driver: TADriver
+    timeout: float | None = None
+    """
+    Number of seconds the write is waited for, after the primary write finished.
+    """
+
+
+class FanOutDriver(TADriver):
+    """
+    Writes the same batch of testruns to a primary driver, and to any number of
+    secondary drivers concurrently.
+
+    The primary driver runs in the calling thread, as it may use the (non
+    thread-safe) database session of the task, and its errors are raised as usual.
+    Errors and timeouts of secondary drivers are logged and counted, but never
+    affect the primary write or each other.
+
+    The drivers get the exact same `testruns`, so they must not modify them.
+    The secondary drivers get an `UploadValues` instead of the `Upload`.
+
+    At most `MAX_PENDING_SECONDARY_WRITES` secondary writes are pending at once.
+    A further write waits for a pending one to finish, and is dropped and counted
+    as `dropped` if none does in time. A write which timed out is cancelled if it
+    has not started yet.
+    """
+
+    def __init__(self, primary: TADriver, secondaries: list[SecondaryBackend]):
+        self.primary = primary
+        self.secondaries = secondaries
+
+    def write_testruns(
+        self,
+        timestamp: int | None,
+        repo_id: int,
+        commit_sha: str,
+        branch_name: str,
+        upload: Upload,
+        framework: str | None,
+        testruns: list[test_results_parser.Testrun],
+    ) -> dict[str, str]:
+        """
+        Returns the result of each secondary write: `ok`, `error`, `timeout`
+        or `dropped`.
+        """
+        if not self.secondaries:
+            self.primary.write_testruns(
+                timestamp, repo_id, commit_sha, branch_name, upload, framework, testruns
+            )
+            return {}
+
+        upload_values = UploadValues.from_upload(upload)
+        secondary_args = (
+            timestamp,
+            repo_id,
+            commit_sha,
+            branch_name,
+            upload_values,
+            framework,
+            testruns,
+        )
+        futures = {
+            backend.name: _submit(backend.driver.write_testruns, *secondary_args)
+            for backend in self.secondaries
+        }
+
+        self.primary.write_testruns(
+            timestamp, repo_id, commit_sha, branch_name, upload, framework, testruns
+        )
+
+        results: dict[str, str] = {}
+        for backend in self.secondaries:
+            future = futures[backend.name]
+            try:
+                if future is None:
+                    log.error(
+                        "Dropped write of testruns to secondary TA backend, "
+                        "too many writes are pending",
+                        extra=dict(
+                            backend=backend.name,
+                            upload_id=upload_values.id_,
+                            testruns=len(testruns),
+                        ),
+                    )
+                    results[backend.name] = "dropped"
+                else:
+                    future.result(timeout=backend.timeout)
+                    results[backend.name] = "ok"
+            except FutureTimeoutError:
+                future.cancel()
+                log.warning(
+                    "Timed out writing testruns to secondary TA backend",
+                    extra=dict(backend=backend.name, upload_id=upload_values.id_),
+                )
+                results[backend.name] = "timeout"
+            except Exception:
+                log.exception(
+                    "Failed writing testruns to secondary TA backend",
+                    extra=dict(backend=backend.name, upload_id=upload_values.id_),
+                )
+                results[backend.name] = "error"
+            FANOUT_WRITES.labels(
+                backend=backend.name, result=results[backend.name]
+            ).inc()
+
+        return results
+
+
+def _submit(fn, *args) -> Future | None:
+    """
+    Submits `fn` to `_executor`, waiting for a slot if `MAX_PENDING_SECONDARY_WRITES`
+    writes are already pending. Returns `None` if no slot frees up in time.
+    """
+    pending_writes = _pending_writes
+    if not pending_writes.acquire(timeout=PENDING_WRITE_WAIT_SECONDS):
+        return None
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        pending_writes.release()
+        raise
+    future.add_done_callback(lambda _: pending_writes.release())
+    return future
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import io
+import uuid
 from datetime import date, datetime
-from typing import Any, Literal, TypedDict
+from typing import Any, Callable, Iterable, Literal, TypedDict
 
 import test_results_parser
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import Table, column, select, table, text
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.orm import Session
 
 from database.models import (
@@ -15,6 +18,7 @@ from database.models import (
     TestInstance,
     Upload,
 )
+from helpers.clock import get_utc_now
 from services.test_results import generate_flags_hash, generate_test_id
 from ta_storage.base import TADriver
 
@@ -214,14 +218,8 @@ def create_daily_totals(
     }
 
 
-def save_tests(db_session: Session, tests_to_write: dict[str, dict[str, Any]]):
-    test_data = sorted(
-        tests_to_write.values(),
-        key=lambda x: str(x["id"]),
-    )
-
-    test_insert = insert(Test.__table__).values(test_data)
-    insert_on_conflict_do_update = test_insert.on_conflict_do_update(
+def on_conflict_update_tests(test_insert: Insert) -> Insert:
+    return test_insert.on_conflict_do_update(
         index_elements=["id"],
         set_={
             "framework": test_insert.excluded.framework,
@@ -229,25 +227,11 @@ def save_tests(db_session: Session, tests_to_write: dict[str, dict[str, Any]]):
             "filename": test_insert.excluded.filename,
         },
     )
-    db_session.execute(insert_on_conflict_do_update)
-    db_session.commit()
 
 
-def save_test_flag_bridges(db_session: Session, test_flag_bridge_data: list[dict]):
-    insert_on_conflict_do_nothing_flags = (
-        insert(TestFlagBridge.__table__)
-        .values(test_flag_bridge_data)
-        .on_conflict_do_nothing(index_elements=["test_id", "flag_id"])
-    )
-    db_session.execute(insert_on_conflict_do_nothing_flags)
-    db_session.commit()
-
-
-def save_daily_test_rollups(db_session: Session, daily_rollups: dict[str, DailyTotals]):
-    sorted_rollups = sorted(daily_rollups.values(), key=lambda x: str(x["test_id"]))
+def on_conflict_update_daily_test_rollups(stmt: Insert) -> Insert:
     rollup_table = DailyTestRollup.__table__
-    stmt = insert(rollup_table).values(sorted_rollups)
-    stmt = stmt.on_conflict_do_update(
+    return stmt.on_conflict_do_update(
         index_elements=[
             "repoid",
             "branch",
@@ -272,7 +256,33 @@ def save_daily_test_rollups(db_session: Session, daily_rollups: dict[str, DailyT
             + stmt.excluded.commits_where_fail,
         },
     )
-    db_session.execute(stmt)
+
+
+def save_tests(db_session: Session, tests_to_write: dict[str, dict[str, Any]]):
+    test_data = sorted(
+        tests_to_write.values(),
+        key=lambda x: str(x["id"]),
+    )
+
+    test_insert = insert(Test.__table__).values(test_data)
+    db_session.execute(on_conflict_update_tests(test_insert))
+    db_session.commit()
+
+
+def save_test_flag_bridges(db_session: Session, test_flag_bridge_data: list[dict]):
+    insert_on_conflict_do_nothing_flags = (
+        insert(TestFlagBridge.__table__)
+        .values(test_flag_bridge_data)
+        .on_conflict_do_nothing(index_elements=["test_id", "flag_id"])
+    )
+    db_session.execute(insert_on_conflict_do_nothing_flags)
+    db_session.commit()
+
+
+def save_daily_test_rollups(db_session: Session, daily_rollups: dict[str, DailyTotals]):
+    sorted_rollups = sorted(daily_rollups.values(), key=lambda x: str(x["test_id"]))
+    stmt = insert(DailyTestRollup.__table__).values(sorted_rollups)
+    db_session.execute(on_conflict_update_daily_test_rollups(stmt))
     db_session.commit()
 
 
@@ -282,6 +292,180 @@ def save_test_instances(db_session: Session, test_instance_data: list[dict]):
     db_session.commit()
 
 
+def _copy_value(value: Any) -> str:
+    """
+    Serializes `value` as a field of the `COPY` text format.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, (list, tuple)):
+        value = (
+            "{"
+            + ",".join(
+                '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+                for item in value
+            )
+            + "}"
+        )
+    elif isinstance(value, date):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(
+    db_session: Session, table_name: str, columns: list[str], rows: Iterable[dict]
+):
+    """
+    Streams `rows` into `table_name` with a single `COPY ... FROM STDIN`,
+    which avoids compiling and binding a parameter for every value like a
+    multi-VALUES `INSERT` does.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[name]) for name in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = db_session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def merge_rows_from_staging(
+    db_session: Session,
+    target: Table,
+    columns: list[str],
+    rows: Iterable[dict],
+    order_by: list[str],
+    on_conflict: Callable[[Insert], Insert],
+):
+    """
+    `COPY`s `rows` into a temporary staging table, and merges them into `target`
+    with a single `INSERT ... SELECT ... ON CONFLICT` statement.
+
+    Rows are merged in `order_by` order, like the sorted multi-VALUES inserts,
+    so concurrent writers lock the rows of `target` in the same order.
+    """
+    staging_name = f"{target.name}_staging"
+    db_session.execute(
+        text(
+            f"CREATE TEMP TABLE {staging_name} AS "
+            f"SELECT {', '.join(columns)} FROM {target.name} WITH NO DATA"
+        )
+    )
+    copy_rows(db_session, staging_name, columns, rows)
+
+    staging = table(staging_name, *[column(name) for name in columns])
+    stmt = insert(target).from_select(
+        columns,
+        select([staging.c[name] for name in columns]).order_by(
+            *[staging.c[name] for name in order_by]
+        ),
+    )
+    db_session.execute(on_conflict(stmt))
+    db_session.execute(text(f"DROP TABLE {staging_name}"))
+
+
+def copy_tests(db_session: Session, test_data: Iterable[dict]):
+    now = get_utc_now()
+    merge_rows_from_staging(
+        db_session,
+        Test.__table__,
+        [
+            "id",
+            "external_id",
+            "created_at",
+            "updated_at",
+            "repoid",
+            "name",
+            "testsuite",
+            "flags_hash",
+            "framework",
+            "filename",
+            "computed_name",
+        ],
+        (
+            dict(test, external_id=uuid.uuid4(), created_at=now, updated_at=now)
+            for test in test_data
+        ),
+        order_by=["id"],
+        on_conflict=on_conflict_update_tests,
+    )
+    db_session.commit()
+
+
+def copy_test_flag_bridges(db_session: Session, test_flag_bridge_data: list[dict]):
+    merge_rows_from_staging(
+        db_session,
+        TestFlagBridge.__table__,
+        ["test_id", "flag_id"],
+        test_flag_bridge_data,
+        order_by=["test_id", "flag_id"],
+        on_conflict=lambda stmt: stmt.on_conflict_do_nothing(
+            index_elements=["test_id", "flag_id"]
+        ),
+    )
+    db_session.commit()
+
+
+def copy_daily_test_rollups(db_session: Session, daily_rollups: Iterable[DailyTotals]):
+    now = get_utc_now()
+    merge_rows_from_staging(
+        db_session,
+        DailyTestRollup.__table__,
+        [
+            "created_at",
+            "updated_at",
+            *DailyTotals.__annotations__.keys(),
+        ],
+        (dict(rollup, created_at=now, updated_at=now) for rollup in daily_rollups),
+        order_by=["test_id"],
+        on_conflict=on_conflict_update_daily_test_rollups,
+    )
+    db_session.commit()
+
+
+def copy_test_instances(db_session: Session, test_instance_data: Iterable[dict]):
+    # Test instances are only ever inserted, so they don't need a staging table
+    now = get_utc_now()
+    copy_rows(
+        db_session,
+        TestInstance.__tablename__,
+        [
+            "external_id",
+            "created_at",
+            "updated_at",
+            "test_id",
+            "upload_id",
+            "duration_seconds",
+            "outcome",
+            "failure_message",
+            "commitid",
+            "branch",
+            "reduced_error_id",
+            "repoid",
+        ],
+        (
+            dict(instance, external_id=uuid.uuid4(), created_at=now, updated_at=now)
+            for instance in test_instance_data
+        ),
+    )
+    db_session.commit()
+
+
 class PGDriver(TADriver):
     def __init__(self, db_session: Session, flaky_test_set: set[str]):
         self.db_session = db_session
@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+
+from database.tests.factories import UploadFactory
+from ta_storage import fanout
+from ta_storage.base import TADriver, UploadValues
+from ta_storage.fanout import FanOutDriver, SecondaryBackend
+
+TESTRUNS = [
+    {
+        "name": "test_name",
+        "classname": "test_class",
+        "testsuite": "test_suite",
+        "duration": 1.0,
+        "outcome": "pass",
+        "build_url": None,
+        "filename": "test_file",
+        "computed_name": "test_computed_name",
+        "failure_message": None,
+    }
+]
+
+
+class FakeDriver(TADriver):
+    """
+    Stands in for the `BQDriver`, recording the batches it was given.
+    """
+
+    def __init__(
+        self, fail=False, block: threading.Event | None = None, db_session=None
+    ):
+        self.fail = fail
+        self.block = block
+        self.db_session = db_session
+        self.writes = []
+        self.uploads = []
+
+    def write_testruns(
+        self, timestamp, repo_id, commit_sha, branch_name, upload, framework, testruns
+    ):
+        if self.block is not None:
+            self.block.wait()
+        if self.fail:
+            raise RuntimeError("BigQuery is down")
+        if self.db_session is not None:
+            # like the `PGDriver` does, which expires the `Upload`
+            self.db_session.commit()
+        self.uploads.append(upload)
+        self.writes.append((repo_id, commit_sha, upload.id_, framework, testruns))
+
+
+@pytest.fixture
+def upload(dbsession):
+    upload = UploadFactory()
+    dbsession.add(upload)
+    dbsession.flush()
+    return upload
+
+
+def write(driver, upload):
+    return driver.write_testruns(None, 1, "abc", "main", upload, "pytest", TESTRUNS)
+
+
+def test_fanout_writes_to_all_drivers(upload):
+    primary, secondary = FakeDriver(), FakeDriver()
+    driver = FanOutDriver(primary, [SecondaryBackend("bigquery", secondary)])
+
+    assert write(driver, upload) == {"bigquery": "ok"}
+    assert primary.writes == [(1, "abc", upload.id_, "pytest", TESTRUNS)]
+    assert secondary.writes == primary.writes
+
+
+def test_fanout_isolates_secondary_failures(upload):
+    primary, failing, working = FakeDriver(), FakeDriver(fail=True), FakeDriver()
+    driver = FanOutDriver(
+        primary,
+        [SecondaryBackend("failing", failing), SecondaryBackend("working", working)],
+    )
+
+    assert write(driver, upload) == {"failing": "error", "working": "ok"}
+    assert len(primary.writes) == 1
+    assert len(working.writes) == 1
+
+
+def test_fanout_secondary_timeout(upload):
+    unblock = threading.Event()
+    primary, slow = FakeDriver(), FakeDriver(block=unblock)
+    driver = FanOutDriver(primary, [SecondaryBackend("bigquery", slow, timeout=0.1)])
+
+    try:
+        assert write(driver, upload) == {"bigquery": "timeout"}
+        assert len(primary.writes) == 1
+    finally:
+        unblock.set()
+
+
+def test_fanout_primary_failure_is_raised(upload):
+    secondary = FakeDriver()
+    driver = FanOutDriver(
+        FakeDriver(fail=True), [SecondaryBackend("bigquery", secondary, timeout=5)]
+    )
+
+    with pytest.raises(RuntimeError):
+        write(driver, upload)
+
+
+def test_fanout_secondaries_do_not_get_the_upload(dbsession, upload):
+    primary, secondary = FakeDriver(db_session=dbsession), FakeDriver()
+    driver = FanOutDriver(primary, [SecondaryBackend("bigquery", secondary)])
+    upload_id, flag_names = upload.id_, upload.flag_names
+
+    assert write(driver, upload) == {"bigquery": "ok"}
+    assert primary.uploads == [upload]
+    assert secondary.uploads == [UploadValues(upload_id, tuple(flag_names))]
+    assert secondary.writes == primary.writes
+
+
+def test_fanout_waits_for_pending_writes(mocker, upload):
+    mocker.patch.object(fanout, "_pending_writes", threading.BoundedSemaphore(1))
+    unblock = threading.Event()
+    slow, other = FakeDriver(block=unblock), FakeDriver()
+    driver = FanOutDriver(
+        FakeDriver(),
+        [
+            SecondaryBackend("slow", slow, timeout=5),
+            SecondaryBackend("other", other, timeout=5),
+        ],
+    )
+
+    timer = threading.Timer(0.1, unblock.set)
+    timer.start()
+    try:
+        assert write(driver, upload) == {"slow": "ok", "other": "ok"}
+        assert other.writes == slow.writes
+    finally:
+        timer.cancel()
+        unblock.set()
+
+
+def test_fanout_drops_writes_when_saturated(mocker, upload):
+    mocker.patch.object(fanout, "_pending_writes", threading.BoundedSemaphore(1))
+    mocker.patch.object(fanout, "PENDING_WRITE_WAIT_SECONDS", 0.1)
+    unblock = threading.Event()
+    slow, other = FakeDriver(block=unblock), FakeDriver()
+    driver = FanOutDriver(
+        FakeDriver(),
+        [
+            SecondaryBackend("slow", slow, timeout=0.1),
+            SecondaryBackend("other", other, timeout=0.1),
+        ],
+    )
+
+    try:
+        assert write(driver, upload) == {"slow": "timeout", "other": "dropped"}
+        assert other.writes == []
+    finally:
+        unblock.set()
@@ -1,6 +1,15 @@
+from datetime import date, datetime
+
 from database.models import DailyTestRollup, Test, TestFlagBridge, TestInstance
 from database.tests.factories import RepositoryFlagFactory, UploadFactory
-from ta_storage.pg import PGDriver
+from ta_storage.pg import (
+    PGDriver,
+    _copy_value,
+    copy_daily_test_rollups,
+    copy_test_flag_bridges,
+    copy_test_instances,
+    copy_tests,
+)
 
 
 def test_pg_driver(dbsession):
@@ -61,3 +70,88 @@ def test_pg_driver(dbsession):
     assert dbsession.query(TestInstance).count() == 2
     assert dbsession.query(TestFlagBridge).count() == 4
     assert dbsession.query(DailyTestRollup).count() == 2
+
+
+def test_copy_value():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value(True) == "t"
+    assert _copy_value(1.5) == "1.5"
+    assert _copy_value(date(2024, 1, 2)) == "2024-01-02"
+    assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert _copy_value(["abc", 'd"e']) == '{"abc","d\\\\"e"}'
+    assert _copy_value([]) == "{}"
+
+
+def test_copy_ingest(dbsession):
+    upload = UploadFactory()
+    dbsession.add(upload)
+    dbsession.flush()
+    repo_flag = RepositoryFlagFactory(
+        repository=upload.report.commit.repository, flag_name="flag1"
+    )
+    dbsession.add(repo_flag)
+    dbsession.flush()
+    repoid = upload.report.commit.repoid
+
+    tests = [
+        {
+            "id": f"test_id_{i}",
+            "repoid": repoid,
+            "name": f"test_class\x1ftest_name_{i}",
+            "testsuite": "test_suite",
+            "flags_hash": "",
+            "framework": "pytest",
+            "filename": None,
+            "computed_name": f"test_computed_name_{i}",
+        }
+        for i in range(2)
+    ]
+    rollup = {
+        "test_id": "test_id_0",
+        "repoid": repoid,
+        "last_duration_seconds": 1.0,
+        "avg_duration_seconds": 1.0,
+        "pass_count": 0,
+        "fail_count": 1,
+        "skip_count": 0,
+        "flaky_fail_count": 0,
+        "branch": "main",
+        "date": date.today(),
+        "latest_run": datetime.now(),
+        "commits_where_fail": ["abc"],
+    }
+    instance = {
+        "test_id": "test_id_0",
+        "upload_id": upload.id,
+        "duration_seconds": 1.0,
+        "outcome": "failure",
+        "failure_message": "line 1\n\tline 2",
+        "commitid": "abc",
+        "branch": "main",
+        "reduced_error_id": None,
+        "repoid": repoid,
+    }
+
+    copy_tests(dbsession, tests)
+    copy_tests(dbsession, [dict(tests[0], filename="test_file")])
+    copy_test_flag_bridges(
+        dbsession, [{"test_id": "test_id_0", "flag_id": repo_flag.id}]
+    )
+    copy_test_flag_bridges(
+        dbsession, [{"test_id": "test_id_0", "flag_id": repo_flag.id}]
+    )
+    copy_daily_test_rollups(dbsession, [rollup])
+    copy_daily_test_rollups(dbsession, [dict(rollup, commits_where_fail=["def"])])
+    copy_test_instances(dbsession, [instance])
+
+    assert dbsession.query(Test).count() == 2
+    assert dbsession.query(Test).get("test_id_0").filename == "test_file"
+    assert dbsession.query(TestFlagBridge).count() == 1
+
+    daily_rollup = dbsession.query(DailyTestRollup).one()
+    assert daily_rollup.fail_count == 2
+    assert daily_rollup.commits_where_fail == ["abc", "def"]
+
+    test_instance = dbsession.query(TestInstance).one()
+    assert test_instance.failure_message == "line 1\n\tline 2"
+    assert test_instance.reduced_error_id is None
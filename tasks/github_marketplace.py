@@ -6,6 +6,7 @@ from shared.billing import BillingPlan
 from shared.celery_config import ghm_sync_plans_task_name
 
 from app import celery_app
+from celery_task_router import invalidate_plan_routing_cache
 from database.models import Owner, Repository
 from services.github_marketplace import GitHubMarketplaceService
 from services.stripe import stripe
@@ -212,6 +213,8 @@ class SyncPlansTask(BaseCodecovTask, name=ghm_sync_plans_task_name):
                     prorate=True,
                 )
                 owner.stripe_subscription_id = None
+
+            invalidate_plan_routing_cache(owner.ownerid)
         else:
             # create the user
             user_data = ghm_service.get_user(service_id)
@@ -248,6 +251,7 @@ class SyncPlansTask(BaseCodecovTask, name=ghm_sync_plans_task_name):
             owner.plan_activated_users = None
 
             self.deactivate_repos(db_session, owner.ownerid)
+            invalidate_plan_routing_cache(owner.ownerid)
         else:
             # create the user
             user_data = ghm_service.get_user(service_id)
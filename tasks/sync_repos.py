@@ -13,11 +13,13 @@ from shared.celery_config import (
 from shared.config import get_config
 from shared.torngit.base import TorngitBaseAdapter
 from shared.torngit.exceptions import TorngitClientError, TorngitServerFailureError
-from sqlalchemy import and_
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.session import Session
 
 from app import celery_app
 from database.models import Owner, Repository
+from rollouts import SYNC_REPOS_BULK_UPSERT
 from services.owner import get_owner_provider_service
 from services.redis import get_redis_connection
 from tasks.base import BaseCodecovTask
@@ -254,6 +256,9 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
         )
 
         repoids = []
+        use_bulk_upsert = SYNC_REPOS_BULK_UPSERT.check_value(
+            identifier=ownerid, default=False
+        )
 
         # We're testing processing repos a page at a time and this helper
         # function avoids duplicating the code in the old and new paths
@@ -288,6 +293,24 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
                     if repo["repo"]["service_id"] in missing_service_ids
                 ]
 
+                if use_bulk_upsert:
+                    unique_missing_repos = {
+                        repo["repo"]["service_id"]: repo["repo"]
+                        for repo in missing_repos
+                    }
+                    inserted = self._bulk_insert_repos(
+                        db_session,
+                        [
+                            (ownerid, repo_data, True)
+                            for repo_data in unique_missing_repos.values()
+                        ],
+                    )
+                    repoids.extend(
+                        inserted[(ownerid, repo["repo"]["service_id"])]
+                        for repo in missing_repos
+                    )
+                    return
+
                 for repo in missing_repos:
                     repo_data = repo["repo"]
                     new_repo = Repository(
@@ -360,8 +383,52 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
         repoids = []
         owners_by_id = {}
 
-        # We're testing processing repos a page at a time and this helper
-        # function avoids duplicating the code in the old and new paths
+        def process_repos_in_bulk(repos):
+            # Resolve every owner first so the repos of the whole page (and
+            # their forks) can be reconciled with a handful of queries.
+            entries = []
+            for repo in repos:
+                owner_key = (
+                    service,
+                    repo["owner"]["service_id"],
+                    repo["owner"]["username"],
+                )
+                _ownerid = owners_by_id.get(owner_key)
+                if not _ownerid:
+                    _ownerid = self.upsert_owner(
+                        db_session,
+                        service,
+                        repo["owner"]["service_id"],
+                        repo["owner"]["username"],
+                    )
+                    owners_by_id[owner_key] = _ownerid
+                entries.append((_ownerid, repo["repo"], using_integration))
+
+                if repo["repo"].get("fork"):
+                    fork = repo["repo"]["fork"]
+                    _fork_ownerid = self.upsert_owner(
+                        db_session,
+                        service,
+                        fork["owner"]["service_id"],
+                        fork["owner"]["username"],
+                    )
+                    entries.append((_fork_ownerid, fork["repo"], None))
+
+            upserted_repoids = iter(
+                self.bulk_upsert_repos(db_session, service, entries)
+            )
+            for repo in repos:
+                repoid = next(upserted_repoids)
+                repoids.append(repoid)
+                if repo["repo"].get("fork"):
+                    _repoid = next(upserted_repoids)
+                    repoids.append(_repoid)
+                    if repo["repo"]["fork"]["repo"]["private"]:
+                        private_project_ids.append(int(_repoid))
+                if repo["repo"]["private"]:
+                    private_project_ids.append(int(repoid))
+            db_session.commit()
+
         def process_repos(repos):
             for repo in repos:
                 _ownerid = owners_by_id.get(
@@ -412,9 +479,15 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
                     private_project_ids.append(int(repoid))
                 db_session.commit()
 
+        use_bulk_upsert = SYNC_REPOS_BULK_UPSERT.check_value(
+            identifier=ownerid, default=False
+        )
         try:
             async for page in git.list_repos_generator():
-                process_repos(page)
+                if use_bulk_upsert:
+                    process_repos_in_bulk(page)
+                else:
+                    process_repos(page)
 
         except (
             SoftTimeLimitExceeded,
@@ -641,6 +714,226 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
         db_session.flush()
         return new_repo.repoid
 
+    def bulk_upsert_repos(
+        self,
+        db_session: Session,
+        service: str,
+        entries: List[Tuple[int, dict, Optional[bool]]],
+    ) -> List[int]:
+        """Bulk version of `upsert_repo` for a whole page of provider repos.
+
+        `entries` is a list of `(ownerid, repo_data, using_integration)` tuples.
+        Instead of up to three queries per repo, the existing rows are fetched
+        with one query per match key (`service_id` and `(ownerid, name)`) and
+        reconciled in memory following the same rules as `upsert_repo`. Only
+        the rows that actually changed are updated, and all missing repos are
+        created with a single multi-row insert.
+
+        Returns the repoids in the same order as `entries`.
+        """
+        if not entries:
+            return []
+
+        service_ids = {repo_data["service_id"] for _, repo_data, _ in entries}
+        owner_and_names = {
+            (ownerid, repo_data["name"]) for ownerid, repo_data, _ in entries
+        }
+
+        repos_with_service_id = (
+            db_session.query(Repository)
+            .join(Owner, Repository.ownerid == Owner.ownerid)
+            .filter(
+                Repository.service_id.in_(service_ids),
+                Owner.service == service,
+            )
+            .all()
+        )
+        repos_with_owner_and_name = (
+            db_session.query(Repository)
+            .filter(tuple_(Repository.ownerid, Repository.name).in_(owner_and_names))
+            .all()
+        )
+
+        by_owner_and_service_id = {
+            (repo.ownerid, repo.service_id): repo for repo in repos_with_service_id
+        }
+        by_service_id = {}
+        for repo in repos_with_service_id:
+            if repo.deleted is False:
+                by_service_id.setdefault(repo.service_id, repo)
+        by_owner_and_name = {
+            (repo.ownerid, repo.name): repo for repo in repos_with_owner_and_name
+        }
+
+        resolved: List[Repository | Tuple[int, str]] = []
+        to_insert = {}
+        for ownerid, repo_data, using_integration in entries:
+            service_id = repo_data["service_id"]
+            key = (ownerid, service_id)
+
+            repo = by_owner_and_service_id.get(key)
+            if repo is not None:
+                # Found the exact repo. Let's just update
+                has_changes = False
+                if repo.private != repo_data["private"]:
+                    repo.private = repo_data["private"]
+                    has_changes = True
+                if repo.language != repo_data["language"]:
+                    repo.language = repo_data["language"]
+                    has_changes = True
+                if repo.name != repo_data["name"]:
+                    repo.name = repo_data["name"]
+                    has_changes = True
+                if repo.deleted is not False:
+                    repo.deleted = False
+                    has_changes = True
+                if has_changes:
+                    repo.updatestamp = datetime.now()
+                resolved.append(repo)
+                continue
+
+            if key in to_insert:
+                # Same repo listed twice in this page (e.g. as a fork)
+                resolved.append(key)
+                continue
+
+            repo_correct_serviceid_wrong_owner = by_service_id.get(service_id)
+            repo_correct_owner_wrong_service_id = by_owner_and_name.get(
+                (ownerid, repo_data["name"])
+            )
+            if (
+                repo_correct_serviceid_wrong_owner is not None
+                and repo_correct_owner_wrong_service_id is not None
+            ):
+                log.warning(
+                    "There is a repo with the right service_id and a repo with the right slug, but they are not the same",
+                    extra=dict(
+                        repo_data=repo_data,
+                        repo_correct_serviceid_wrong_owner=dict(
+                            repoid=repo_correct_serviceid_wrong_owner.repoid,
+                            service_id=repo_correct_serviceid_wrong_owner.service_id,
+                        ),
+                        repo_correct_owner_wrong_service_id=dict(
+                            repoid=repo_correct_owner_wrong_service_id.repoid,
+                            service_id=repo_correct_owner_wrong_service_id.service_id,
+                        ),
+                    ),
+                )
+                resolved.append(repo_correct_serviceid_wrong_owner)
+                continue
+
+            if repo_correct_serviceid_wrong_owner is not None:
+                repo = repo_correct_serviceid_wrong_owner
+                log.info(
+                    "Updating repo - wrong owner",
+                    extra=dict(
+                        ownerid=ownerid,
+                        repo_id=repo.repoid,
+                        repo_name=repo_data["name"],
+                    ),
+                )
+                by_owner_and_service_id.pop((repo.ownerid, repo.service_id), None)
+                repo.ownerid = ownerid
+                repo.private = repo_data["private"]
+                repo.language = repo_data["language"]
+                repo.name = repo_data["name"]
+                repo.deleted = False
+                repo.updatestamp = datetime.now()
+                by_owner_and_service_id[key] = repo
+                resolved.append(repo)
+                continue
+
+            if repo_correct_owner_wrong_service_id is not None:
+                repo = repo_correct_owner_wrong_service_id
+                log.info(
+                    "Updating repo - correct owner, wrong service_id",
+                    extra=dict(
+                        ownerid=ownerid,
+                        repo_id=repo.service_id,
+                        repo_name=repo_data["name"],
+                    ),
+                )
+                by_owner_and_service_id.pop((repo.ownerid, repo.service_id), None)
+                repo.service_id = service_id
+                repo.name = repo_data["name"]
+                repo.language = repo_data["language"]
+                repo.private = repo_data["private"]
+                repo.using_integration = using_integration
+                repo.updatestamp = datetime.now()
+                by_owner_and_service_id[key] = repo
+                resolved.append(repo)
+                continue
+
+            to_insert[key] = (ownerid, repo_data, using_integration)
+            resolved.append(key)
+
+        # Write every modified row in one flush before inserting, so moved
+        # repos don't collide with the new ones on the unique indexes
+        db_session.flush()
+        inserted = self._bulk_insert_repos(db_session, list(to_insert.values()))
+
+        log.info(
+            "Bulk upserted repos",
+            extra=dict(
+                num_repos=len(entries),
+                num_inserted=len(inserted),
+            ),
+        )
+        return [
+            repo.repoid if isinstance(repo, Repository) else inserted[repo]
+            for repo in resolved
+        ]
+
+    def _bulk_insert_repos(
+        self,
+        db_session: Session,
+        entries: List[Tuple[int, dict, Optional[bool]]],
+    ) -> dict[Tuple[int, str], int]:
+        """Inserts all `entries` with a single multi-row `INSERT ... RETURNING`.
+
+        A repo that was created concurrently (e.g. by a webhook) is updated in
+        place instead of failing the whole page on `repos_service_ids`.
+
+        Returns a mapping of `(ownerid, service_id)` to the repoid.
+        """
+        if not entries:
+            return {}
+
+        table = Repository.__table__
+        insert_statement = insert(table).values(
+            [
+                dict(
+                    ownerid=ownerid,
+                    service_id=repo_data["service_id"],
+                    name=repo_data["name"],
+                    language=repo_data["language"],
+                    private=repo_data["private"],
+                    branch=repo_data["branch"],
+                    using_integration=using_integration,
+                )
+                for ownerid, repo_data, using_integration in entries
+            ]
+        )
+        upsert_statement = insert_statement.on_conflict_do_update(
+            index_elements=[table.columns.ownerid, table.columns.service_id],
+            set_=dict(
+                name=insert_statement.excluded.name,
+                language=insert_statement.excluded.language,
+                private=insert_statement.excluded.private,
+                deleted=False,
+                updatestamp=datetime.now(),
+                # `None` (without integration) keeps what the repo already has
+                using_integration=func.coalesce(
+                    insert_statement.excluded.using_integration,
+                    table.columns.using_integration,
+                ),
+            ),
+        ).returning(
+            table.columns.repoid, table.columns.ownerid, table.columns.service_id
+        )
+        result = db_session.execute(upsert_statement)
+        return {(ownerid, service_id): repoid for repoid, ownerid, service_id in result}
+
     def sync_repos_languages(
         self, sync_repos_output: dict, manual_trigger: bool, current_owner: Owner
     ):
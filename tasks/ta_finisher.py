@@ -38,6 +38,7 @@ from services.test_results import (
     TestResultsNotificationFailure,
     TestResultsNotificationPayload,
     TestResultsNotifier,
+    get_flake_set,
     get_test_summary_for_commit,
     latest_failures_for_commit,
     should_do_flaky_detection,
@@ -160,7 +161,14 @@ def get_flaky_tests(
     repoid: int,
     failures: list[TestResultsNotificationFailure],
 ) -> dict[str, FlakeInfo]:
-    failure_test_ids = [failure.test_id for failure in failures]
+    # only the failures of currently flaky tests can match, and the flake set
+    # of the repo is usually cached already
+    flake_set = get_flake_set(db_session, repoid)
+    failure_test_ids = [
+        failure.test_id for failure in failures if failure.test_id in flake_set
+    ]
+    if not failure_test_ids:
+        return {}
 
     matching_flakes = list(
         db_session.query(Flake)
@@ -19,6 +19,7 @@ from services.processing.types import UploadArguments
 from services.test_results import get_flake_set
 from services.yaml import read_yaml_field
 from ta_storage.bq import BQDriver
+from ta_storage.fanout import FanOutDriver, SecondaryBackend
 from ta_storage.pg import PGDriver
 from tasks.base import BaseCodecovTask
 
@@ -129,35 +130,30 @@ class TAProcessorTask(BaseCodecovTask, name=ta_processor_task_name):
         else:
             flaky_test_set = get_flake_set(db_session, upload.report.commit.repoid)
             pg = PGDriver(db_session, flaky_test_set)
-            bq_enabled = False
+            secondaries = []
             if get_config("services", "bigquery", "enabled", default=False):
-                bq = BQDriver()
-                bq_enabled = True
+                secondaries.append(
+                    SecondaryBackend(
+                        name="bigquery",
+                        driver=BQDriver(),
+                        timeout=get_config(
+                            "services", "bigquery", "write_timeout", default=30
+                        ),
+                    )
+                )
+            driver = FanOutDriver(pg, secondaries)
 
             for parsing_info in parsing_infos:
-                framework = parsing_info["framework"]
-                testruns = parsing_info["testruns"]
-                pg.write_testruns(
+                driver.write_testruns(
                     None,
                     repoid,
                     commitid,
                     branch,
                     upload,
-                    framework,
-                    testruns,
+                    parsing_info["framework"],
+                    parsing_info["testruns"],
                 )
 
-                if bq_enabled:
-                    bq.write_testruns(
-                        None,
-                        repoid,
-                        commitid,
-                        branch,
-                        upload,
-                        framework,
-                        testruns,
-                    )
-
             upload.state = "v2_processed"
             db_session.commit()
 
@@ -16,7 +16,6 @@ from sqlalchemy.orm import Session
 from app import celery_app
 from database.models import (
     DailyTestRollup,
-    Flake,
     Repository,
     RepositoryFlag,
     Test,
@@ -25,10 +24,21 @@ from database.models import (
     Upload,
 )
 from helpers.metrics import metrics
+from rollouts import TA_COPY_INGEST
 from services.archive import ArchiveService
 from services.processing.types import UploadArguments
-from services.test_results import generate_flags_hash, generate_test_id
+from services.test_results import (
+    generate_flags_hash,
+    generate_test_id,
+    get_flake_set,
+)
 from services.yaml import read_yaml_field
+from ta_storage.pg import (
+    copy_daily_test_rollups,
+    copy_test_flag_bridges,
+    copy_test_instances,
+    copy_tests,
+)
 from tasks.base import BaseCodecovTask
 
 log = logging.getLogger(__name__)
@@ -153,12 +163,7 @@ class TestResultsProcessorTask(BaseCodecovTask, name=test_results_processor_task
 
         results = []
 
-        repo_flakes = (
-            db_session.query(Flake.testid)
-            .filter(Flake.repoid == repoid, Flake.end_date.is_(None))
-            .all()
-        )
-        flaky_test_set = {flake.testid for flake in repo_flakes}
+        flaky_test_set = get_flake_set(db_session, repoid)
         repository = (
             db_session.query(Repository)
             .filter(Repository.repoid == int(repoid))
@@ -208,6 +213,20 @@ class TestResultsProcessorTask(BaseCodecovTask, name=test_results_processor_task
         flags_hash = generate_flags_hash(flags)
         repo_flag_ids = get_repo_flag_ids(db_session, repoid, flags)
 
+        # Large uploads spend most of their time building and binding
+        # multi-VALUES inserts, `COPY` streams the rows instead
+        use_copy = TA_COPY_INGEST.check_value(identifier=repoid, default=False)
+        save_tests = copy_tests if use_copy else self.save_tests
+        save_test_flag_bridges = (
+            copy_test_flag_bridges if use_copy else self.save_test_flag_bridges
+        )
+        save_daily_test_rollups = (
+            copy_daily_test_rollups if use_copy else self.save_daily_test_rollups
+        )
+        save_test_instances = (
+            copy_test_instances if use_copy else self.save_test_instances
+        )
+
         for p in parsing_results:
             framework = p["framework"]
 
@@ -279,12 +298,12 @@ class TestResultsProcessorTask(BaseCodecovTask, name=test_results_processor_task
                 test_data.values(),
                 key=lambda x: str(x["id"]),
             )
-            self.save_tests(db_session, sorted_tests)
+            save_tests(db_session, sorted_tests)
 
             log.info("Upserted tests to database", extra=dict(upload_id=upload_id))
 
         if len(test_flag_bridge_data) > 0:
-            self.save_test_flag_bridges(db_session, test_flag_bridge_data)
+            save_test_flag_bridges(db_session, test_flag_bridge_data)
 
             log.info(
                 "Inserted new test flag bridges to database",
@@ -295,7 +314,7 @@ class TestResultsProcessorTask(BaseCodecovTask, name=test_results_processor_task
             sorted_rollups = sorted(
                 daily_totals.values(), key=lambda x: str(x["test_id"])
             )
-            self.save_daily_test_rollups(db_session, sorted_rollups)
+            save_daily_test_rollups(db_session, sorted_rollups)
 
             log.info(
                 "Upserted daily test rollups to database",
@@ -307,7 +326,7 @@ class TestResultsProcessorTask(BaseCodecovTask, name=test_results_processor_task
             metrics.gauge(
                 "test_results_processor.test_instance_count", len(test_instance_data)
             )
-            self.save_test_instances(db_session, test_instance_data)
+            save_test_instances(db_session, test_instance_data)
 
             log.info(
                 "Inserted test instances to database", extra=dict(upload_id=upload_id)
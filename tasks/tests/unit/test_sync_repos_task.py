@@ -385,6 +385,132 @@ class TestSyncReposTaskUnit(object):
         assert new_repo.branch == repo_data.get("branch")
         assert new_repo.private is True
 
+    def test_bulk_upsert_repos(self, dbsession):
+        service = "gitlab"
+        user = OwnerFactory.create(
+            organizations=[],
+            service=service,
+            username="1nf1n1t3l00p",
+            permission=[],
+            service_id="45343385",
+        )
+        wrong_owner = OwnerFactory.create(
+            organizations=[], service=service, username="cc", permission=[]
+        )
+        dbsession.add_all([user, wrong_owner])
+        dbsession.flush()
+        existing_repo = RepositoryFactory.create(
+            private=True,
+            name="old-name",
+            using_integration=False,
+            service_id="1",
+            owner=user,
+        )
+        moved_repo = RepositoryFactory.create(
+            private=True,
+            name="moved",
+            using_integration=False,
+            service_id="2",
+            owner=wrong_owner,
+        )
+        recreated_repo = RepositoryFactory.create(
+            private=True,
+            name="recreated",
+            using_integration=False,
+            service_id="40404",
+            owner=user,
+        )
+        dbsession.add_all([existing_repo, moved_repo, recreated_repo])
+        dbsession.flush()
+
+        def repo_data(service_id, name):
+            return {
+                "service_id": service_id,
+                "name": name,
+                "fork": None,
+                "private": False,
+                "language": "python",
+                "branch": "main",
+            }
+
+        entries = [
+            (user.ownerid, repo_data("4", "new"), False),
+            (user.ownerid, repo_data("1", "new-name"), False),
+            (user.ownerid, repo_data("2", "moved"), False),
+            (user.ownerid, repo_data("3", "recreated"), False),
+            (user.ownerid, repo_data("4", "new"), False),
+        ]
+        repoids = SyncReposTask().bulk_upsert_repos(dbsession, service, entries)
+
+        new_repo = (
+            dbsession.query(Repository)
+            .filter(Repository.ownerid == user.ownerid, Repository.service_id == "4")
+            .one()
+        )
+        assert repoids == [
+            new_repo.repoid,
+            existing_repo.repoid,
+            moved_repo.repoid,
+            recreated_repo.repoid,
+            new_repo.repoid,
+        ]
+        assert new_repo.name == "new"
+        assert new_repo.using_integration is False
+        dbsession.refresh(existing_repo)
+        assert existing_repo.name == "new-name"
+        assert existing_repo.private is False
+        assert existing_repo.updatestamp is not None
+        dbsession.refresh(moved_repo)
+        assert moved_repo.ownerid == user.ownerid
+        dbsession.refresh(recreated_repo)
+        assert recreated_repo.service_id == "3"
+
+    def test_bulk_insert_repos_conflict_sets_using_integration(self, dbsession):
+        user = OwnerFactory.create(organizations=[], service="github", permission=[])
+        dbsession.add(user)
+        dbsession.flush()
+        # created concurrently, for example by a webhook
+        concurrent_repo = RepositoryFactory.create(
+            using_integration=False, service_id="1", owner=user
+        )
+        integration_repo = RepositoryFactory.create(
+            using_integration=True, service_id="2", owner=user
+        )
+        dbsession.add_all([concurrent_repo, integration_repo])
+        dbsession.flush()
+
+        def repo_data(service_id):
+            return {
+                "service_id": service_id,
+                "name": f"repo-{service_id}",
+                "private": False,
+                "language": "python",
+                "branch": "main",
+            }
+
+        inserted = SyncReposTask()._bulk_insert_repos(
+            dbsession,
+            [
+                (user.ownerid, repo_data("1"), True),
+                (user.ownerid, repo_data("2"), None),
+            ],
+        )
+
+        assert inserted == {
+            (user.ownerid, "1"): concurrent_repo.repoid,
+            (user.ownerid, "2"): integration_repo.repoid,
+        }
+        dbsession.refresh(concurrent_repo)
+        assert concurrent_repo.using_integration is True
+        # syncing without the integration does not reset it
+        dbsession.refresh(integration_repo)
+        assert integration_repo.using_integration is True
+
+    def test_bulk_upsert_repos_no_entries(self, dbsession, mocker):
+        query = mocker.spy(dbsession, "query")
+        assert SyncReposTask().bulk_upsert_repos(dbsession, "github", []) == []
+        assert query.call_count == 0
+
     @pytest.mark.django_db(databases={"default"})
     def test_only_public_repos_already_in_db(self, dbsession):
         token = "ecd73a086eadc85db68747a66bdbd662a785a072"
@@ -4,7 +4,10 @@ from unittest.mock import ANY
 import pytest
 from celery.exceptions import Retry
 from redis.exceptions import LockError
-from shared.celery_config import timeseries_save_commit_measurements_task_name
+from shared.celery_config import (
+    timeseries_save_commit_measurements_task_name,
+    upload_finisher_task_name,
+)
 from shared.torngit.exceptions import TorngitObjectNotFoundError
 from shared.yaml import UserYaml
 
@@ -15,14 +18,22 @@ from helpers.checkpoint_logger import _kwargs_key
 from helpers.checkpoint_logger.flows import UploadFlow
 from helpers.exceptions import RepositoryWithoutValidBotError
 from helpers.log_context import LogContext, set_log_context
+from services.processing.coordinator import MergeCoordinator
+from services.processing.intermediate import (
+    DEFERRED_REPORT_MAX_AGE,
+    load_deferred_report,
+)
 from services.processing.merging import get_joined_flag, update_uploads
+from services.processing.state import ProcessingState, UploadNumbers
 from services.processing.types import MergeResult, ProcessingResult
 from tasks.upload_finisher import (
     ReportService,
     ShouldCallNotifyResult,
     UploadFinisherTask,
+    get_report_lock,
     load_commit_diff,
 )
+from tasks.upload_processor import MAX_RETRIES
 
 here = Path(__file__)
 
@@ -417,9 +428,7 @@ class TestUploadFinisherTask(object):
         )
         dbsession.add(commit)
 
-        mocked_report = mocker.patch.object(
-            ReportService, "get_existing_report_for_commit"
-        )
+        mocked_report = mocker.patch.object(ReportService, "get_lazy_report_for_commit")
         mocked_report.return_value = mocker.MagicMock(
             sessions=[mocker.MagicMock()] * 8
         )  # 8 sessions
@@ -445,9 +454,7 @@ class TestUploadFinisherTask(object):
         )
         dbsession.add(commit)
 
-        mocked_report = mocker.patch.object(
-            ReportService, "get_existing_report_for_commit"
-        )
+        mocked_report = mocker.patch.object(ReportService, "get_lazy_report_for_commit")
         mocked_report.return_value = mocker.MagicMock(
             sessions=[mocker.MagicMock()] * 10
         )  # 10 sessions
@@ -668,3 +675,310 @@ class TestUploadFinisherTask(object):
                 commitid=commit.commitid,
                 commit_yaml={},
             )
+
+    @pytest.mark.django_db()
+    def test_merges_each_upload_once(self, dbsession, mocker):
+        mocker.patch("tasks.upload_finisher.load_commit_diff", return_value=None)
+
+        def merge_batch(db_session, state, commit, commit_yaml, results, *args):
+            state.mark_uploads_as_merged([result["upload_id"] for result in results])
+
+        merge_batch = mocker.patch.object(
+            UploadFinisherTask, "merge_batch", side_effect=merge_batch
+        )
+        mocker.patch.object(UploadFinisherTask, "maybe_finish_reports_processing")
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        state = ProcessingState(commit.repoid, commit.commitid)
+        state.mark_uploads_as_processing([1, 2])
+        state.mark_upload_as_processed(1)
+        state.mark_upload_as_processed(2)
+
+        results = [
+            {"upload_id": 1, "successful": True, "arguments": {}},
+            {"upload_id": 2, "successful": True, "arguments": {}},
+        ]
+        task = UploadFinisherTask()
+        task.request.timelimit = [123, 100]
+        for _ in range(2):  # the same task being delivered twice
+            task.run_impl(
+                dbsession,
+                results,
+                repoid=commit.repoid,
+                commitid=commit.commitid,
+                commit_yaml={},
+            )
+
+        assert merge_batch.call_count == 1
+        assert merge_batch.call_args[0][4] == results
+        assert state.get_upload_numbers() == UploadNumbers(0, 0, 0)
+
+    @pytest.mark.django_db()
+    def test_merge_coordinator_exits_when_report_locked(self, dbsession, mocker):
+        mocker.patch(
+            "tasks.upload_finisher.UPLOAD_FINISHER_MERGE_COORDINATOR.check_value",
+            return_value=True,
+        )
+        mocker.patch("tasks.upload_finisher.load_commit_diff", return_value=None)
+
+        def merge_batch(db_session, state, commit, commit_yaml, results, *args, **kw):
+            state.mark_uploads_as_merged([result["upload_id"] for result in results])
+
+        merge_batch = mocker.patch.object(
+            UploadFinisherTask, "merge_batch", side_effect=merge_batch
+        )
+        maybe_finish = mocker.patch.object(
+            UploadFinisherTask, "maybe_finish_reports_processing"
+        )
+        mocked_app = mocker.patch.object(UploadFinisherTask, "app")
+        _start_upload_flow(mocker)
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        state = ProcessingState(commit.repoid, commit.commitid)
+        state.mark_uploads_as_processing([1, 2])
+        state.mark_upload_as_processed(1)
+        state.mark_upload_as_processed(2)
+
+        # another finisher is holding the report lock
+        lock = get_report_lock(commit.repoid, commit.commitid, 0)
+        assert lock.acquire(blocking=False)
+
+        task = UploadFinisherTask()
+        task.request.timelimit = [123, 100]
+        for upload_id in [1, 2]:
+            result = task.run_impl(
+                dbsession,
+                [{"upload_id": upload_id, "successful": True, "arguments": {}}],
+                repoid=commit.repoid,
+                commitid=commit.commitid,
+                commit_yaml={},
+            )
+            assert result is None
+        assert not merge_batch.called
+        # the uploads were left to the lock holder, with a single drain check
+        # scheduled in case it dies before merging them
+        assert MergeCoordinator(commit.repoid, commit.commitid).has_registered_uploads()
+        drain_check = mocked_app.tasks[upload_finisher_task_name].apply_async
+        drain_check.assert_called_once()
+        assert drain_check.call_args.kwargs["args"] == ([],)
+        drain_kwargs = drain_check.call_args.kwargs["kwargs"]
+        assert drain_kwargs["drain_check"] is True
+
+        # the lock holder dies, and the drain check merges what is left
+        lock.release()
+        task.run_impl(dbsession, [], **drain_kwargs)
+        merge_batch.assert_called_once()
+        merged = merge_batch.call_args[0][4]
+        assert sorted(result["upload_id"] for result in merged) == [1, 2]
+        maybe_finish.assert_called_once()
+        assert not MergeCoordinator(
+            commit.repoid, commit.commitid
+        ).has_registered_uploads()
+        assert state.get_upload_numbers() == UploadNumbers(0, 0, 0)
+
+    @pytest.mark.django_db()
+    def test_merge_coordinator_recovers_crashed_batch(self, dbsession, mocker):
+        mocker.patch(
+            "tasks.upload_finisher.UPLOAD_FINISHER_MERGE_COORDINATOR.check_value",
+            return_value=True,
+        )
+        mocker.patch("tasks.upload_finisher.load_commit_diff", return_value=None)
+        mocker.patch.object(UploadFinisherTask, "maybe_finish_reports_processing")
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        state = ProcessingState(commit.repoid, commit.commitid)
+        state.mark_uploads_as_processing([1])
+        state.mark_upload_as_processed(1)
+        results = [{"upload_id": 1, "successful": True, "arguments": {}}]
+
+        # a lock holder claimed the upload, and was killed while merging it
+        coordinator = MergeCoordinator(commit.repoid, commit.commitid)
+        coordinator.register(results)
+        assert coordinator.take_batch(state) == results
+
+        def merge_batch(db_session, state, commit, commit_yaml, results, *args, **kw):
+            state.mark_uploads_as_merged([result["upload_id"] for result in results])
+
+        merge_batch = mocker.patch.object(
+            UploadFinisherTask, "merge_batch", side_effect=merge_batch
+        )
+        task = UploadFinisherTask()
+        task.request.timelimit = [123, 100]
+        task.run_impl(
+            dbsession,
+            [],
+            repoid=commit.repoid,
+            commitid=commit.commitid,
+            commit_yaml={},
+            drain_check=True,
+        )
+
+        merge_batch.assert_called_once()
+        assert merge_batch.call_args[0][4] == results
+        assert not coordinator.has_registered_uploads()
+        assert state.get_upload_numbers() == UploadNumbers(0, 0, 0)
+
+    @pytest.mark.django_db()
+    def test_merge_batch_defers_report_save(self, dbsession, mocker, mock_redis):
+        mocker.patch(
+            "tasks.upload_finisher.UPLOAD_FINISHER_DEFERRED_REPORT_SAVE.check_value",
+            return_value=True,
+        )
+        mocker.patch("tasks.upload_finisher.load_intermediate_reports", return_value=[])
+        mocker.patch("tasks.upload_finisher.update_uploads")
+        load_deferred_report = mocker.patch(
+            "tasks.upload_finisher.load_deferred_report", return_value=None
+        )
+        save_deferred_report = mocker.patch(
+            "tasks.upload_finisher.save_deferred_report"
+        )
+        mocker.patch(
+            "tasks.upload_finisher.deferred_report_save_is_due", return_value=False
+        )
+        cleanup_deferred_report = mocker.patch(
+            "tasks.upload_finisher.cleanup_deferred_report"
+        )
+        get_existing_report = mocker.patch.object(
+            ReportService, "get_existing_report_for_commit", return_value=None
+        )
+        save_report = mocker.patch.object(ReportService, "save_report")
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+
+        state = mocker.MagicMock()
+        state.get_upload_numbers.return_value = UploadNumbers(
+            processing=0, processed=1, merging=1
+        )
+        task = UploadFinisherTask()
+        batch = [{"upload_id": 1, "successful": True, "arguments": {}}]
+
+        report = task.merge_batch(
+            dbsession, state, commit, UserYaml({}), batch, None, None
+        )
+        assert report is not None
+        save_deferred_report.assert_called_once_with(
+            commit.repoid, commit.commitid, report
+        )
+        assert not save_report.called
+        state.mark_uploads_as_merged.assert_called_once_with([1])
+
+        # the last batch continues from the returned report, and saves it
+        state.get_upload_numbers.return_value = UploadNumbers(
+            processing=0, processed=0, merging=1
+        )
+        batch = [{"upload_id": 2, "successful": True, "arguments": {}}]
+        assert (
+            task.merge_batch(
+                dbsession,
+                state,
+                commit,
+                UserYaml({}),
+                batch,
+                None,
+                None,
+                master_report=report,
+            )
+            is None
+        )
+        save_report.assert_called_once_with(commit, report, None)
+        cleanup_deferred_report.assert_called_once_with(commit.repoid, commit.commitid)
+        load_deferred_report.assert_called_once()
+        get_existing_report.assert_called_once()
+
+    @pytest.mark.django_db()
+    def test_merge_batch_saves_deferred_report_when_due(self, dbsession, mocker):
+        mocker.patch(
+            "tasks.upload_finisher.UPLOAD_FINISHER_DEFERRED_REPORT_SAVE.check_value",
+            return_value=True,
+        )
+        mocker.patch("tasks.upload_finisher.load_intermediate_reports", return_value=[])
+        mocker.patch("tasks.upload_finisher.update_uploads")
+        mocker.patch.object(
+            ReportService, "get_existing_report_for_commit", return_value=None
+        )
+        save_report = mocker.patch.object(ReportService, "save_report")
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+
+        state = mocker.MagicMock()
+        state.get_upload_numbers.return_value = UploadNumbers(
+            processing=1, processed=0, merging=1
+        )
+        task = UploadFinisherTask()
+        mocker.patch("services.processing.intermediate.DEFERRED_REPORT_MAX_BATCHES", 2)
+
+        report = None
+        for upload_id in range(1, 4):
+            batch = [{"upload_id": upload_id, "successful": True, "arguments": {}}]
+            report = task.merge_batch(
+                dbsession,
+                state,
+                commit,
+                UserYaml({}),
+                batch,
+                None,
+                None,
+                master_report=report,
+            )
+            # more uploads are expected, so the report is passed on in any case
+            assert report is not None
+
+        # the third batch saved the report, as it was deferred twice already
+        save_report.assert_called_once_with(commit, report, None)
+        assert load_deferred_report(commit.repoid, commit.commitid) is None
+
+        mocker.patch("services.processing.intermediate.time.time", return_value=0)
+        task.merge_batch(
+            dbsession, state, commit, UserYaml({}), batch, None, None, report
+        )
+        assert save_report.call_count == 1
+        mocker.patch(
+            "services.processing.intermediate.time.time",
+            return_value=DEFERRED_REPORT_MAX_AGE,
+        )
+        task.merge_batch(
+            dbsession, state, commit, UserYaml({}), batch, None, None, report
+        )
+        # the report was saved, as it was deferred for too long
+        assert save_report.call_count == 2
+
+    @pytest.mark.django_db()
+    def test_retry_on_report_lock_for_deferred_report(
+        self, dbsession, mocker, mock_redis
+    ):
+        mocker.patch(
+            "tasks.upload_finisher.UPLOAD_FINISHER_DEFERRED_REPORT_SAVE.check_value",
+            return_value=True,
+        )
+        finish_reports_processing = mocker.patch.object(
+            UploadFinisherTask, "finish_reports_processing"
+        )
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+
+        mock_redis.lock.side_effect = LockError()
+        state = mocker.MagicMock()
+        state.get_upload_numbers.return_value = UploadNumbers(0, 0, 0)
+        kwargs = {"repoid": commit.repoid, "commitid": commit.commitid}
+
+        task = UploadFinisherTask()
+        task.request.retries = 0
+        task.request.kwargs = kwargs
+        retry = mocker.patch.object(task, "retry", side_effect=Retry())
+
+        with pytest.raises(Retry):
+            task.maybe_finish_reports_processing(
+                dbsession, state, commit, UserYaml({}), [], None
+            )
+        assert not finish_reports_processing.called
+        retry.assert_called_once_with(
+            max_retries=MAX_RETRIES,
+            countdown=ANY,
+            kwargs={**kwargs, "uploads_merged": True},
+        )
@@ -1,3 +1,4 @@
+import gzip
 import json
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -87,6 +88,9 @@ class FakeRedis(object):
             return res.encode()
         return res
 
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
     def lpop(self, key, count=None):
         list = self.lists.get(key)
         if not list:
@@ -1101,7 +1105,7 @@ class TestUploadTaskIntegration(object):
         mocker.patch(
             "tasks.upload.possibly_update_commit_from_provider_info", return_value=True
         )
-        mock_create_upload = mocker.patch.object(ReportService, "create_report_upload")
+        mock_create_upload = mocker.patch.object(ReportService, "create_report_uploads")
 
         def fail_if_try_to_create_upload(*args, **kwargs):
             raise Exception("tried to create Upload")
@@ -1284,6 +1288,42 @@ class TestUploadTaskUnit(object):
         ]
         assert b"Some weird value" == content
 
+    def test_offload_redis_payloads(self, dbsession, mock_redis, mock_storage, mocker):
+        mocked_now = mocker.patch.object(ArchiveService, "get_now")
+        mocked_now.return_value = datetime(2019, 12, 3)
+        mocker.patch("tasks.upload.REDIS_PAYLOAD_BATCH_SIZE", 2)
+        mock_redis.keys["upload/first"] = b"first content"
+        mock_redis.keys["upload/second/gzip"] = gzip.compress(b"second content")
+        mock_redis.keys["upload/third"] = b"third content"
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        repo_hash = ArchiveService.get_archive_hash(commit.repository)
+        arguments_list = [
+            {"redis_key": "upload/first", "reportid": "first"},
+            {"url": "v4/raw/already_in_storage.txt", "reportid": "stored"},
+            {"redis_key": "upload/second/gzip", "reportid": "second"},
+            {"redis_key": "upload/third", "reportid": "third", "token": "value"},
+        ]
+        upload_args = UploadContext(
+            repoid=commit.repoid,
+            commitid=commit.commitid,
+            redis_connection=mock_redis,
+        )
+        upload_args.offload_redis_payloads(commit, arguments_list)
+
+        path = f"v4/raw/2019-12-03/{repo_hash}/{commit.commitid}"
+        assert arguments_list == [
+            {"url": f"{path}/first.txt", "reportid": "first"},
+            {"url": "v4/raw/already_in_storage.txt", "reportid": "stored"},
+            {"url": f"{path}/second.txt", "reportid": "second"},
+            {"url": f"{path}/third.txt", "reportid": "third", "token": "value"},
+        ]
+        archive = mock_storage.storage["archive"]
+        assert archive[f"{path}/first.txt"] == b"first content"
+        assert archive[f"{path}/second.txt"] == b"second content"
+        assert archive[f"{path}/third.txt"] == b"third content"
+
     @pytest.mark.django_db
     def test_schedule_task_with_one_task(self, dbsession, mocker, mock_repo_provider):
         _start_upload_flow(mocker)
@@ -4,6 +4,7 @@ from shared.billing import BillingPlan
 
 from app import celery_app
 from celery_config import trial_expiration_task_name
+from celery_task_router import invalidate_plan_routing_cache
 from database.enums import TrialStatus
 from database.models.core import Owner
 from tasks.base import BaseCodecovTask
@@ -29,6 +30,7 @@ class TrialExpirationTask(BaseCodecovTask, name=trial_expiration_task_name):
         owner.stripe_subscription_id = None
         owner.trial_status = TrialStatus.EXPIRED.value
         db_session.flush()
+        invalidate_plan_routing_cache(owner.ownerid)
         return {"successful": True}
 
 
@@ -2,6 +2,7 @@ import itertools
 import logging
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import Optional
 
@@ -24,6 +25,7 @@ from shared.yaml.user_yaml import OwnerContext
 from sqlalchemy.orm import Session
 
 from app import celery_app
+from celery_task_router import prefetch_user_plans
 from database.enums import CommitErrorTypes, ReportType
 from database.models import Commit, CommitReport
 from database.models.core import GITHUB_APP_INSTALLATION_DEFAULT_NAME
@@ -36,7 +38,11 @@ from services.archive import ArchiveService
 from services.bundle_analysis.report import BundleAnalysisReportService
 from services.processing.state import ProcessingState
 from services.processing.types import UploadArguments
-from services.redis import download_archive_from_redis, get_redis_connection
+from services.redis import (
+    download_archive_from_redis,
+    download_archives_from_redis,
+    get_redis_connection,
+)
 from services.report import (
     BaseReportService,
     NotReadyToBuildReportYetError,
@@ -64,6 +70,11 @@ log = logging.getLogger(__name__)
 
 CHUNK_SIZE = 3
 
+# The number of upload payloads fetched from redis at once, and the number of them
+# written to storage concurrently, when moving them over to storage.
+REDIS_PAYLOAD_BATCH_SIZE = 50
+REDIS_PAYLOAD_OFFLOAD_CONCURRENCY = 8
+
 UPLOADS_PER_TASK_SCHEDULE = Histogram(
     "worker_uploads_per_schedule",
     "The number of individual uploads scheduled for processing",
@@ -164,6 +175,48 @@ class UploadContext:
             for arg in arguments:
                 yield orjson.loads(arg)
 
+    def offload_redis_payloads(
+        self, commit: Commit, arguments_list: list[UploadArguments]
+    ):
+        """
+        Moves the upload payloads which are stored in redis over to storage,
+        replacing the `redis_key` of the arguments with the resulting `url`.
+
+        This does for all the arguments at once what `normalize_arguments` does for
+        a single one, fetching the payloads from redis in batches, and writing
+        them to storage concurrently.
+        """
+        to_offload = [
+            arguments for arguments in arguments_list if "redis_key" in arguments
+        ]
+        if not to_offload:
+            return
+
+        commit_sha = commit.commitid
+        archive_service = ArchiveService(commit.repository)
+
+        def write_payload(arguments: UploadArguments, content: str | None) -> str:
+            return archive_service.write_raw_upload(
+                commit_sha, arguments.get("reportid"), content
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=min(REDIS_PAYLOAD_OFFLOAD_CONCURRENCY, len(to_offload))
+        ) as pool:
+            for start in range(0, len(to_offload), REDIS_PAYLOAD_BATCH_SIZE):
+                batch = to_offload[start : start + REDIS_PAYLOAD_BATCH_SIZE]
+                contents = download_archives_from_redis(
+                    self.redis_connection,
+                    [arguments.pop("redis_key") for arguments in batch],
+                )
+                written_paths = pool.map(write_payload, batch, contents)
+                for arguments, written_path in zip(batch, written_paths):
+                    log.info(
+                        "Writing report content from redis to storage",
+                        extra=dict(path=written_path),
+                    )
+                    arguments["url"] = written_path
+
     def normalize_arguments(self, commit: Commit, arguments: UploadArguments):
         """
         Normalizes and validates the argument list from the user.
@@ -505,29 +558,42 @@ class UploadTask(BaseCodecovTask, name=upload_task_name):
         measurements = []
         created_at = timezone.now()
 
-        for arguments in upload_context.arguments_list():
+        raw_argument_list = list(upload_context.arguments_list())
+        upload_context.offload_redis_payloads(commit, raw_argument_list)
+        for arguments in raw_argument_list:
             arguments = upload_context.normalize_arguments(commit, arguments)
-            if "upload_id" not in arguments:
-                upload = report_service.create_report_upload(arguments, commit_report)
-                arguments["upload_id"] = upload.id_
-                # Adding measurements to array to later add in bulk
-                measurements.append(
-                    UserMeasurement(
-                        owner_id=repository.owner.ownerid,
-                        repo_id=repository.repoid,
-                        commit_id=commit.id,
-                        upload_id=upload.id,
-                        # CLI precreates the upload in API so this defaults to Legacy
-                        uploader_used=UploaderType.LEGACY.value,
-                        private_repo=repository.private,
-                        report_type=commit_report.report_type,
-                        created_at=created_at,
-                    )
+            argument_list.append(arguments)
+
+        # Create all the missing `Upload`s (and their flags) in bulk
+        new_uploads = [
+            arguments for arguments in argument_list if "upload_id" not in arguments
+        ]
+        if new_uploads:
+            upload_ids = report_service.create_report_uploads(
+                new_uploads, commit_report
+            )
+        else:
+            upload_ids = []
+        for arguments, upload_id in zip(new_uploads, upload_ids):
+            arguments["upload_id"] = upload_id
+            # Adding measurements to array to later add in bulk
+            measurements.append(
+                UserMeasurement(
+                    owner_id=repository.owner.ownerid,
+                    repo_id=repository.repoid,
+                    commit_id=commit.id,
+                    upload_id=upload_id,
+                    # CLI precreates the upload in API so this defaults to Legacy
+                    uploader_used=UploaderType.LEGACY.value,
+                    private_repo=repository.private,
+                    report_type=commit_report.report_type,
+                    created_at=created_at,
                 )
+            )
 
+        for arguments in argument_list:
             # TODO(swatinem): eventually migrate from `upload_pk` to `upload_id`:
             arguments["upload_pk"] = arguments["upload_id"]
-            argument_list.append(arguments)
 
         # Bulk insert coverage measurements
         if measurements:
@@ -640,6 +706,9 @@ class UploadTask(BaseCodecovTask, name=upload_task_name):
         finisher_kwargs = UploadFlow.save_to_kwargs(finisher_kwargs)
         finish_parallel_sig = upload_finisher_task.signature(kwargs=finisher_kwargs)
 
+        prefetch_user_plans(
+            commit.get_db_session(), [*parallel_processing_tasks, finish_parallel_sig]
+        )
         parallel_tasks = chord(parallel_processing_tasks, finish_parallel_sig)
         return parallel_tasks.apply_async()
 
@@ -699,6 +768,9 @@ class UploadTask(BaseCodecovTask, name=upload_task_name):
             ta_finisher_kwargs = TestResultsFlow.save_to_kwargs(ta_finisher_kwargs)
             ta_finisher_task_sig = ta_finisher_task.s(**ta_finisher_kwargs)
 
+            prefetch_user_plans(
+                commit.get_db_session(), [*ta_proc_group, ta_finisher_task_sig]
+            )
             return chord(ta_proc_group, ta_finisher_task_sig).apply_async()
         else:
             task_group = [
@@ -723,6 +795,7 @@ class UploadTask(BaseCodecovTask, name=upload_task_name):
             task_group.append(
                 test_results_finisher_task.signature(kwargs=finisher_kwargs),
             )
+            prefetch_user_plans(commit.get_db_session(), task_group)
             return chain(*task_group).apply_async()
 
     def possibly_carryforward_bundle_report(
@@ -29,13 +29,27 @@ from helpers.checkpoint_logger.flows import UploadFlow
 from helpers.exceptions import RepositoryWithoutValidBotError
 from helpers.github_installation import get_installation_name_for_owner_for_task
 from helpers.save_commit_error import save_commit_error
+from rollouts import (
+    UPLOAD_FINISHER_DEFERRED_REPORT_SAVE,
+    UPLOAD_FINISHER_MERGE_COORDINATOR,
+)
 from services.comparison import get_or_create_comparison
+from services.processing.coordinator import DRAIN_CHECK_DELAY, MergeCoordinator
 from services.processing.intermediate import (
+    cleanup_deferred_report,
     cleanup_intermediate_reports,
+    deferred_report_save_is_due,
+    load_deferred_report,
     load_intermediate_reports,
+    save_deferred_report,
 )
 from services.processing.merging import merge_reports, update_uploads
-from services.processing.state import ProcessingState, should_trigger_postprocessing
+from services.processing.metrics import FINISHER_RETRIES_AVOIDED
+from services.processing.state import (
+    ProcessingState,
+    should_defer_report_save,
+    should_trigger_postprocessing,
+)
 from services.processing.types import ProcessingResult
 from services.redis import get_redis_connection
 from services.report import ReportService
@@ -78,6 +92,8 @@ class UploadFinisherTask(BaseCodecovTask, name=upload_finisher_task_name):
         commitid: str,
         commit_yaml,
         report_code: str | None = None,
+        drain_check: bool = False,
+        uploads_merged: bool = False,
         **kwargs,
     ):
         try:
@@ -99,48 +115,285 @@ class UploadFinisherTask(BaseCodecovTask, name=upload_finisher_task_name):
             .first()
         )
         assert commit, "Commit not found in database."
-        repository = commit.repository
 
         state = ProcessingState(repoid, commitid)
 
-        upload_ids = [upload["upload_id"] for upload in processing_results]
+        if uploads_merged:
+            # a retry of a finisher which merged its uploads, but failed to finish up
+            return self.maybe_finish_reports_processing(
+                db_session, state, commit, commit_yaml, processing_results, report_code
+            )
+
         diff = load_commit_diff(commit, self.name)
 
+        if UPLOAD_FINISHER_MERGE_COORDINATOR.check_value(
+            identifier=repoid, default=False
+        ):
+            coordinator = MergeCoordinator(repoid, commitid)
+            if drain_check:
+                coordinator.start_drain_check()
+            coordinator.register(processing_results)
+            merged_results = self.merge_registered_uploads(
+                db_session, coordinator, state, commit, commit_yaml, diff, report_code
+            )
+            if merged_results is None:
+                # Another finisher holds the report lock, and will merge our uploads.
+                # In case it dies before doing so, check back later.
+                FINISHER_RETRIES_AVOIDED.inc()
+                if coordinator.should_schedule_drain_check():
+                    self.schedule_drain_check(commit, commit_yaml, report_code)
+                UploadFlow.log(UploadFlow.PROCESSING_COMPLETE)
+                UploadFlow.log(UploadFlow.SKIPPING_NOTIFICATION)
+                return
+            if not merged_results:
+                # Our uploads were already merged by another finisher
+                UploadFlow.log(UploadFlow.PROCESSING_COMPLETE)
+                UploadFlow.log(UploadFlow.SKIPPING_NOTIFICATION)
+                return
+            return self.maybe_finish_reports_processing(
+                db_session, state, commit, commit_yaml, merged_results, report_code
+            )
+
         try:
             with get_report_lock(repoid, commitid, self.hard_time_limit_task):
-                report_service = ReportService(commit_yaml)
-                report = perform_report_merging(
-                    report_service, commit_yaml, commit, processing_results
+                # any claims left at this point were abandoned by a previous lock holder
+                state.release_all_claims()
+                # only merge the uploads which were not merged already, for example
+                # by an earlier delivery of this same task
+                claimed = state.claim_uploads_for_merging(
+                    [upload["upload_id"] for upload in processing_results]
                 )
-
-                log.info(
-                    "Saving combined report",
-                    extra={"processing_results": processing_results},
-                )
-
-                if diff:
-                    report.apply_diff(diff)
-                report_service.save_report(commit, report, report_code)
-
-                db_session.commit()
-                state.mark_uploads_as_merged(upload_ids)
+                if claimed:
+                    try:
+                        self.merge_batch(
+                            db_session,
+                            state,
+                            commit,
+                            commit_yaml,
+                            [
+                                upload
+                                for upload in processing_results
+                                if upload["upload_id"] in claimed
+                            ],
+                            diff,
+                            report_code,
+                        )
+                    except Exception:
+                        state.release_claimed_uploads(list(claimed))
+                        raise
 
         except LockError:
-            max_retry = 200 * 3**self.request.retries
-            retry_in = min(random.randint(max_retry // 2, max_retry), 60 * 60 * 5)
+            retry_in = report_lock_retry_countdown(self.request.retries)
             log.warning(
                 "Unable to acquire report lock. Retrying",
                 extra=dict(countdown=retry_in, number_retries=self.request.retries),
             )
             self.retry(max_retries=MAX_RETRIES, countdown=retry_in)
 
+        return self.maybe_finish_reports_processing(
+            db_session, state, commit, commit_yaml, processing_results, report_code
+        )
+
+    def merge_registered_uploads(
+        self,
+        db_session,
+        coordinator: MergeCoordinator,
+        state: ProcessingState,
+        commit: Commit,
+        commit_yaml: UserYaml,
+        diff: dict | None,
+        report_code: str | None,
+    ) -> list[ProcessingResult] | None:
+        """
+        Merges all the uploads registered with the `coordinator`, batch by batch,
+        as long as this finisher can get the report lock without waiting.
+
+        Returns the `ProcessingResult`s of the merged uploads, or `None` if
+        another finisher is holding the lock.
+        """
+        repoid = commit.repoid
+        commitid = commit.commitid
+        merged_results: list[ProcessingResult] = []
+
+        while True:
+            lock = get_report_lock(repoid, commitid, self.hard_time_limit_task)
+            if not lock.acquire(blocking=False):
+                return merged_results if merged_results else None
+            try:
+                # the batch of a previous lock holder which died while merging it
+                state.release_all_claims()
+                # the report merged so far, as long as saving it is being deferred
+                report = None
+                while batch := coordinator.take_batch(state):
+                    upload_ids = [upload["upload_id"] for upload in batch]
+                    try:
+                        report = self.merge_batch(
+                            db_session,
+                            state,
+                            commit,
+                            commit_yaml,
+                            batch,
+                            diff,
+                            report_code,
+                            master_report=report,
+                        )
+                    except Exception:
+                        # give the uploads back, so a retry or another finisher merges them
+                        state.release_claimed_uploads(upload_ids)
+                        raise
+                    coordinator.forget(upload_ids)
+                    merged_results.extend(batch)
+            finally:
+                lock.release()
+
+            # uploads registered by a finisher that failed to get the lock
+            # right before we released it would otherwise be left behind
+            if not coordinator.has_registered_uploads():
+                return merged_results
+
+    def schedule_drain_check(
+        self, commit: Commit, commit_yaml: UserYaml, report_code: str | None
+    ):
+        """
+        Schedules a finisher without uploads of its own, which merges the uploads
+        that are still registered by then, in case the finisher holding the
+        report lock died before merging them.
+        """
+        kwargs = {
+            "repoid": commit.repoid,
+            "commitid": commit.commitid,
+            "commit_yaml": commit_yaml.to_dict(),
+            "report_code": report_code,
+            "drain_check": True,
+        }
+        self.app.tasks[upload_finisher_task_name].apply_async(
+            args=([],),
+            kwargs=UploadFlow.save_to_kwargs(kwargs),
+            countdown=DRAIN_CHECK_DELAY,
+        )
+
+    def merge_batch(
+        self,
+        db_session,
+        state: ProcessingState,
+        commit: Commit,
+        commit_yaml: UserYaml,
+        processing_results: list[ProcessingResult],
+        diff: dict | None,
+        report_code: str | None,
+        master_report: Report | None = None,
+    ) -> Report | None:
+        """
+        Merges the uploads of `processing_results` into the report of the commit.
+
+        With deferred saving, the merged report is only saved to storage once no
+        more uploads are expected, or once saving it is due (see
+        `deferred_report_save_is_due`). Until then, it is kept in redis in between
+        batches. As long as more uploads are expected, it is also returned, so the
+        caller can pass it as `master_report` to the next batch.
+        """
+        upload_ids = [upload["upload_id"] for upload in processing_results]
+        report_service = ReportService(commit_yaml)
+        defer_save = UPLOAD_FINISHER_DEFERRED_REPORT_SAVE.check_value(
+            identifier=commit.repoid, default=False
+        )
+        if master_report is None and defer_save:
+            master_report = load_deferred_report(commit.repoid, commit.commitid)
+        report = perform_report_merging(
+            report_service, commit_yaml, commit, processing_results, master_report
+        )
+
+        more_expected = defer_save and should_defer_report_save(
+            state.get_upload_numbers()
+        )
+        deferred = more_expected and not deferred_report_save_is_due(
+            commit.repoid, commit.commitid
+        )
+        if deferred:
+            log.info(
+                "Deferring saving of combined report",
+                extra={"processing_results": processing_results},
+            )
+            save_deferred_report(commit.repoid, commit.commitid, report)
+        else:
+            log.info(
+                "Saving combined report",
+                extra={"processing_results": processing_results},
+            )
+
+            if diff:
+                report.apply_diff(diff)
+            report_service.save_report(commit, report, report_code)
+            if defer_save:
+                cleanup_deferred_report(commit.repoid, commit.commitid)
+
+        db_session.commit()
+        state.mark_uploads_as_merged(upload_ids)
         cleanup_intermediate_reports(upload_ids)
 
+        return report if more_expected else None
+
+    def save_leftover_deferred_report(
+        self,
+        db_session,
+        commit: Commit,
+        commit_yaml: UserYaml,
+        report_code: str | None,
+    ):
+        """
+        Saves a deferred report which no finisher saved, because an upload
+        that was still expected when deferring never made it to the merge.
+        """
+        with get_report_lock(commit.repoid, commit.commitid, self.hard_time_limit_task):
+            report = load_deferred_report(commit.repoid, commit.commitid)
+            if report is None:
+                return
+
+            log.warning("Saving leftover deferred report")
+            if diff := load_commit_diff(commit, self.name):
+                report.apply_diff(diff)
+            ReportService(commit_yaml).save_report(commit, report, report_code)
+            db_session.commit()
+            cleanup_deferred_report(commit.repoid, commit.commitid)
+
+    def maybe_finish_reports_processing(
+        self,
+        db_session,
+        state: ProcessingState,
+        commit: Commit,
+        commit_yaml: UserYaml,
+        processing_results: list[ProcessingResult],
+        report_code: str | None,
+    ):
+        repoid = commit.repoid
+        commitid = commit.commitid
+        repository = commit.repository
+
         if not should_trigger_postprocessing(state.get_upload_numbers()):
             UploadFlow.log(UploadFlow.PROCESSING_COMPLETE)
             UploadFlow.log(UploadFlow.SKIPPING_NOTIFICATION)
             return
 
+        if UPLOAD_FINISHER_DEFERRED_REPORT_SAVE.check_value(
+            identifier=repoid, default=False
+        ):
+            try:
+                self.save_leftover_deferred_report(
+                    db_session, commit, commit_yaml, report_code
+                )
+            except LockError:
+                retry_in = report_lock_retry_countdown(self.request.retries)
+                log.warning(
+                    "Unable to acquire report lock to save deferred report. Retrying",
+                    extra=dict(countdown=retry_in, number_retries=self.request.retries),
+                )
+                # the uploads are merged already, so the retry only has to finish up
+                self.retry(
+                    max_retries=MAX_RETRIES,
+                    countdown=retry_in,
+                    kwargs={**self.request.kwargs, "uploads_merged": True},
+                )
+
         lock_name = f"upload_finisher_lock_{repoid}_{commitid}"
         redis_connection = get_redis_connection()
         try:
@@ -311,7 +564,7 @@ class UploadFinisherTask(BaseCodecovTask, name=upload_finisher_task_name):
             read_yaml_field(commit_yaml, ("codecov", "notify", "after_n_builds")) or 0
         )
         if after_n_builds > 0:
-            report = ReportService(commit_yaml).get_existing_report_for_commit(commit)
+            report = ReportService(commit_yaml).get_lazy_report_for_commit(commit)
             number_sessions = len(report.sessions) if report is not None else 0
             if after_n_builds > number_sessions:
                 log.info(
@@ -359,6 +612,11 @@ RegisteredUploadTask = celery_app.register_task(UploadFinisherTask())
 upload_finisher_task = celery_app.tasks[RegisteredUploadTask.name]
 
 
+def report_lock_retry_countdown(retries: int) -> int:
+    max_retry = 200 * 3**retries
+    return min(random.randint(max_retry // 2, max_retry), 60 * 60 * 5)
+
+
 def get_report_lock(repoid: int, commitid: str, hard_time_limit: int) -> Lock:
     lock_name = UPLOAD_PROCESSING_LOCK_NAME(repoid, commitid)
     redis_connection = get_redis_connection()
@@ -375,8 +633,10 @@ def perform_report_merging(
     commit_yaml: UserYaml,
     commit: Commit,
     processing_results: list[ProcessingResult],
+    master_report: Report | None = None,
 ) -> Report:
-    master_report = report_service.get_existing_report_for_commit(commit)
+    if master_report is None:
+        master_report = report_service.get_existing_report_for_commit(commit)
     if master_report is None:
         master_report = Report()
 
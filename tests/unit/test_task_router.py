@@ -1,8 +1,10 @@
 import pytest
 import shared.celery_config as shared_celery_config
+from celery import signature
 from shared.billing import BillingPlan
 
 from celery_task_router import (
+    PlanRoutingCache,
     _get_user_plan_from_comparison_id,
     _get_user_plan_from_label_request_id,
     _get_user_plan_from_org_ownerid,
@@ -12,6 +14,9 @@ from celery_task_router import (
     _get_user_plan_from_repoid,
     _get_user_plan_from_suite_id,
     _get_user_plan_from_task,
+    invalidate_plan_routing_cache,
+    plan_routing_cache,
+    prefetch_user_plans,
     route_task,
 )
 from database.tests.factories.core import (
@@ -368,3 +373,126 @@ def test_route_task(mocker, dbsession, fake_repos):
     mock_route_tasks_shared.assert_called_with(
         shared_celery_config.upload_task_name, BillingPlan.pr_monthly.db_name
     )
+
+
+def test_get_user_plan_from_repoid_is_cached(dbsession, fake_repos):
+    (repo, _) = fake_repos
+    assert (
+        _get_user_plan_from_repoid(dbsession, repo.repoid)
+        == BillingPlan.pr_monthly.db_name
+    )
+
+    repo.owner.plan = BillingPlan.enterprise_cloud_yearly.db_name
+    dbsession.flush()
+    # Still served from the cache, for both the repo and its owner
+    assert (
+        _get_user_plan_from_repoid(dbsession, repo.repoid)
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert (
+        _get_user_plan_from_ownerid(dbsession, repo.ownerid)
+        == BillingPlan.pr_monthly.db_name
+    )
+
+    invalidate_plan_routing_cache(repo.ownerid)
+    assert (
+        _get_user_plan_from_repoid(dbsession, repo.repoid)
+        == BillingPlan.enterprise_cloud_yearly.db_name
+    )
+    assert (
+        _get_user_plan_from_ownerid(dbsession, repo.ownerid)
+        == BillingPlan.enterprise_cloud_yearly.db_name
+    )
+
+
+def test_get_user_plan_cache_expires(mocker, dbsession, fake_owners):
+    (owner, _) = fake_owners
+    mocked_monotonic = mocker.patch("celery_task_router.time.monotonic")
+    mocked_monotonic.return_value = 1000
+    assert (
+        _get_user_plan_from_ownerid(dbsession, owner.ownerid)
+        == BillingPlan.pr_monthly.db_name
+    )
+    owner.plan = BillingPlan.enterprise_cloud_yearly.db_name
+    dbsession.flush()
+
+    mocked_monotonic.return_value = 1000 + plan_routing_cache.ttl + 1
+    assert (
+        _get_user_plan_from_ownerid(dbsession, owner.ownerid)
+        == BillingPlan.enterprise_cloud_yearly.db_name
+    )
+
+
+def test_plan_routing_cache_evicts_least_recently_used():
+    cache = PlanRoutingCache(maxsize=3)
+    cache.set("ownerid", 1, 1, "plan-1")
+    cache.set("repoid", 20, 2, "plan-2")
+    # the owner of a repo is cached as well
+    assert cache.has("ownerid", 2)
+
+    assert cache.get("ownerid", 1) == "plan-1"
+    cache.set("ownerid", 3, 3, "plan-3")
+    # owner 1 was used more recently than repo 20
+    assert cache.has("ownerid", 1)
+    assert not cache.has("repoid", 20)
+    assert cache.has("ownerid", 2)
+    assert cache.has("ownerid", 3)
+    assert len(cache._entries) == 3
+
+
+def test_unknown_owner_is_not_cached(dbsession):
+    assert (
+        _get_user_plan_from_ownerid(dbsession, 10000000)
+        == BillingPlan.users_basic.db_name
+    )
+    assert not plan_routing_cache.has("ownerid", 10000000)
+
+
+def test_prefetch_user_plans(mocker, dbsession, fake_repos):
+    (repo, repo_enterprise_cloud) = fake_repos
+    signatures = [
+        signature(
+            shared_celery_config.upload_processor_task_name,
+            kwargs=dict(repoid=repo.repoid),
+        ),
+        signature(
+            shared_celery_config.upload_processor_task_name,
+            kwargs=dict(repoid=repo_enterprise_cloud.repoid),
+        ),
+        signature(
+            shared_celery_config.upload_finisher_task_name,
+            kwargs=dict(repoid=repo.repoid),
+        ),
+        signature(
+            shared_celery_config.sync_repos_task_name,
+            kwargs=dict(ownerid=repo.ownerid),
+        ),
+    ]
+    prefetch_user_plans(dbsession, signatures)
+
+    query = mocker.spy(dbsession, "query")
+    assert (
+        _get_user_plan_from_task(
+            dbsession,
+            shared_celery_config.upload_processor_task_name,
+            dict(repoid=repo_enterprise_cloud.repoid),
+        )
+        == BillingPlan.enterprise_cloud_yearly.db_name
+    )
+    assert (
+        _get_user_plan_from_task(
+            dbsession,
+            shared_celery_config.upload_finisher_task_name,
+            dict(repoid=repo.repoid),
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert (
+        _get_user_plan_from_task(
+            dbsession,
+            shared_celery_config.sync_repos_task_name,
+            dict(ownerid=repo.ownerid),
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert query.call_count == 0